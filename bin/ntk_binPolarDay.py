@@ -5,7 +5,6 @@ import os
 import glob
 import numpy as np
 import importlib
-from obspy.core import UTCDateTime
 from datetime import date, timedelta as td
 
 # Import the Noise Toolkit libraries.
@@ -19,6 +18,8 @@ import msgLib as msg_lib
 import fileLib as file_lib
 import staLib as sta_lib
 import utilsLib as utils_lib
+import pdfLib as pdf_lib
+import polarLib as polar_lib
 
 """  NAME:   ntk_binPolarDay.py - a Python 3 script to bin polarization parameters into daily files for a given channel 
                       tag and bounding parameters. The output is similar to those available from the former
@@ -43,9 +44,15 @@ import utilsLib as utils_lib
 
   INPUT:
 
-     hourly polarization files
+     hourly polarization files or daily binary polarization DB files (polarDbFormat)
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: reads the binary polarization DB (polarDbFormat)
+     2026-10-19 IRIS DMC Product Team: the file start times of each day are parsed at once (utilsLib.get_datetime64)
+     2026-10-19 IRIS DMC Product Team: daily PDF count matrices are saved along with their monthly and yearly
+                        rollups
+     2026-10-19 IRIS DMC Product Team: bin edges are computed once per variable and whole columns are binned
+                        at once into (frequency x bin) count matrices
      2020-11-16 Manoch: V.2.0.0 Python 3, use of Fedcatalog and adoption of PEP 8 style guide.
      2020-09-25 Timothy C. Bartholomaus, University of Idaho: conversion to python 3
      2015-07-15 IRIS DMC Product Team (Manoch) R0.5.0: Beta release updates
@@ -102,6 +109,9 @@ def usage():
           f'\n\t\tD???.bin and H???.bin (??? represents 3-digit day of the year)'
           f'\n\tfor example:'
           f'\n\t\tD227.bin and H227.bin'
+          f'\n\n\tWith pdfDailyFormat = "sparse" in the configuration file, the daily files are saved in the '
+          f'sparse binary PDF format instead (D???.npz, only the bins with hits are stored). To list a sparse '
+          f'daily file as text, run ntk_rollupPdf.py for that day.'
           f'\n\nExamples:'
           f'\n\n\t-usage:'
           f'\n\tpython {script}'
@@ -177,6 +187,8 @@ except Exception as ex:
     sys.exit(code)
 
 duration = end_datetime - start_datetime
+start_datetime64 = utils_lib.get_datetime64(start_datetime)
+end_datetime64 = utils_lib.get_datetime64(end_datetime)
 
 end_date = date(int(end_year), int(end_month), int(end_day))
 start_date = date(int(start_year), int(start_month), int(start_day))
@@ -194,6 +206,18 @@ if duration <= 0 or len(data_day_list) <= 0:
 
 xtype = utils_lib.get_param(args, 'xtype', 'frequency', usage)  # what the x-axis should represent
 
+if param.pdfDailyFormat not in pdf_lib.DAILY_FORMATS:
+    usage()
+    code = msg_lib.error(f'bad pdfDailyFormat parameter [{param.pdfDailyFormat}], must be one of '
+                         f'{pdf_lib.DAILY_FORMATS}', 2)
+    sys.exit(code)
+
+if param.polarDbFormat not in polar_lib.POLAR_DB_FORMATS:
+    usage()
+    code = msg_lib.error(f'bad polarDbFormat parameter [{param.polarDbFormat}], must be one of '
+                         f'{polar_lib.POLAR_DB_FORMATS}', 2)
+    sys.exit(code)
+
 """Find the polarization files and start reading.
   build the file tag for the polarization files to read, example:
       NM.SLM.--.BHZ_BHE_BHN_2009-09-01T08:00:00.035645_3600_frequency.txt"""
@@ -204,17 +228,49 @@ msg_lib.info(f'Polar DIR TAG: {polar_db_dir_tag}')
 if verbose:
     msg_lib.info(f'Polar FILE TAG: {polar_db_file_tag}')
 
-# Loop through the windows
+# The bin edges are computed once per variable.
 bin_list = dict()
+for column in column_tag:
+    bin_list[column] = pdf_lib.get_bin_edges(*param.bins[column])
+
+
+def bin_window(this_hour, X, values, day_file, hour_file):
+    """Bin the (x-values x variables) polarization values of a window, a whole column at once."""
+    for column_index, column in enumerate(variables):
+        bin_start, bin_end, bin_width = param.bins[column]
+
+        # The period/frequency column is not part of values.
+        column_values = values[:, column_index]
+        this_bin = day_file[column_index].add(X, column_values)
+
+        # Save the values that are within the range in the Hourly file.
+        in_range = (this_bin >= 0) & (bin_start <= column_values) & (column_values <= bin_end)
+        for i in np.nonzero(in_range)[0]:
+            hour_file[column_index].append(f'{this_hour}{delimiter}{X[i]}{delimiter}'
+                                           f'{float(bin_list[column][this_bin[i]])}')
+
+
+# Loop through the windows
 for n in range(len(data_day_list)):
     msg_lib.info(f'day {data_day_list[n]}')
+
+    # The daily outputs are labeled by the day being processed.
+    this_day = start_date + td(days=n)
+    this_year = this_day.strftime("%Y")
+    this_month = this_day.strftime("%m")
+    this_doy = this_day.strftime("%j")
+    window_count = 0
     day_file = list()
     hour_file = list()
     for column in range(len(column_tag)):
         hour_file.append(list())
-        day_file.append(dict())
+        day_file.append(pdf_lib.PdfAccumulator(bin_list[column_tag[column]]))
 
-    thisFile = os.path.join(polar_db_dir_tag, data_day_list[n], f'{polar_db_file_tag}*{xtype}.txt')
+    if param.polarDbFormat == 'binary':
+        thisFile = os.path.join(polar_db_dir_tag, data_day_list[n],
+                                f'{polar_db_file_tag}.*.{xtype}.{polar_lib.POLAR_DAY_EXTENSION}')
+    else:
+        thisFile = os.path.join(polar_db_dir_tag, data_day_list[n], f'{polar_db_file_tag}*{xtype}.txt')
     if verbose:
         msg_lib.info(f'Looking into: {thisFile}')
     this_file_list = sorted(glob.glob(thisFile))
@@ -228,70 +284,63 @@ for n in range(len(data_day_list)):
         if verbose:
             msg_lib.info(f'{len(this_file_list)} files  found!')
 
-    # Found the file, open and read it.
-    for this_polar_file in this_file_list:
-        if verbose:
-            msg_lib.info(f'Polarization FILE: "{this_polar_file}')
-
-        this_file_time_label = file_lib.get_file_times(param.namingConvention, channel_directory, this_polar_file)[0]
-
-        file_time = UTCDateTime(this_file_time_label)
-        this_year = file_time.strftime("%Y")
-        this_hour = file_time.strftime("%H:%M")
-        this_doy = file_time.strftime("%j")
-        if start_datetime <= file_time < end_datetime:
+    # Binary polarization DB, the day files hold the values of all windows of the day.
+    if param.polarDbFormat == 'binary':
+        for this_polar_file in this_file_list:
+            if verbose:
+                msg_lib.info(f'Polarization FILE: "{this_polar_file}')
             try:
-                with open(this_polar_file) as file:
+                polar_day = polar_lib.load_polar_day(this_polar_file)
+            except Exception as ex:
+                code = msg_lib.error(f'failed to open {this_polar_file}\n{ex}', 3)
+                sys.exit(code)
+            variable_index = [list(polar_day['variables']).index(column) for column in variables]
+            X = polar_lib.x_labels(polar_day['x'])
+            in_range_list = (start_datetime64 <= polar_day['times']) & (polar_day['times'] < end_datetime64)
+            for window_time, window_values in zip(polar_day['times'][in_range_list].astype(object).tolist(),
+                                                  polar_day['values'][in_range_list]):
+                this_hour = window_time.strftime("%H:%M")
+                bin_window(this_hour, X, window_values[:, variable_index].astype(float), day_file, hour_file)
+                window_count += 1
+    else:
+        # The file start times of the day, parsed at once.
+        file_time_label_list = [file_lib.get_file_times(param.namingConvention, channel_directory, this_polar_file)[0]
+                                for this_polar_file in this_file_list]
+        file_time_list = utils_lib.get_datetime64(file_time_label_list)
+        in_range_list = (start_datetime64 <= file_time_list) & (file_time_list < end_datetime64)
+        file_time_list = file_time_list.astype(object).tolist()
+
+        # Found the file, open and read it.
+        for this_polar_file, file_time, in_range in zip(this_file_list, file_time_list, in_range_list):
+            if verbose:
+                msg_lib.info(f'Polarization FILE: "{this_polar_file}')
+
+            this_hour = file_time.strftime("%H:%M")
+            if in_range:
+                try:
                     if verbose:
                         msg_lib.info(f'Working on {this_polar_file}')
 
-                    # Skip the header lines.
-                    for i in (1, 2):
-                        next(file)
-
-                    # Go through individual periods/frequencies.
-                    for line in file:
-                        # For each row, split column values.
-                        line = line.strip()
-                        values = line.split()
-                        X = values[0]
-                        # Go through each data column.
-                        for column_index, column in enumerate(variables):
-                            # Find the bin for this value and save it in the Hourly file.
-                            bin_start, bin_end, bin_width = param.bins[column]
-                            bin_list[column] = list()
-                            binCount = int((float(bin_end) - float(bin_start)) / float(bin_width)) + 1
-
-                            # Set the bin values.
-                            for i in range(binCount + 1):
-                                bin_list[column].append(float(bin_start) + float(i) * float(bin_width))
-
-                            # Get the value for this column and bin it. The first column is T or F, so +1.
-                            if values[column_index + 1] == 'nan':
-                                continue
-                            V = float(values[column_index + 1])
-                            this_freq, this_bin = np.histogram(V, bins=bin_list[column])
-                            # Is the value within the range?
-                            if bin_start <= V <= bin_end:
-                                if len(np.nonzero(this_freq)[0]) <= 0:
-                                    continue
-                                nonzero_element = np.nonzero(this_freq)[0][0]
-                                this_line = f'{this_hour}{delimiter}{X}{delimiter}{this_bin[nonzero_element]}'
-                                hour_file[column_index].append(this_line)
-                            key = f'{X}'
-                            if key in day_file[column_index]:
-                                day_file[column_index][key] += this_freq
-                            else:
-                                day_file[column_index][key] = this_freq
-
-                file.close()
-                if verbose:
-                    msg_lib.info(f'done reading the file ')
-            except Exception as ex:
-                naming_convention = param.namingConvention
-                code = msg_lib.error(f'failed to open {this_polar_file}\nis the "namingConvention" of in the param file'
-                                     f'{naming_convention} set correctly?\n{ex}', 3)
-                sys.exit(code)
+                    # Read all periods/frequencies at once, skipping the two header lines.
+                    X, values = file_lib.read_columns(this_polar_file, header_lines=2)
+                    if verbose:
+                        msg_lib.info(f'done reading the file ')
+                except Exception as ex:
+                    naming_convention = param.namingConvention
+                    code = msg_lib.error(f'failed to open {this_polar_file}\nis the "namingConvention" of in the '
+                                         f'param file{naming_convention} set correctly?\n{ex}', 3)
+                    sys.exit(code)
+                if not X:
+                    continue
+
+                # Go through each data column and bin the whole column at once.
+                bin_window(this_hour, X, values, day_file, hour_file)
+                window_count += 1
+
+    # Do not overwrite the daily outputs of the day with an empty PDF.
+    if window_count <= 0:
+        msg_lib.warning('Main', f'No windows in the requested time range for day {data_day_list[n]}, skip')
+        continue
 
     # Open the output file and go through each data column.
     for column in range(len(column_tag)):
@@ -304,16 +353,28 @@ for n in range(len(data_day_list)):
         utils_lib.mkdir(this_path)
         this_path = os.path.join(this_path, column_tag[column])
         utils_lib.mkdir(this_path)
-        output_file = os.path.join(this_path, f'D{this_doy}.bin')
-        msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
-        with open(output_file, 'w') as output_file:
-            for key in sorted(day_file[column]):
-                if verbose:
-                    msg_lib.info(f'KEY: {key}')
-                for ii in range(len(day_file[column][key])):
-                    output_file.write(f'{key}{delimiter}{bin_list[column_tag[column]][ii]}{delimiter}'
-                                      f'{day_file[column][key][ii]}\n')
-        output_file.close()
+        if verbose:
+            for key in day_file[column].sorted_keys():
+                msg_lib.info(f'KEY: {key}')
+        if param.pdfDailyFormat == 'text':
+            output_file = os.path.join(this_path, f'D{this_doy}.bin')
+            msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
+            day_file[column].write(output_file, delimiter)
+
+        # Save the daily count matrix and update the monthly and yearly rollups, the store is kept per x-axis type.
+        if param.pdfStoreSave > 0:
+            store_path = pdf_lib.store_directory(pdf_dir_tag, this_year, xtype, column_tag[column])
+            utils_lib.mkdir(store_path)
+            try:
+                store_file = pdf_lib.save_day(store_path, this_year, this_month, this_doy, day_file[column])
+            except Exception as ex:
+                code = msg_lib.error(f'failed to update the PDF store under {store_path}\n{ex}', 3)
+                sys.exit(code)
+            msg_lib.info(f'DAILY STORE FILE: {store_file}')
+        if param.pdfDailyFormat == 'sparse':
+            output_file = pdf_lib.day_file_name(this_path, this_doy)
+            msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
+            day_file[column].save(output_file)
 
         if param.pdfHourlySave > 0:
             this_path = os.path.join(this_path, param.pdfHourlyDirectory)
@@ -4,6 +4,7 @@ import sys
 import os
 import importlib
 import glob
+import numpy as np
 from obspy.core import UTCDateTime
 from datetime import date, timedelta as td
 
@@ -20,6 +21,7 @@ import msgLib as msg_lib
 import fileLib as file_lib
 import staLib  as sta_lib
 import utilsLib  as utils_lib
+import pdfLib as pdf_lib
 
 """
  Name: ntk_bin_PsdDay.py - a Python 3 script to bin PSD's to daily files for a given channel and bounding parameter.
@@ -48,6 +50,9 @@ hourly PSD files
 
  HISTORY:
 
+    2026-10-19 IRIS DMC Product Team: the file start times of each day are parsed at once (utilsLib.get_datetime64)
+    2026-10-19 IRIS DMC Product Team: diurnal and seasonal PDF groups are binned in the same pass as the daily PDFs
+    2026-10-19 IRIS DMC Product Team: daily PDF count matrices are saved along with their monthly and yearly rollups
     2020-11-16 Manoch: V.2.0.0 Python 3 and adoption of PEP 8 style guide.
     2014-10-22 Manoch: added support for Windows installation
     2013-05-19 IRIS DMC Product Team (MB): created 
@@ -106,6 +111,15 @@ def usage():
           f'\n\t\tD???.bin and H???.bin (??? represents 3-digit day of the year)'
           f'\n\tfor example:'
           f'\n\t\tD227.bin and H227.bin'
+          f'\n\n\tWith pdfDailyFormat = "sparse" in the configuration file, the daily files are saved in the '
+          f'sparse binary PDF format instead (D???.npz, only the bins with hits are stored). To list a sparse '
+          f'daily file as text, run ntk_rollupPdf.py for that day.'
+          f'\n\n\tThe PDF groups listed by the pdfGroups parameter (hour of the day, day of the week, month) are '
+          f'binned in the same pass and written at the end of the run under the GROUP directory, one file per '
+          f'group key covering all the binned days, for example:'
+          f'\n\t\tGROUP/utcHour/TA.O18A.--.BHZ.2008-08-14.2008-08-14.utcHour.13.txt'
+          f'\n\tthe group files have the format of the daily files (.npz for the sparse daily format), without the NaN '
+          f'values.'
           f'\n\nExamples:'
           f'\n\n\t- usage:'
           f'\n\tpython {script}'
@@ -146,6 +160,18 @@ location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
 channel = utils_lib.get_param(args, 'chan', None, usage)
 xtype = utils_lib.get_param(args, 'xtype', None, usage)
 
+if param.pdfDailyFormat not in pdf_lib.DAILY_FORMATS:
+    usage()
+    code = msg_lib.error(f'bad pdfDailyFormat parameter [{param.pdfDailyFormat}], must be one of '
+                         f'{pdf_lib.DAILY_FORMATS}', 2)
+    sys.exit(code)
+
+for group in param.pdfGroups:
+    if group not in pdf_lib.PDF_GROUPS:
+        usage()
+        code = msg_lib.error(f'bad pdfGroups parameter [{group}], must be one of {pdf_lib.PDF_GROUPS}', 2)
+        sys.exit(code)
+
 """
  PSD files are all HOURLY files with 50% overlap computed as part of the polarization product
  date parameter of the hourly PSDs to start, it starts at hour 00:00:00
@@ -174,6 +200,9 @@ except Exception as ex:
     code = msg_lib.error(f'Invalid end ({end_date_time})\n{ex}', 2)
     sys.exit(code)
 
+start_datetime64 = utils_lib.get_datetime64(start_datetime)
+end_datetime64 = utils_lib.get_datetime64(end_datetime)
+
 delta = date(int(end_year), int(end_month), int(end_day)) - \
         date(int(start_year), int(start_month), int(start_day))
 
@@ -195,11 +224,18 @@ psd_db_dir_tag, psd_db_file_tag = file_lib.get_dir(param.dataDirectory, param.ps
 
 msg_lib.info(f'PSD DIR TAG: {psd_db_dir_tag}')
 
+# The dB bin edges of the PDF count matrices.
+pdf_edges = pdf_lib.get_bin_edges(*param.bins)
+
+# The group PDFs are accumulated over all days, keyed by group and group key.
+group_pdf = {group: dict() for group in param.pdfGroups}
+
 # Loop through the windows.
 for n in range(len(data_day_list)):
     msg_lib.info(f'day {data_day_list[n]}')
     d_file = dict()
     h_file = list()
+    day_pdf = pdf_lib.PdfAccumulator(pdf_edges)
     this_file = os.path.join(psd_db_dir_tag, data_day_list[n], f'{psd_db_file_tag}*{xtype}.txt')
     if verbose:
         msg_lib.info(f'Looking into: {this_file}')
@@ -214,23 +250,31 @@ for n in range(len(data_day_list)):
         if verbose:
             msg_lib.info(f'{len(this_file_list)} files found!')
 
+    # The file start times of the day, parsed at once.
+    file_time_label_list = [file_lib.get_file_times(param.namingConvention, channel, this_psd_file)[0]
+                            for this_psd_file in this_file_list]
+    file_time_list = utils_lib.get_datetime64(file_time_label_list)
+    in_range_list = (start_datetime64 <= file_time_list) & (file_time_list <= end_datetime64)
+    file_time_list = file_time_list.astype(object).tolist()
+
     # Found the file, open it and read it.
-    for this_psd_file in this_file_list:
+    for this_psd_file, this_file_time, in_range in zip(this_file_list, file_time_list, in_range_list):
         if verbose > 0:
             msg_lib.info(f'PSD FILE: {this_psd_file}')
 
-        this_file_time_label = file_lib.get_file_times(param.namingConvention, channel, this_psd_file)
-        this_file_time = UTCDateTime(this_file_time_label[0])
         this_year = this_file_time.strftime("%Y")
+        this_month = this_file_time.strftime("%m")
         this_hour = this_file_time.strftime("%H:%M")
         this_doy = this_file_time.strftime("%j")
-        if start_datetime <= this_file_time <= end_datetime:
+        if in_range:
             with open(this_psd_file) as file:
                 if verbose > 0:
                     msg_lib.info(f'working on ...{this_psd_file}')
 
                 # Skip the Header line.
                 next(file)
+                pdf_x = list()
+                pdf_db = list()
 
                 # Go through individual periods/frequencies.
                 for line in file:
@@ -241,9 +285,12 @@ for n in range(len(data_day_list)):
                     if V.upper() == 'NAN':
                         this_line = f'{this_hour}{param.separator}{X}{param.separator}{param.intNan}'
                         key = f'{X}:{param.intNan}'
+                        pdf_db.append(np.nan)
                     else:
                         this_line = f'{this_hour}{param.separator}{X}{param.separator}{int(round(float(V)))}'
                         key = f'{X}:{int(round(float(V)))}'
+                        pdf_db.append(int(round(float(V))))
+                    pdf_x.append(X)
                     h_file.append(this_line)
                     if key in d_file.keys():
                         d_file[key] += 1
@@ -252,19 +299,45 @@ for n in range(len(data_day_list)):
 
             file.close()
 
+            # Bin the file once and add it to the daily PDF and the PDF groups it belongs to.
+            file_pdf = pdf_lib.PdfAccumulator(pdf_edges)
+            file_pdf.add(pdf_x, pdf_db)
+            day_pdf.merge(file_pdf)
+            for group in group_pdf:
+                key = pdf_lib.group_key(group, this_file_time, param.localHourOffset)
+                if key not in group_pdf[group]:
+                    group_pdf[group][key] = pdf_lib.PdfAccumulator(pdf_edges)
+                group_pdf[group][key].merge(file_pdf)
+
     # Open the output file.
     pdf_dir_tag, pdf_file_tag = file_lib.get_dir(param.dataDirectory, param.pdfDirectory, network,
                                                  station, location, channel)
     file_lib.make_path(pdf_dir_tag)
     this_path = os.path.join(pdf_dir_tag, f'Y{this_year}')
     file_lib.make_path(this_path)
-    output_file = os.path.join(this_path, f'D{this_doy}.bin')
-    msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
-    with open(output_file, 'w') as output_file:
-        for key in sorted(d_file.keys()):
-            day, db = key.split(':')
-            output_file.write(f'{day}{param.separator}{db}{param.separator}{d_file[key]}\n')
-    output_file.close()
+    if param.pdfDailyFormat == 'text':
+        output_file = os.path.join(this_path, f'D{this_doy}.bin')
+        msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
+        with open(output_file, 'w') as output_file:
+            for key in sorted(d_file.keys()):
+                day, db = key.split(':')
+                output_file.write(f'{day}{param.separator}{db}{param.separator}{d_file[key]}\n')
+        output_file.close()
+
+    # Save the daily count matrix and update the monthly and yearly rollups, the store is kept per x-axis type.
+    if param.pdfStoreSave > 0:
+        store_path = pdf_lib.store_directory(pdf_dir_tag, this_year, xtype)
+        file_lib.make_path(store_path)
+        try:
+            store_file = pdf_lib.save_day(store_path, this_year, this_month, this_doy, day_pdf)
+        except Exception as ex:
+            code = msg_lib.error(f'failed to update the PDF store under {store_path}\n{ex}', 3)
+            sys.exit(code)
+        msg_lib.info(f'DAILY STORE FILE: {store_file}')
+    if param.pdfDailyFormat == 'sparse':
+        output_file = pdf_lib.day_file_name(this_path, this_doy)
+        msg_lib.info(f'DAILY OUTPUT FILE: {output_file}')
+        day_pdf.save(output_file)
 
     if param.pdfHourlySave > 0:
         this_path = os.path.join(this_path, param.pdfHourlyDirectory)
@@ -278,3 +351,20 @@ for n in range(len(data_day_list)):
     else:
         output_file.write(f'Hourly PSD save option turned off')
 
+
+# Output the group PDFs.
+if group_pdf:
+    pdf_dir_tag, pdf_file_tag = file_lib.get_dir(param.dataDirectory, param.pdfDirectory, network,
+                                                 station, location, channel)
+for group in group_pdf:
+    this_path = os.path.join(pdf_dir_tag, param.pdfGroupDirectory, group)
+    file_lib.make_path(this_path)
+    for key in sorted(group_pdf[group]):
+        output_file = file_lib.get_file_name(param.namingConvention, this_path,
+                                             [pdf_file_tag, start_date_time, end_date_time, group, key])
+        if param.pdfDailyFormat == 'sparse':
+            output_file = f'{os.path.splitext(output_file)[0]}.{pdf_lib.STORE_EXTENSION}'
+            group_pdf[group][key].save(output_file)
+        else:
+            group_pdf[group][key].write(output_file, param.separator, nonzero_only=True, integer_edges=True)
+        msg_lib.info(f'GROUP OUTPUT FILE: {output_file}')
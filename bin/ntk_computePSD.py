@@ -31,6 +31,7 @@ import staLib  as sta_lib
 import sfLib as sf_lib
 import tsLib as ts_lib
 import utilsLib as utils_lib
+import powerLib as power_lib
 import shared as shared
 
 """
@@ -54,6 +55,7 @@ import shared as shared
     along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
  History:
+    2026-10-19 IRIS DMC Product Team: optional band power output integrated directly from the corrected spectra
     2023-07-05 Manoch: v.2.1.1 Addresses an issue with "noverlap" argument of csd not being an integer.
     2021-08-31 Manoch: v.2.1.0 This patch addresses the output file naming issue when data were read from files.
                        The bug was causing output to be written under the same file name. This patch also adds the 
@@ -159,6 +161,12 @@ def usage():
           f'\n\t\tnet.sta.loc.chan.start.window-length.xtype.txt'
           f'\n\tfor example:'
           f'\n\t\tNM.SLM.--.BHZ.2009-03-24T23:30:00.3600.period.txt'
+          f'\n\n\tWith the outputPower parameter set, the band powers of each window are also integrated directly '
+          f'from the response-corrected spectrum over the bands of the computePower parameter file and written '
+          f'in the ntk_computePower.py output format to a file of the form:'
+          f'\n\t\tnet.sta.loc.chan.start.end.txt'
+          f'\n\tunder the {param.powerDirectory} directory. With outputValues and plot turned off, the PSDs are not '
+          f'smoothed.'
           f'\n\nExamples:'
           f'\n\n\t- usage:'
           f'\n\tpython {script}'
@@ -302,6 +310,15 @@ else:
     msg_lib.info('[INFO] data and metadata from files')
     response_directory = utils_lib.param(param, 'respDirectory').respDirectory
 
+# Band power output, band powers are integrated from the corrected spectra with the frequency band masks of
+# each FFT length and sampling interval computed once.
+output_power = utils_lib.param(param, 'outputPower').outputPower > 0
+power_bins = utils_lib.param(param, 'bins').bins
+power_bin_start = [utils_lib.param(param, 'binStart').binStart[_bin] for _bin in power_bins]
+power_bin_end = [utils_lib.param(param, 'binEnd').binEnd[_bin] for _bin in power_bins]
+power_weights = dict()
+power_files = dict()
+
 # Keep track of what you are doing.
 action = str()
 
@@ -627,50 +644,78 @@ for _key in cat:
 
             power = power / (np.abs(resp) ** 2)
 
+            trace_time = tr.stats.starttime
+            # Avoid file names with 59.59.
+            trace_time += datetime.timedelta(microseconds=10)
+            time_label = trace_time.strftime('%Y-%m-%dT%H:%M:%S')
+
+            # Band powers, Parseval integration of the corrected spectrum over the band frequencies.
+            if output_power:
+                weight_key = (nfft, delta)
+                if weight_key not in power_weights:
+                    power_weights[weight_key] = power_lib.parseval_weights(freq, 1.0 / (nfft * delta),
+                                                                           power_bin_start, power_bin_end)
+                if traceKey not in power_files:
+                    power_path, power_file_tag = file_lib.get_dir(data_directory,
+                                                                  utils_lib.param(param,
+                                                                                  'powerDirectory').powerDirectory,
+                                                                  network, station, location, channel)
+                    file_lib.make_path(power_path)
+                    power_file_name = file_lib.get_file_name(utils_lib.param(
+                        param, 'namingConvention').namingConvention, power_path,
+                        [power_file_tag, request_start_date_time, request_end_date_time])
+                    msg_lib.message(f'OUTPUT: writing band powers to {power_file_name}')
+                    power_files[traceKey] = open(power_file_name, 'w')
+                    power_lib.write_header(power_files[traceKey], power_bins, power_bin_start, power_bin_end)
+                power_date, power_time = time_label.split('T')
+                power_lib.write_power(power_files[traceKey], power_date, power_time,
+                                      power_weights[weight_key] @ power)
+
             smooth_x = []
             smooth_psd = []
 
-            # Smoothing.
-            if timing:
-                t0 = utils_lib.time_it('start SMOOTHING ', t0)
-
-            msg_lib.info(f'SMOOTHING window {octave_window_width} shift '
-                         f'{octave_window_shift}')
-            if xtype == 'period':
-                #
-                if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
-                    smooth_x, smooth_psd = sf_lib.smooth_nyquist(xtype, period, power, sampling_frequency,
-                                                                 octave_window_width,
-                                                                 octave_window_shift,
-                                                                 utils_lib.param(param, 'maxT').maxT)
-                else:
-                    smooth_x, smooth_psd = sf_lib.smooth_period(period, power, sampling_frequency,
-                                                                octave_window_width,
-                                                                octave_window_shift,
-                                                                utils_lib.param(param, 'maxT').maxT,
-                                                                float(utils_lib.param(param, 'xStart').xStart[
-                                                                          plot_index]))
-            else:
-                frequency = np.array(np.arange(1, (nfft / 2) + 1) / float(nfft * delta))
+            # Smoothing, only needed for the PSD output and plots.
+            if utils_lib.param(param, 'outputValues').outputValues > 0 or do_plot:
+                if timing:
+                    t0 = utils_lib.time_it('start SMOOTHING ', t0)
 
-                if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
-                    smooth_x, smooth_psd = sf_lib.smooth_nyquist(xtype, frequency, power, sampling_frequency,
-                                                                 octave_window_width,
-                                                                 octave_window_shift,
-                                                                 min_frequency)
+                msg_lib.info(f'SMOOTHING window {octave_window_width} shift '
+                             f'{octave_window_shift}')
+                if xtype == 'period':
+                    #
+                    if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
+                        smooth_x, smooth_psd = sf_lib.smooth_nyquist(xtype, period, power, sampling_frequency,
+                                                                     octave_window_width,
+                                                                     octave_window_shift,
+                                                                     utils_lib.param(param, 'maxT').maxT)
+                    else:
+                        smooth_x, smooth_psd = sf_lib.smooth_period(period, power, sampling_frequency,
+                                                                    octave_window_width,
+                                                                    octave_window_shift,
+                                                                    utils_lib.param(param, 'maxT').maxT,
+                                                                    float(utils_lib.param(param, 'xStart').xStart[
+                                                                              plot_index]))
                 else:
-                    smooth_x, smooth_psd = sf_lib.smooth_frequency(frequency, power, sampling_frequency,
-                                                                   octave_window_width,
-                                                                   octave_window_shift,
-                                                                   min_frequency,
-                                                                   float(
-                                                                       utils_lib.param(param, 'xStart').xStart[
-                                                                           plot_index]))
-
-            if timing:
-                t0 = utils_lib.time_it(
-                    f'SMOOTHING window {octave_window_width} shift '
-                    f'{octave_window_shift} DONE', t0)
+                    frequency = np.array(np.arange(1, (nfft / 2) + 1) / float(nfft * delta))
+
+                    if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
+                        smooth_x, smooth_psd = sf_lib.smooth_nyquist(xtype, frequency, power, sampling_frequency,
+                                                                     octave_window_width,
+                                                                     octave_window_shift,
+                                                                     min_frequency)
+                    else:
+                        smooth_x, smooth_psd = sf_lib.smooth_frequency(frequency, power, sampling_frequency,
+                                                                       octave_window_width,
+                                                                       octave_window_shift,
+                                                                       min_frequency,
+                                                                       float(
+                                                                           utils_lib.param(param, 'xStart').xStart[
+                                                                               plot_index]))
+
+                if timing:
+                    t0 = utils_lib.time_it(
+                        f'SMOOTHING window {octave_window_width} shift '
+                        f'{octave_window_shift} DONE', t0)
 
             # get the response information
 
@@ -698,10 +743,6 @@ for _key in cat:
                                  f'SAMPLES: '
                                  f'{int(window_length / float(tr.stats.delta) + 1)} ')
 
-                trace_time = tr.stats.starttime
-                # Avoid file names with 59.59.
-                trace_time += datetime.timedelta(microseconds=10)
-                time_label = trace_time.strftime('%Y-%m-%dT%H:%M:%S')
                 tagList = [psd_file_tag, time_label,
                            f'{window_length}', xtype]
                 output_file_name = file_lib.get_file_name(utils_lib.param(
@@ -789,5 +830,8 @@ for _key in cat:
                 x, y = shared.production_label_position
                 ax311.legend(frameon=False, prop={'size': 6})
                 plt.show()
+for traceKey in power_files:
+    power_files[traceKey].close()
+
 t0 = t1
 t0 = utils_lib.time_it('END', t0)
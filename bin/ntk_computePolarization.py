@@ -3,10 +3,10 @@
 import os
 import sys
 import importlib
+import multiprocessing
 
 import matplotlib.pyplot as plt
 import numpy as np
-from numpy import linalg as eigen
 
 import math
 from obspy.core import UTCDateTime
@@ -56,6 +56,18 @@ import sfLib as sf_lib
 
   HISTORY:
     
+    2026-10-19 IRIS DMC Product Team: responseDomain=frequency deconvolves the whole window with the cached
+                                      response spectrum, no leakage from the per segment correction
+    2026-10-19 IRIS DMC Product Team: psd=1 also writes the channel PSDs from the spectral covariance matrices
+    2026-10-19 IRIS DMC Product Team: optional binary polarization DB output (polarDbFormat)
+    2026-10-19 IRIS DMC Product Team: workers=N processes the windows in a pool of worker processes
+    2026-10-19 IRIS DMC Product Team: optional frequency domain response removal (responseDomain)
+    2026-10-19 IRIS DMC Product Team: optional spectral covariance archive output (outputCovariance)
+    2026-10-19 IRIS DMC Product Team: sw_matrix=1 smooths the spectral matrices and solves only at the smoothing centers
+    2026-10-19 IRIS DMC Product Team: one batched FFT of all segments and an einsum spectral matrix
+    2026-10-19 IRIS DMC Product Team: results go to a preallocated (variables x frequencies) buffer, no np.append
+    2026-10-19 IRIS DMC Product Team: polarization angles of all frequencies computed at once
+    2026-10-19 IRIS DMC Product Team: one stacked Hermitian eigendecomposition of all the spectral matrices
     2023-05-23 Manoch: v.2.1.1 Addressing the issue where some traces are rejected based on the end-start length.
                        We are now selecting the start of traces based on the earliest start times in the stream.
     2021-08-31 Manoch: v.2.1.0 This patch addresses the output file naming issue when data were read from files.
@@ -132,8 +144,8 @@ def usage():
           f'\n\nUsage:\n\t{script} to display the usage message (this message)'
           f'\n\t  OR'
           f'\n\t{script} param=FileName client=[FDSN|FILES] net=network sta=station loc=location chan=channel(s)'
-          f' start=YYYY-MM-DDTHH:MM:SS end=YYYY-MM-DDTHH:MM:SS xtype=[period|frequency] plot=[0|1] verbose=[0|1]'
-          f' timing=[0|1]\n'
+          f' start=YYYY-MM-DDTHH:MM:SS end=YYYY-MM-DDTHH:MM:SS xtype=[period|frequency] sw_matrix=[0|1] plot=[0|1]'
+          f' workers=N psd=[0|1] verbose=[0|1] timing=[0|1]\n'
           f'\n\tto perform computations where:'
           f'\n\t  param\t\t[default: {default_param_file}] the configuration file name '
           f'\n\t  client\t[default: {param.requestClient}] client to use to make data/metadata requests '
@@ -155,6 +167,15 @@ def usage():
           f'\n\t  sw_shift\t[default: '
           f'{param.octaveWindowShift}'
           f'] Smoothing window shift in fraction of octave'
+          f'\n\t  sw_matrix\t[0 or 1, default: {param.smoothMatrix}] set to 1 to smooth the spectral covariance '
+          f'matrices and run the eigen-analysis only at the smoothing centers (faster, see param/{default_param_file}.py)'
+          f'\n\t  workers\t[default: {param.workers}] number of worker processes, windows are processed in '
+          f'parallel when greater than 1 (output files are the same as with 1, not used in plot mode or on '
+          f'platforms without the fork start method, such as Windows)'
+          f'\n\t  psd\t\t[0 or 1, default: {param.outputPsd}] set to 1 to also write the PSDs of the channels '
+          f'(diagonal of the spectral covariance matrices) to the PSD Database directory '
+          f'(data/{param.psdDbDirectory}/) in the ntk_computePSD.py format, the data are requested and transformed '
+          f'only once for both outputs'
           f'\n\t  plot\t\t[0 or 1, default: {param.plot}] to run in plot mode set to 1'
           f'\n\t  plotnm\t[0 or 1, default {param.plotNm}] plot the New High/Low Noise Models [0|1]'
           f'\n\t  timing\t[0 or 1, default: {param.timing}] to run in timing mode (set to 1 to output run times for '
@@ -249,6 +270,39 @@ octave_window_width = float(utils_lib.get_param(args, 'sw_width',
                                                 utils_lib.param(param, 'octaveWindowWidth').octaveWindowWidth, usage))
 octave_window_shift = float(utils_lib.get_param(args, 'sw_shift',
                                                 utils_lib.param(param, 'octaveWindowShift').octaveWindowShift, usage))
+smooth_matrix = utils_lib.is_true(utils_lib.get_param(args, 'sw_matrix',
+                                                     utils_lib.param(param, 'smoothMatrix').smoothMatrix, usage))
+
+# Number of worker processes for the windows. The workers are forked, they share the data with this process
+# without copying it. Without fork (Windows) or when plotting, the windows are processed serially.
+workers = int(utils_lib.get_param(args, 'workers', utils_lib.param(param, 'workers').workers, usage))
+if workers > 1 and do_plot:
+    msg_lib.warning(script, f'workers={workers} is not used in plot mode, the windows are processed serially')
+    workers = 1
+elif workers > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+    msg_lib.warning(script, f'workers={workers} needs the fork start method of the worker processes that is not '
+                            f'available on this platform, the windows are processed serially')
+    workers = 1
+
+# Combined mode, also output the PSDs of the channels?
+output_psd = utils_lib.is_true(utils_lib.get_param(args, 'psd', utils_lib.param(param, 'outputPsd').outputPsd, usage))
+
+# Remove the instrument response with ObsPy (time) or with the cached response spectra (frequency)?
+response_domain = utils_lib.param(param, 'responseDomain').responseDomain
+if response_domain not in ('time', 'frequency'):
+    code = msg_lib.error(f'{script}, Invalid responseDomain  [{response_domain}] in the parameter file, '
+                         f'must be time or frequency', 2)
+    sys.exit(code)
+
+# Polarization DB format of the output values.
+polar_db_format = utils_lib.param(param, 'polarDbFormat').polarDbFormat
+if polar_db_format not in polar_lib.POLAR_DB_FORMATS:
+    code = msg_lib.error(f'{script}, Invalid polarDbFormat  [{polar_db_format}] in the parameter file, '
+                         f'must be one of {polar_lib.POLAR_DB_FORMATS}', 2)
+    sys.exit(code)
+
+# Inverse response spectra of the frequency domain response removal, by channel, response and FFT length.
+response_cache = dict()
 
 from_file_only = utils_lib.param(param, 'fromFileOnly').fromFileOnly
 request_client = utils_lib.get_param(args, 'client',
@@ -430,6 +484,587 @@ production_label = f'{production_label} {script} {version}'
 production_label = f'{production_label} {production_date} UTC'
 production_label = f'{production_label} doi:{shared.ntk_doi}'
 
+
+def process_window(_ind, t_step, min_starttime, min_endtime):
+    """Process the window that starts t_step seconds after min_starttime and write its output files.
+
+       With the FILES client the window data are read here, otherwise the window is sliced from the
+       stream of the data center request. With the binary polarization DB, the window is not written here but
+       returned as (file name, window start time, x-values, values, x_units, power_units) for
+       save_polar_windows, None is returned otherwise."""
+    global give_warning
+    polar_window = None
+    t0 = time()
+    window_stream = stream
+    if timing:
+        t0 = utils_lib.time_it('start WINDOW', t0)
+    t_start = min_starttime + t_step
+    t_end = t_start + window_length
+    if verbose:
+        msg_lib.info(f'{_ind}.{t_step}++++Duration: {int(duration)}, '
+                     f'Window shift: { int(utils_lib.param(param, "windowShift").windowShift)}, '
+                     f't_step: {t_step}, min_starttime: {min_starttime}, t_star: {t_start}, '
+                     f'window_length: {window_length}, t_end: {t_end}, min_endtime: {min_endtime}')
+
+    if t_end > min_endtime:
+        t_end = min_endtime
+        if verbose:
+            msg_lib.info(f'{_ind}.{t_step}++++Adjusted: t_end: {t_end}, with t_star: {t_start}')
+
+    t_diff = t_end - t_start
+    #if not np.isclose(t_diff, window_length, rtol=1e-05, atol=1e-08, equal_nan=False):
+    if round(t_diff) != round(window_length):
+        if give_warning:
+            msg_lib.warning(script, f'Interval from {t_start} to {t_end} is {t_diff} s and is shorter than the '
+                                    f'windowLength parameter {window_length} seconds, will skip.')
+            give_warning = False
+        return
+    segment_start = t_start.strftime('%Y-%m-%d %H:%M:%S.0')
+    segment_start_year = t_start.strftime('%Y')
+    segment_start_doy = t_start.strftime('%j')
+    segment_end = t_end.strftime('%Y-%m-%d %H:%M:%S.0')
+    title = f'{file_lib.get_tag(".", [request_network, request_station, request_location])} {request_channel} ' \
+            f'from {segment_start} to {segment_end}'
+
+    if param.doSmoothing:
+        title = f'{title}\nSmoothing window width {octave_window_width} octave; shift {octave_window_shift} octave'
+
+    msg_lib.message(title)
+    if request_client == 'FILES':
+        file_tag = file_lib.get_tag(".", [request_network, request_station, request_location, request_channel])
+        msg_lib.info(f'Reading '
+                     f'{file_tag} '
+                     f'from {segment_start} to {segment_end} '
+                     f'from {utils_lib.param(param, "requestClient").requestClient}')
+    else:
+        file_tag = file_lib.get_tag(".", [request_network, request_station, request_location, request_channel])
+        msg_lib.info(f'Requesting '
+                     f'{file_tag} '
+                     f'from {segment_start} to {segment_end} '
+                     f'from {utils_lib.param(param, "requestClient").requestClient}')
+
+    # Read from files but request response via Files and/or WS.
+    if request_client == 'FILES':
+        useClient = client
+        if not internet:
+            useClient = None
+        inventory, window_stream = ts_lib.get_channel_waveform_files(request_network, request_station,
+                                                                     request_location, request_channel,
+                                                                     segment_start, segment_end, useClient,
+                                                                     utils_lib.param(param, 'fileTag').fileTag,
+                                                                     resp_dir=response_directory)
+    msg_lib.message(f'Stream before the slice {window_stream}')
+
+    st = window_stream.slice(starttime=t_start, endtime=t_end, keep_empty_traces=False, nearest_sample=True)
+    msg_lib.message(f'Stream after slicing between {t_start} and {t_end}\n {st}')
+
+    # Did we manage to get the data?
+    if st is None or not st:
+        msg_lib.warning('Channel Waveform', f'No data available for '
+                                            f'{request_network}.{request_station}.{request_location}.'
+                                            f'{request_channel}')
+        return
+    else:
+        st_starttime = min([tr.stats.starttime for tr in st])
+        st_endtime = max([tr.stats.endtime for tr in st])
+        if request_start_datetime >= st_endtime or request_end_datetime <= st_starttime:
+            msg_lib.warning(script, f'Stream time from {st_starttime} to {st_endtime} is outside the '
+                                    f'request window {request_start_datetime} to {request_end_datetime}')
+            return
+        else:
+            qc_records = ts_lib.qc_3c_stream(st, param.windowLength,
+                                             utils_lib.param(param, 'nSegWindow').nSegWindow,
+                                             sorted_channel_list, param.channelGroups, verbose)
+        if verbose:
+            msg_lib.info(f'{script}, stream length: {len(st)}s')
+            msg_lib.info(f'{script}, QC-passed records: {qc_records}')
+
+    trace_key_List = list()
+    traceChannel = [None, None, None]
+    channel = [None, None, None]
+    num_points = [None, None, None]
+
+    # For stream_index in qc_records:
+    stChannel = None
+    channel_tr = list()
+    channel = list()
+
+    # Get traces for the 3 channels.
+    for _i in qc_records:
+        channel_tr.append(st[_i])
+        channel.append(channel_tr[-1].stats.channel)
+    if not channel_tr:
+        return
+    # Correct for instrument response.
+    for _i in range(len(channel_tr)):
+        try:
+            if param.demean:
+                channel_tr[_i].detrend("demean")
+
+            # Remove the instrument response?
+            if param.performInstrumentCorrection and response_domain == 'frequency':
+                msg_lib.info(f'Removing response from {channel[_i]} with the cached response spectrum')
+                if param.deconFilter1 <= 0 and param.deconFilter2 <= 0 \
+                        and param.deconFilter3 <= 0 and param.deconFilter4 <= 0:
+                    pre_filt = None
+                else:
+                    pre_filt = param.deconFilter
+                response = channel_tr[_i].stats.response
+                nfft = ts_lib.response_nfft(len(channel_tr[_i].data))
+                response_key = (channel_tr[_i].id, channel_tr[_i].stats.delta, nfft, str(response))
+                if response_key not in response_cache:
+                    msg_lib.info(f'Evaluating the {channel[_i]} response for {nfft} samples')
+                    response_cache[response_key] = ts_lib.get_inverse_response(response, channel_tr[_i].stats.delta,
+                                                                               nfft, param.unit, pre_filt,
+                                                                               param.waterLevel)
+                channel_tr[_i].data = ts_lib.remove_response(channel_tr[_i].data, response_cache[response_key])
+            elif param.performInstrumentCorrection:
+                msg_lib.info(f'Removing response from {channel[_i]}')
+                if param.deconFilter1 <= 0 and param.deconFilter2 <= 0 \
+                        and param.deconFilter3 <= 0 and param.deconFilter4 <= 0:
+                    msg_lib.info(f'NO DECON FILTER APPLIED')
+                    channel_tr[_i].remove_response(output=param.unit, pre_filt=None, taper=False, zero_mean=False,
+                                                   water_level=param.waterLevel)
+                else:
+                    msg_lib.info(f'DECON FILTER {param.deconFilter} APPLIED')
+                    channel_tr[_i].remove_response(output=param.unit,
+                                                   pre_filt=param.deconFilter,
+                                                   taper=False, zero_mean=False, water_level=param.waterLevel)
+            # Do not remove the instrument response but apply the sensitivity.
+            elif param.applyScale:
+                msg_lib.info(f'Not removing response from {channel[_i]} but applying sensitivity '
+                             f'{channel_tr[_i].stats.response.instrument_sensitivity.value}')
+                channel_tr[_i].data /= float(channel_tr[_i].stats.response.instrument_sensitivity.value)
+
+        except Exception as ex:
+            code = msg_lib.error(f'Removing response from {channel[_i]} failed: {ex}', 4)
+            sys.exit(code)
+
+    t0 = utils_lib.time_it('Removed response', t0)
+
+    # net, sta, loc should be the same, get them from the 1st channel.
+    network = channel_tr[0].stats.network
+    station = channel_tr[0].stats.station
+    location = sta_lib.get_location(channel_tr[0].stats.location)
+
+    if verbose:
+        msg_lib.info(f'{script}, received: CHANNEL 1 {channel_tr[0].stats}')
+        msg_lib.info(f'{script}, received: CHANNEL 2 {channel_tr[1].stats}')
+        msg_lib.info(f'{script}, received: CHANNEL 3 {channel_tr[2].stats}')
+
+    power_units = utils_lib.param(param, 'powerUnits').powerUnits[
+        channel_tr[0].stats.response.instrument_sensitivity.input_units.upper()]
+
+    x_units = utils_lib.param(param, 'xlabel').xlabel[xtype.lower()]
+    header = utils_lib.param(param, 'header').header[xtype.lower()]
+
+    # Create a or each channel.
+    trace_key_1 = file_lib.get_tag(".", [network, station, location, channel[0]])
+    trace_key_2 = file_lib.get_tag(".", [network, station, location, channel[1]])
+    trace_key_3 = file_lib.get_tag(".", [network, station, location, channel[2]])
+    channelTag = '_'.join([channel[0], channel[1], channel[2]])
+
+    if verbose:
+        msg_lib.info(f'{script}, processing {trace_key_1}, {trace_key_2}, {trace_key_3}')
+
+    if timing:
+        t0 = utils_lib.time_it('got WAVEFORM', t0)
+
+    # Get the shortest trace length.
+    num_points = np.min([channel_tr[0].stats.npts, channel_tr[1].stats.npts, channel_tr[2].stats.npts])
+
+    # Sampling should be the same, get it from the 1st channel.
+    sampling_frequency = channel_tr[0].stats.sampling_rate
+    delta = float(channel_tr[0].stats.delta)
+
+    # Construct the time array.
+    trace_time = np.arange(num_points) / sampling_frequency
+
+    if timing:
+        t0 = utils_lib.time_it('build trace time', t0)
+
+    if verbose:
+        msg_lib.info(f'{script}, got number of points as {num_points}')
+        msg_lib.info(f'{script}, got sampling frequency as {sampling_frequency}')
+        msg_lib.info(f'{script}, got sampling interval as {delta}')
+        msg_lib.info(f'{script}, got time as {trace_time}')
+
+    # Calculate FFT parameters
+    # Number of samples per window is obtained by dividing the total number of samples
+    # by the number of side-by-side time windows along the trace
+
+    # First calculate the number of points needed based on the run parameters.
+    this_num_sample = int((float(utils_lib.param(param, 'windowLength').windowLength) / delta + 1) /
+                          utils_lib.param(param, 'nSegWindow').nSegWindow)
+    num_samples_needed = 2 ** int(math.log(this_num_sample, 2))  # make sure it is power of 2
+    msg_lib.info(f'{script}, num_samples Needed: {num_samples_needed}')
+
+    # Next calculate the number of points needed based on the trace parameters.
+    this_num_sample = int(num_points / utils_lib.param(param, 'nSegWindow').nSegWindow)
+
+    # Avoid log of bad numbers.
+    if this_num_sample <= 0:
+        msg_lib.warning('FFT',
+                        f'needed {num_samples_needed} samples but no samples are available, will skip this trace')
+        return
+    num_samples = 2 ** int(math.log(this_num_sample, 2))  # make sure it is power of 2
+    msg_lib.info(f'{script}, num_samples Available: {num_samples}')
+
+    if num_samples < num_samples_needed:
+        msg_lib.warning("FFT", f'needed {num_samples_needed} samples but only {num_samples}'
+                               f' samples are available, will skip this trace')
+        return
+
+    n_shift = int(num_samples * (1.0 - float(utils_lib.param(param, 'percentOverlap').percentOverlap) / 100.0))
+
+    if verbose:
+        msg_lib.info(f'{script}, FFT param.nSegWindow, num_samples,n_shift: '
+                     f'{utils_lib.param(param, "nSegWindow").nSegWindow}, {num_samples}, {n_shift}')
+
+    # The spectra length is half of the num_samples + 1, as data are real and
+    # and we only need the positive frequency portion
+    spec_length = int(num_samples / 2) + 1
+
+    # Build the tapering window.
+    action = "taper"
+    taper_window = np.hanning(num_samples)
+
+    if verbose:
+        msg_lib.info(f'{script}, num_samples: {num_samples}')
+        msg_lib.info(f'{script}, DELTA: {delta}')
+
+    # Extract the segments
+    # using Welch's method. Segments are length num_samples with each segment
+    # int(num_samples * (1.0-(param.percentOverlap / 100))) units apart. All segments of the three channels
+    # are one strided (3, segments, num_samples) view of the data.
+    action = "extract the segments"
+    if timing:
+        t0 = utils_lib.time_it('start SEGMENTS ', t0)
+    channel_data = np.array([channel_tr[0].data[0:num_points], channel_tr[1].data[0:num_points],
+                             channel_tr[2].data[0:num_points]], dtype=float)
+    channel_segments = polar_lib.segment_view(channel_data, num_samples, n_shift,
+                                              utils_lib.param(param, 'nSegments').nSegments)
+    segments_count = channel_segments.shape[1]
+    if segments_count < utils_lib.param(param, 'nSegments').nSegments:
+        end_index = segments_count * n_shift + num_samples
+        code = msg_lib.error(f'{script}, failed to extract segment from location {end_index - num_samples} '
+                             f'to {end_index}, only {num_points} samples available', 4)
+        sys.exit(code)
+
+    # Remove the mean and apply the taper.
+    action = "remove mean and apply the taper"
+    channel_segments = polar_lib.taper_segments(channel_segments, taper_window)
+
+    # Plot the waveform and the selected segments.
+    if utils_lib.param(param, 'plotTraces').plotTraces > 0 and do_plot > 0:
+        action = "Plot"
+        for n in range(0, segments_count):
+            start_index = n * n_shift
+            time_segment = trace_time[start_index:start_index + num_samples]
+            for _i, _subplot in enumerate([311, 312, 313]):
+                plt.subplot(_subplot)
+                plt.plot(trace_time, channel_tr[_i].data, utils_lib.param(param, 'colorTrace').colorTrace)
+                plt.plot(time_segment, channel_segments[_i, n],
+                         utils_lib.param(param, 'colorSmooth').colorSmooth)
+                plt.ylabel(f'{channel[_i]} [{param.unitLabel}]', fontsize=6)
+                plt.xlim(0, utils_lib.param(param, 'windowLength').windowLength)
+                plt.xlabel('Time [s]')
+
+            plt.show()
+
+    # FFT
+    # data values are real, so the output of FFT is Hermitian symmetric,
+    # i.e. the negative frequency terms are just the complex conjugates of
+    # the corresponding positive-frequency terms
+    # We only need the first half, so doing np.fft.rfft is more efficient.
+    # One batched FFT of all segments and the average spectral covariance matrices
+    # of all frequencies as a (spec_length, 3, 3) stack, they are complex hermitian matrices.
+    if timing:
+        t0 = utils_lib.time_it('start FFT ', t0)
+    action = "average the spectra matrix"
+    spectra_matrix = polar_lib.spectral_matrix(channel_segments)
+    if timing:
+        t0 = utils_lib.time_it('got POWER ', t0)
+
+    # To convert FFT to  average spectral covariance matrix
+    norm = 4.0 * delta / float(num_samples)
+
+    if verbose:
+        msg_lib.info(f'{script}, DELTA: {delta}')
+        msg_lib.info(f'{script}, num_samples: {num_samples}')
+        msg_lib.info(f'{script}, NORM: {norm}')
+
+    msg_lib.info(f'{script}, DELTA: {delta}')
+    msg_lib.info(f'{script}, segments_count: {segments_count}')
+
+    # If power is not populated, skip LOOP WINDOW or this 1 -hour window
+    if segments_count <= 0:
+        return
+
+    # Store the window-averaged spectral covariance matrices in the covariance archive.
+    if utils_lib.param(param, 'outputCovariance').outputCovariance > 0:
+        action = "store the spectral covariance matrices"
+        file_path, covariance_file_tag = file_lib.get_dir(utils_lib.param(param, 'dataDirectory').dataDirectory,
+                                                          utils_lib.param(param,
+                                                                          'polarCovDirectory').polarCovDirectory,
+                                                          network, station, location, channelTag)
+        file_path = os.path.join(file_path, segment_start_year, segment_start_doy)
+        utils_lib.mkdir(file_path)
+        channel_time = channel_tr[0].stats.starttime
+        # Avoid file names with 59.59.
+        channel_time += datetime.timedelta(microseconds=10)
+        tag_list = [covariance_file_tag, channel_time.strftime("%Y-%m-%dT%H:%M:%S"), f'{param.windowLength}']
+        file_name = polar_lib.covariance_file_name(
+            file_lib.get_file_name(utils_lib.param(param, 'namingConvention').namingConvention, file_path,
+                                   tag_list))
+        msg_lib.message(f'OUTPUT: {file_name}')
+        try:
+            polar_lib.save_covariance(file_name, spectra_matrix, sampling_frequency, delta, num_samples,
+                                      segments_count, power_units, channel)
+        except Exception as ex:
+            code = msg_lib.error(f'failed to write {file_name}: {ex}', 4)
+            sys.exit(code)
+
+    # One preallocated (variables x spec_length) buffer, variable[var] are its row views.
+    variable_values, variable = polar_lib.variable_buffer(param.variables, spec_length)
+
+    # Eigen-analysis of all frequencies, one stacked Hermitian eigendecomposition of the spectral matrices.
+    # With smoothing of the spectral matrices, only needed to plot the spectra.
+    if timing:
+        t0 = utils_lib.time_it('start EIGEN ', t0)
+    action = "eigen.eigenvalues"
+    matrix_smoothing = param.doSmoothing and smooth_matrix
+    if not matrix_smoothing or (utils_lib.param(param, 'plotSpectra').plotSpectra > 0 and do_plot > 0):
+        polar_lib.polarization_variables(variable, spectra_matrix, norm)
+    else:
+        variable_values[:] = np.nan
+    if timing:
+        t0 = utils_lib.time_it('EIGEN done ', t0)
+
+    # Smoothing.
+    if timing:
+        t0 = utils_lib.time_it('start SMOOTHING ', t0)
+
+    if param.doSmoothing:
+        msg_lib.info(f'{script}, SMOOTHING window: {octave_window_width}/{octave_window_shift} octave')
+    else:
+        msg_lib.info(f'{script}, SMOOTHING is off')
+
+    x_values, x_limit = polar_lib.x_axis(xtype, spec_length, num_samples, delta, max_period, min_frequency)
+
+    if matrix_smoothing:
+        # Eigen-analysis only at the smoothing centers.
+        smooth_x, smooth = \
+            polar_lib.smooth_polarization(param.variables, xtype, x_values, spectra_matrix, norm,
+                                          sampling_frequency, octave_window_width, octave_window_shift,
+                                          x_limit, utils_lib.param(param, 'xStart').xStart[plot_index])
+    elif param.doSmoothing:
+        smooth_x, smooth = \
+            polar_lib.smooth_variables(variable, xtype, x_values, sampling_frequency, octave_window_width,
+                                       octave_window_shift, x_limit,
+                                       utils_lib.param(param, 'xStart').xStart[plot_index])
+    else:
+        smooth_x = x_values
+        smooth = dict(variable)
+    if timing:
+        t0 = utils_lib.time_it(f'SMOOTHING window {octave_window_width}, {octave_window_shift,} DONE', t0)
+
+    # Convert to dB.
+    polar_lib.power_to_db(variable)
+    polar_lib.power_to_db(smooth)
+
+    # Create output paths if they do not exist.
+    if utils_lib.param(param, 'outputValues').outputValues > 0:
+        file_path, psd_file_tag = file_lib.get_dir(utils_lib.param(param, 'dataDirectory').dataDirectory,
+                                                   utils_lib.param(param, 'polarDbDirectory').polarDbDirectory,
+                                                   network, station, location, channelTag)
+        file_path = os.path.join(file_path, segment_start_year, segment_start_doy)
+        utils_lib.mkdir(file_path)
+
+        # Output is based on the xtype.
+        if verbose:
+            msg_lib.info(f'tr_channel_.stats: {channel_tr[0].stats} '
+                         f'REQUEST: {segment_start} '
+                         f'TRACE: {channel_tr[0].stats.starttime} '
+                         f'DELTA: {channel_tr[0].stats.delta}')
+            samples = int(utils_lib.param(param, "windowLength").windowLength /
+                          float(channel_tr[0].stats.delta) + 1)
+            msg_lib.info(f'SAMPLES: '
+                         f'{samples}')
+        channel_time = channel_tr[0].stats.starttime
+        # Avoid file names with 59.59.
+        channel_time += datetime.timedelta(microseconds=10)
+        if polar_db_format == 'binary':
+            file_name = polar_lib.polar_day_file_name(file_path, psd_file_tag, t_start.strftime('%Y-%m-%d'),
+                                                      param.windowLength, xtype)
+            msg_lib.message(f'OUTPUT: {file_name} {channel_time.strftime("%Y-%m-%dT%H:%M:%S")}')
+            polar_window = (file_name, channel_time.strftime("%Y-%m-%dT%H:%M:%S"), smooth_x,
+                            np.column_stack([smooth[var] for var in param.variables]), x_units, power_units)
+        else:
+            tag_list = [psd_file_tag, channel_time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        f'{param.windowLength}', xtype]
+            file_name = file_lib.get_file_name(utils_lib.param(param, 'namingConvention').namingConvention,
+                                               file_path, tag_list)
+            msg_lib.message(f'OUTPUT: {file_name}')
+            try:
+                polar_lib.write_polarization(file_name, x_units, power_units, header, smooth_x, smooth)
+            except Exception as ex:
+                code = msg_lib.error(
+                    f'failed to open {file_name}. Is the "namingConvention" parameter  of '
+                    f'"{utils_lib.param(param, "namingConvention").namingConvention}" set correctly?', 4)
+                sys.exit(code)
+
+    # Combined mode, the PSDs of the channels are the diagonal of the spectral covariance matrices. They are
+    # smoothed like the ntk_computePSD.py PSDs and written to the PSD DB under the same path and name.
+    if output_psd:
+        psd_values = polar_lib.channel_psds(spectra_matrix, delta, taper_window)
+        psd_x = np.arange(1, spec_length) / float(num_samples * delta)
+        psd_x_limit = min_frequency
+        if xtype == "period":
+            psd_x = 1.0 / psd_x
+            psd_x_limit = utils_lib.param(param, 'maxT').maxT
+        psd_smooth_x, psd_smooth = polar_lib.smooth_variables(dict(zip(channel, psd_values)), xtype, psd_x,
+                                                              sampling_frequency, octave_window_width,
+                                                              octave_window_shift, psd_x_limit,
+                                                              utils_lib.param(param, 'xStart').xStart[plot_index])
+        for _i in range(3):
+            file_path, psd_file_tag = file_lib.get_dir(utils_lib.param(param, 'dataDirectory').dataDirectory,
+                                                       utils_lib.param(param, 'psdDbDirectory').psdDbDirectory,
+                                                       network, station, location, channel[_i])
+            file_path = os.path.join(file_path, segment_start_year, segment_start_doy)
+            utils_lib.mkdir(file_path)
+            channel_time = channel_tr[_i].stats.starttime
+            # Avoid file names with 59.59.
+            channel_time += datetime.timedelta(microseconds=10)
+            tag_list = [psd_file_tag, channel_time.strftime("%Y-%m-%dT%H:%M:%S"), f'{param.windowLength}', xtype]
+            file_name = file_lib.get_file_name(utils_lib.param(param, 'namingConvention').namingConvention,
+                                               file_path, tag_list)
+            msg_lib.message(f'OUTPUT: {file_name}')
+            try:
+                with open(file_name, "w") as file, np.errstate(divide='ignore'):
+                    file.write(f'{x_units} {power_units}\n')
+                    for x_value, psd_value in zip(psd_smooth_x, 10.0 * np.log10(psd_smooth[channel[_i]])):
+                        file.write(f'{float(x_value):11.6f} {float(psd_value):11.4f}\n')
+            except Exception as ex:
+                code = msg_lib.error(f'failed to write {file_name}: {ex}', 4)
+                sys.exit(code)
+
+    # Plot
+    if (utils_lib.param(param, 'plotSpectra').plotSpectra > 0 or \
+        utils_lib.param(param, 'plotSmooth').plotSmooth > 0) and \
+            do_plot > 0:
+        action = "Plot 2"
+
+        if timing:
+            t0 = utils_lib.time_it('start PLOT ', t0)
+
+        fig = plt.figure(figsize=param.figureSize)
+        fig.subplots_adjust(hspace=.2)
+        fig.subplots_adjust(wspace=.2)
+        fig.set_facecolor('w')
+        x, y = shared.production_label_position
+
+        ax = dict()
+        plot_count = 0
+        for var_index, var in enumerate(param.variables):
+            plot_count += 1
+            ax[var] = plt.subplot(param.subplot[var])
+            ax[var].set_xscale('log')
+
+            # Period or frequency for the x-axis.
+            if utils_lib.param(param, 'plotSpectra').plotSpectra:
+                plt.plot(x_values, variable[var], utils_lib.param(param, 'colorSpectra').colorSpectra,
+                         lw=0.6, label=var)
+            if utils_lib.param(param, 'plotSmooth').plotSmooth:
+                plt.plot(smooth_x, smooth[var], color=utils_lib.param(param, 'colorSmooth').colorSmooth,
+                         lw=0.6, label=f'smoothed {var}')
+
+            plt.xlabel(x_units)
+            plt.xticks(fontsize=6)
+            plt.xlim(utils_lib.param(param, 'xlimMin').xlimMin[var][xtype],
+                     utils_lib.param(param, 'xlimMax').xlimMax[var][xtype])
+            plt.ylabel(utils_lib.param(param, 'yLabel').yLabel[var], fontsize=8)
+            plt.yticks(fontsize=6)
+            plt.ylim([utils_lib.param(param, 'ylimLow').ylimLow[var],
+                      utils_lib.param(param, 'ylimHigh').ylimHigh[var]])
+
+            if plot_count == 0:
+                plt.title(f'{station} from {segment_start} to {segment_end}')
+
+            if var_index == 2:
+                ax[var].text(x, 3.0 * y, production_label, horizontalalignment='left', fontsize=5,
+                             verticalalignment='top',
+                             transform=ax[var].transAxes)
+
+            if do_plot_nnm and 0 <= var_index < 4:
+                nlnm_x, nlnm_y = get_nlnm()
+                nhnm_x, nhnm_y = get_nhnm()
+                if xtype != 'period':
+                    nlnm_x = 1.0 / nlnm_x
+                    nhnm_x = 1.0 / nhnm_x
+                plt.plot(nlnm_x, nlnm_y, lw=1, ls=':', c='k', label='NLNM, NHNM')
+                plt.plot(nhnm_x, nhnm_y, lw=1, ls=':', c='k')
+            ax[var].legend(frameon=False, prop={'size': 6})
+        if timing:
+            t0 = utils_lib.time_it('show PLOT ', t0)
+
+        plt.suptitle(title, y=0.95)
+        plt.show()
+
+    return polar_window
+
+
+def run_window(window):
+    """Process a window, return the exit code of the window (instead of exiting, so a worker process is not
+       lost on failure) and its binary polarization DB window."""
+    try:
+        return 0, process_window(*window)
+    except SystemExit as ex:
+        return ex.code, None
+
+
+def save_polar_windows(polar_windows):
+    """Write the binary polarization DB windows of a station-day, as returned by process_window, to the DB file of
+       the day in a single write. The windows that do not share the x-axis of the file are reported and skipped."""
+    file_name, x_units, power_units = polar_windows[0][0], polar_windows[0][4], polar_windows[0][5]
+    try:
+        skipped = polar_lib.save_polar_day(file_name, [window[1:4] for window in polar_windows], param.variables,
+                                           x_units, power_units)
+    except Exception as ex:
+        code = msg_lib.error(f'failed to write {file_name}: {ex}', 4)
+        sys.exit(code)
+    for window_time in skipped:
+        msg_lib.error(f'skipped the {window_time} window, its x-axis or variables differ from those of {file_name}',
+                      4)
+
+
+def add_polar_window(polar_windows, polar_window):
+    """Collect the binary polarization DB window of a processed window (None if there is none). The windows come in
+       time order, the windows of a day are written once the first window of the next day comes in."""
+    if polar_window is None:
+        return polar_windows
+    if polar_windows and polar_windows[-1][0] != polar_window[0]:
+        save_polar_windows(polar_windows)
+        polar_windows = list()
+    polar_windows.append(polar_window)
+    return polar_windows
+
+
+def process_results(results):
+    """Go through the (exit code, binary polarization DB window) results of the windows in window order and
+       write the binary polarization DB, exit on the first failed window once the windows before it are written."""
+    exit_code = 0
+    polar_windows = list()
+    for exit_code, polar_window in results:
+        if exit_code:
+            break
+        polar_windows = add_polar_window(polar_windows, polar_window)
+    if polar_windows:
+        save_polar_windows(polar_windows)
+    if exit_code:
+        sys.exit(exit_code)
+
+
 # Get data from the data center and put them all in one stream.
 stream = None
 for _ind, _key in enumerate(cat):
@@ -514,888 +1149,20 @@ for _ind, _key in enumerate(cat):
       flag to only process segments that start at the beginning of the window
     """
     give_warning = True
-    for t_step in range(0, int(duration), int(utils_lib.param(param, 'windowShift').windowShift)):
-        if timing:
-            t0 = utils_lib.time_it('start WINDOW', t0)
-        t_start = min_starttime + t_step
-        t_end = t_start + window_length
-        if verbose:
-            msg_lib.info(f'{_ind}.{t_step}++++Duration: {int(duration)}, '
-                         f'Window shift: { int(utils_lib.param(param, "windowShift").windowShift)}, '
-                         f't_step: {t_step}, min_starttime: {min_starttime}, t_star: {t_start}, '
-                         f'window_length: {window_length}, t_end: {t_end}, min_endtime: {min_endtime}')
-
-        if t_end > min_endtime:
-            t_end = min_endtime
-            if verbose:
-                msg_lib.info(f'{_ind}.{t_step}++++Adjusted: t_end: {t_end}, with t_star: {t_start}')
-
-        t_diff = t_end - t_start
-        #if not np.isclose(t_diff, window_length, rtol=1e-05, atol=1e-08, equal_nan=False):
-        if round(t_diff) != round(window_length):
-            if give_warning:
-                msg_lib.warning(script, f'Interval from {t_start} to {t_end} is {t_diff} s and is shorter than the '
-                                        f'windowLength parameter {window_length} seconds, will skip.')
-                give_warning = False
-            continue
-        segment_start = t_start.strftime('%Y-%m-%d %H:%M:%S.0')
-        segment_start_year = t_start.strftime('%Y')
-        segment_start_doy = t_start.strftime('%j')
-        segment_end = t_end.strftime('%Y-%m-%d %H:%M:%S.0')
-        title = f'{file_lib.get_tag(".", [request_network, request_station, request_location])} {request_channel} ' \
-                f'from {segment_start} to {segment_end}'
-
-        if param.doSmoothing:
-            title = f'{title}\nSmoothing window width {octave_window_width} octave; shift {octave_window_shift} octave'
-
-        msg_lib.message(title)
-        if request_client == 'FILES':
-            file_tag = file_lib.get_tag(".", [request_network, request_station, request_location, request_channel])
-            msg_lib.info(f'Reading '
-                         f'{file_tag} '
-                         f'from {segment_start} to {segment_end} '
-                         f'from {utils_lib.param(param, "requestClient").requestClient}')
-        else:
-            file_tag = file_lib.get_tag(".", [request_network, request_station, request_location, request_channel])
-            msg_lib.info(f'Requesting '
-                         f'{file_tag} '
-                         f'from {segment_start} to {segment_end} '
-                         f'from {utils_lib.param(param, "requestClient").requestClient}')
-
-        # Read from files but request response via Files and/or WS.
-        if request_client == 'FILES':
-            useClient = client
-            if not internet:
-                useClient = None
-            inventory, stream = ts_lib.get_channel_waveform_files(request_network, request_station,
-                                                                  request_location, request_channel,
-                                                                  segment_start, segment_end, useClient,
-                                                                  utils_lib.param(param, 'fileTag').fileTag,
-                                                                  resp_dir=response_directory)
-        msg_lib.message(f'Stream before the slice {stream}')
-
-        st = stream.slice(starttime=t_start, endtime=t_end, keep_empty_traces=False, nearest_sample=True)
-        msg_lib.message(f'Stream after slicing between {t_start} and {t_end}\n {st}')
-
-        # Did we manage to get the data?
-        if st is None or not st:
-            msg_lib.warning('Channel Waveform', f'No data available for '
-                                                f'{request_network}.{request_station}.{request_location}.'
-                                                f'{request_channel}')
-            continue
-        else:
-            st_starttime = min([tr.stats.starttime for tr in st])
-            st_endtime = max([tr.stats.endtime for tr in st])
-            if request_start_datetime >= st_endtime or request_end_datetime <= st_starttime:
-                msg_lib.warning(script, f'Stream time from {st_starttime} to {st_endtime} is outside the '
-                                        f'request window {request_start_datetime} to {request_end_datetime}')
-                continue
-            else:
-                qc_records = ts_lib.qc_3c_stream(st, param.windowLength,
-                                                 utils_lib.param(param, 'nSegWindow').nSegWindow,
-                                                 sorted_channel_list, param.channelGroups, verbose)
-            if verbose:
-                msg_lib.info(f'{script}, stream length: {len(st)}s')
-                msg_lib.info(f'{script}, QC-passed records: {qc_records}')
-
-        trace_key_List = list()
-        traceChannel = [None, None, None]
-        channel = [None, None, None]
-        num_points = [None, None, None]
-
-        # For stream_index in qc_records:
-        frequency = list()
-        period = list()
-        stChannel = None
-        channel_tr = list()
-        channel = list()
-
-        # Get traces for the 3 channels.
-        for _i in qc_records:
-            channel_tr.append(st[_i])
-            channel.append(channel_tr[-1].stats.channel)
-        if not channel_tr:
-            continue
-        # Correct for instrument response.
-        for _i in range(len(channel_tr)):
-            try:
-                if param.demean:
-                    channel_tr[_i].detrend("demean")
-
-                # Remove the instrument response?
-                if param.performInstrumentCorrection:
-                    msg_lib.info(f'Removing response from {channel[_i]}')
-                    if param.deconFilter1 <= 0 and param.deconFilter2 <= 0 \
-                            and param.deconFilter3 <= 0 and param.deconFilter4 <= 0:
-                        msg_lib.info(f'NO DECON FILTER APPLIED')
-                        channel_tr[_i].remove_response(output=param.unit, pre_filt=None, taper=False, zero_mean=False,
-                                                       water_level=param.waterLevel)
-                    else:
-                        msg_lib.info(f'DECON FILTER {param.deconFilter} APPLIED')
-                        channel_tr[_i].remove_response(output=param.unit,
-                                                       pre_filt=param.deconFilter,
-                                                       taper=False, zero_mean=False, water_level=param.waterLevel)
-                # Do not remove the instrument response but apply the sensitivity.
-                elif param.applyScale:
-                    msg_lib.info(f'Not removing response from {channel[_i]} but applying sensitivity '
-                                 f'{channel_tr[_i].stats.response.instrument_sensitivity.value}')
-                    channel_tr[_i].data /= float(channel_tr[_i].stats.response.instrument_sensitivity.value)
-
-            except Exception as ex:
-                code = msg_lib.error(f'Removing response from {channel[_i]} failed: {ex}', 4)
-                sys.exit(code)
-
-        t0 = utils_lib.time_it('Removed response', t0)
-
-        # net, sta, loc should be the same, get them from the 1st channel.
-        network = channel_tr[0].stats.network
-        station = channel_tr[0].stats.station
-        location = sta_lib.get_location(channel_tr[0].stats.location)
-
-        if verbose:
-            msg_lib.info(f'{script}, received: CHANNEL 1 {channel_tr[0].stats}')
-            msg_lib.info(f'{script}, received: CHANNEL 2 {channel_tr[1].stats}')
-            msg_lib.info(f'{script}, received: CHANNEL 3 {channel_tr[2].stats}')
-
-        power_units = utils_lib.param(param, 'powerUnits').powerUnits[
-            channel_tr[0].stats.response.instrument_sensitivity.input_units.upper()]
-
-        x_units = utils_lib.param(param, 'xlabel').xlabel[xtype.lower()]
-        header = utils_lib.param(param, 'header').header[xtype.lower()]
-
-        # Create a or each channel.
-        trace_key_1 = file_lib.get_tag(".", [network, station, location, channel[0]])
-        trace_key_2 = file_lib.get_tag(".", [network, station, location, channel[1]])
-        trace_key_3 = file_lib.get_tag(".", [network, station, location, channel[2]])
-        channelTag = '_'.join([channel[0], channel[1], channel[2]])
-
-        if verbose:
-            msg_lib.info(f'{script}, processing {trace_key_1}, {trace_key_2}, {trace_key_3}')
-
-        if timing:
-            t0 = utils_lib.time_it('got WAVEFORM', t0)
-
-        # Get the shortest trace length.
-        num_points = np.min([channel_tr[0].stats.npts, channel_tr[1].stats.npts, channel_tr[2].stats.npts])
-
-        # Sampling should be the same, get it from the 1st channel.
-        sampling_frequency = channel_tr[0].stats.sampling_rate
-        delta = float(channel_tr[0].stats.delta)
-
-        # Construct the time array.
-        trace_time = np.arange(num_points) / sampling_frequency
-
-        if timing:
-            t0 = utils_lib.time_it('build trace time', t0)
-
-        if verbose:
-            msg_lib.info(f'{script}, got number of points as {num_points}')
-            msg_lib.info(f'{script}, got sampling frequency as {sampling_frequency}')
-            msg_lib.info(f'{script}, got sampling interval as {delta}')
-            msg_lib.info(f'{script}, got time as {trace_time}')
-
-        # Calculate FFT parameters
-        # Number of samples per window is obtained by dividing the total number of samples
-        # by the number of side-by-side time windows along the trace
-
-        # First calculate the number of points needed based on the run parameters.
-        this_num_sample = int((float(utils_lib.param(param, 'windowLength').windowLength) / delta + 1) /
-                              utils_lib.param(param, 'nSegWindow').nSegWindow)
-        num_samples_needed = 2 ** int(math.log(this_num_sample, 2))  # make sure it is power of 2
-        msg_lib.info(f'{script}, num_samples Needed: {num_samples_needed}')
-
-        # Next calculate the number of points needed based on the trace parameters.
-        this_num_sample = int(num_points / utils_lib.param(param, 'nSegWindow').nSegWindow)
-
-        # Avoid log of bad numbers.
-        if this_num_sample <= 0:
-            msg_lib.warning('FFT',
-                            f'needed {num_samples_needed} samples but no samples are available, will skip this trace')
-            continue
-        num_samples = 2 ** int(math.log(this_num_sample, 2))  # make sure it is power of 2
-        msg_lib.info(f'{script}, num_samples Available: {num_samples}')
-
-        if num_samples < num_samples_needed:
-            msg_lib.warning("FFT", f'needed {num_samples_needed} samples but only {num_samples}'
-                                   f' samples are available, will skip this trace')
-            continue
-
-        n_shift = int(num_samples * (1.0 - float(utils_lib.param(param, 'percentOverlap').percentOverlap) / 100.0))
-
-        if verbose:
-            msg_lib.info(f'{script}, FFT param.nSegWindow, num_samples,n_shift: '
-                         f'{utils_lib.param(param, "nSegWindow").nSegWindow}, {num_samples}, {n_shift}')
-
-        # initialize the spectra
-        # The size of m11 is half of the num_samples, as data are real and
-        # and we only need the positive frequency portion
-        action = "initialize the spectra"
-        spec_length = int(num_samples / 2) + 1
-        m11 = np.zeros(spec_length, dtype=np.complex)
-        m12 = np.zeros(spec_length, dtype=np.complex)
-        m13 = np.zeros(spec_length, dtype=np.complex)
-        m22 = np.zeros(spec_length, dtype=np.complex)
-        m23 = np.zeros(spec_length, dtype=np.complex)
-        m33 = np.zeros(spec_length, dtype=np.complex)
-
-        # Build the tapering window.
-        action = "taper"
-        taper_window = np.hanning(num_samples)
-
-        # Loop through windows and calculate the spectra.
-        action = "loop"
-        start_index = 0
-        end_index = 0
-
-        # Go through segment.
-        if verbose:
-            msg_lib.info(f'{script}, num_samples: {num_samples}')
-            msg_lib.info(f'{script}, DELTA: {delta}')
-
-        segments_count = 0
-        for n in range(0, utils_lib.param(param, 'nSegments').nSegments):
-            if timing:
-                t0 = utils_lib.time_it('segment ' + str(n), t0)
-
-            # Each segment starts at start_index and ends at end_index-1.
-            end_index = start_index + num_samples
-
-            if verbose:
-                msg_lib.info(f'{script}, start_index: {start_index}')
-                msg_lib.info(f'{script}, end_index: {end_index}')
-
-            time_segment = list()
-            channel_segment_ = list()
-
-            # Extract the segments
-            # using Welch's method. Segments are length num_samples with each segment
-            # int(num_samples * (1.0-(param.percentOverlap / 100))) units apart.
-            action = "extract the segments"
-            try:
-                # Load start_index through end_index - 1.
-                if verbose:
-                    msg_lib.info(f'{script}, TIME SEGMENT: {start_index}, {end_index}, {trace_time[start_index]}, '
-                                 f'{trace_time[end_index]}')
-                time_segment = trace_time[start_index:end_index]
-
-                if verbose:
-                    msg_lib.info(f'{script}, CHANNEL SEGMENT: {start_index}, {end_index}')
-                channel_segment_1 = channel_tr[0].data[start_index:end_index]
-                channel_segment_2 = channel_tr[1].data[start_index:end_index]
-                channel_segment_3 = channel_tr[2].data[start_index:end_index]
-                segments_count += 1
-
-            except Exception as ex:
-                code = msg_lib.error(
-                    f'{script}, failed to extract segment from location {start_index} to {end_index} {ex}', 4)
-                sys.exit(code)
-
-            # Remove the mean.
-            action = "remove mean"
-            channel_segment_1 = channel_segment_1 - np.mean(channel_segment_1)
-            channel_segment_2 = channel_segment_2 - np.mean(channel_segment_2)
-            channel_segment_3 = channel_segment_3 - np.mean(channel_segment_3)
-
-            # Apply the taper.
-            action = "apply the taper"
-            if verbose:
-                msg_lib.info(f'{action}, {len(channel_segment_1)}, {len(taper_window)}')
-                msg_lib.info(f'{action}, {len(channel_segment_2)}, {len(taper_window)}')
-                msg_lib.info(f'{action}, {len(channel_segment_3)}, {len(taper_window)}')
-            channel_segment_1 = channel_segment_1 * taper_window
-            channel_segment_2 = channel_segment_2 * taper_window
-            channel_segment_3 = channel_segment_3 * taper_window
-
-            # FFT
-            # data values are real, so the output of FFT is Hermitian symmetric,
-            # i.e. the negative frequency terms are just the complex conjugates of
-            # the corresponding positive-frequency terms
-            # We only need the first half, so doing np.fft.rfft is more efficient
-            if timing:
-                t0 = utils_lib.time_it('start FFT ', t0)
-
-            action = "FFT"
-            FFT1 = np.zeros(spec_length, dtype=np.complex)
-            FFT2 = np.zeros(spec_length, dtype=np.complex)
-            FFT3 = np.zeros(spec_length, dtype=np.complex)
-
-            FFT1 = np.fft.rfft(channel_segment_1)
-            FFT2 = np.fft.rfft(channel_segment_2)
-            FFT3 = np.fft.rfft(channel_segment_3)
-
-            # The matrix.
-            action = "matrix"
-            m11 += FFT1[0:spec_length] * np.conjugate(FFT1[0:spec_length])
-            m12 += FFT2[0:spec_length] * np.conjugate(FFT1[0:spec_length])
-            m13 += FFT3[0:spec_length] * np.conjugate(FFT1[0:spec_length])
-            m22 += FFT2[0:spec_length] * np.conjugate(FFT2[0:spec_length])
-            m23 += FFT3[0:spec_length] * np.conjugate(FFT2[0:spec_length])
-            m33 += FFT3[0:spec_length] * np.conjugate(FFT3[0:spec_length])
-
-            if timing:
-                t0 = utils_lib.time_it('got POWER ', t0)
-
-            # Shift the start index for the next segment with overlap.
-            action = "shift the start index"
-            start_index += n_shift
-
-            # Plot the waveform and the selected segment.
-            if utils_lib.param(param, 'plotTraces').plotTraces > 0 and do_plot > 0:
-                action = "Plot"
-                plt.subplot(311)
-                plt.plot(trace_time, channel_tr[0].data, utils_lib.param(param, 'colorTrace').colorTrace)
-                plt.plot(time_segment, channel_segment_1, utils_lib.param(param, 'colorSmooth').colorSmooth)
-                plt.ylabel(f'{channel[0]} [{param.unitLabel}]', fontsize=6)
-                plt.xlim(0, utils_lib.param(param, 'windowLength').windowLength)
-                plt.xlabel('Time [s]')
-
-                plt.subplot(312)
-                plt.plot(trace_time, channel_tr[1].data, utils_lib.param(param, 'colorTrace').colorTrace)
-                plt.plot(time_segment, channel_segment_2, utils_lib.param(param, 'colorSmooth').colorSmooth)
-                plt.ylabel(f'{channel[1]} [{param.unitLabel}]', fontsize=6)
-                plt.xlim(0, utils_lib.param(param, 'windowLength').windowLength)
-                plt.xlabel('Time [s]')
-
-                plt.subplot(313)
-                plt.plot(trace_time, channel_tr[2].data, utils_lib.param(param, 'colorTrace').colorTrace)
-                plt.plot(time_segment, channel_segment_3, utils_lib.param(param, 'colorSmooth').colorSmooth)
-                plt.ylabel(f'{channel[2]} [{param.unitLabel}]', fontsize=6)
-                plt.xlim(0, utils_lib.param(param, 'windowLength').windowLength)
-                plt.xlabel('Time [s]')
-
-                plt.show()
-
-        # END LOOP SEGMENT, segments are done
-        # average the spectra matrix over the sub-windows
-        action = "average the spectra matrix"
-
-        # To convert FFT to  average spectral covariance matrix
-        norm = 4.0 * delta / float(num_samples)
-
-        if verbose:
-            msg_lib.info(f'{script}, DELTA: {delta}')
-            msg_lib.info(f'{script}, num_samples: {num_samples}')
-            msg_lib.info(f'{script}, NORM: {norm}')
-
-        msg_lib.info(f'{script}, DELTA: {delta}')
-        msg_lib.info(f'{script}, segments_count: {segments_count}')
-
-        # The averages.
-        m11 /= float(segments_count)
-        m12 /= float(segments_count)
-        m13 /= float(segments_count)
-        m22 /= float(segments_count)
-        m23 /= float(segments_count)
-        m33 /= float(segments_count)
-
-        # If power is not populated, skip LOOP WINDOW or this 1 -hour window
-        if len(m11) <= 0:
-            continue
-
-        variable = dict()
-        for var in param.variables:
-            variable[var] = list()
-
-        for ii in range(0, spec_length):
-            #
-            # form the average spectral covariance matrix, it is a complex  hermitian matrix
-            #
-            spectra_matrix = list()
-            spectra_matrix = np.array([[m11[ii], m12[ii], m13[ii]],
-                                       [m12[ii].conjugate(), m22[ii], m23[ii]],
-                                       [m13[ii].conjugate(), m23[ii].conjugate(), m33[ii]]])
-
-            action = "eigen.eigenvalues"
-
-            """
-               Return the eigenvalues and eigenvectors of a Hermitian or symmetric matrix.
-    
-                 This function computes the eigenvalues and eigenvectors of the complex
-                 hermitian matrix A.The imaginary parts of the diagonal are assumed to be
-                 zero and are not referenced. The eigenvalues are stored in the vector
-                 eval and are unordered. The corresponding complex eigenvectors are
-                 stored in the columns of the matrix evec. For example, the eigenvector
-                 in the first column corresponds to the first eigenvalue. The
-                 eigenvectors are guaranteed to be mutually orthogonal and normalised to
-                 unit magnitude.
-            """
-            eig_values, eig_vectors = eigen.eigh(spectra_matrix)
-
-            # using max_eig_value_index in above, we know that max_eig_value_index = 1
-            max_eig_value_index = 0
-            max_eig_value = float(eig_values[max_eig_value_index])
-            for i in range(1, len(eig_values)):
-                if float(eig_values[i]) > max_eig_value:
-                    max_eig_value = float(eig_values[i])
-                    max_eig_value_index = i
-            """
-              Eigenvectors of the maximum eigenvalue
-              The corresponding complex eigenvectors are
-              stored in the columns of the matrixDA. evec.
-            """
-            z1, z2, z3 = eig_vectors[:, max_eig_value_index]
-            thetah, phihh, thetav, phivh = polar_lib.polarization_angles(z1, z2, z3)
-
-            # Print results.
-            action = "print values"
-            variable["powerUD"] = np.append(variable["powerUD"], norm * abs(m11[ii]))
-            variable["powerEW"] = np.append(variable["powerEW"], norm * abs(m22[ii]))
-            variable["powerNS"] = np.append(variable["powerNS"], norm * abs(m33[ii]))
-
-            """
-              power spectrum of the primary eigenvalue (Lambda).
-              Variation of this spectrum is very similar to that of
-              the individual components
-            """
-            variable["powerLambda"] = np.append(variable["powerLambda"], norm * max_eig_value)
-            variable["betaSquare"] = np.append(variable["betaSquare"],
-                                               polar_lib.polarization_degree(m11[ii], m12[ii], m13[ii], m22[ii],
-                                                                             m23[ii], m33[ii]))
-            variable["thetaH"] = np.append(variable["thetaH"], thetah)
-            variable["phiHH"] = np.append(variable["phiHH"], phihh)
-            variable["thetaV"] = np.append(variable["thetaV"], thetav)
-            variable["phiVH"] = np.append(variable["phiVH"], phivh)
-
-        # END LOOP SEGMENT, segments are done
-
-        smooth_x = list()
-        smooth = dict()
-        for var in param.variables:
-            smooth[var] = list()
-
-        # Smoothing.
-        if timing:
-            t0 = utils_lib.time_it('start SMOOTHING ', t0)
-
-        if param.doSmoothing:
-            msg_lib.info(f'{script}, SMOOTHING window: {octave_window_width}/{octave_window_shift} octave')
-        else:
-            msg_lib.info(f'{script}, SMOOTHING is off')
-
-        if xtype == "period":
-            # 10.0*maxT to avoid 1.0/0.0 at zero frequency
-            period = np.append([10.0 * max_period],
-                               1.0 / (np.arange(1.0, spec_length) / float(num_samples * delta)))
-            if param.doSmoothing:
-                # Nyquist.
-                if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
-                    # Regular smoothing with no angles involved.
-                    smooth_x, smooth["powerUD"] = \
-                        sf_lib.smooth_nyquist(xtype, period, variable["powerUD"], sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              max_period)
-                    smooth_x, smooth["powerEW"] = \
-                        sf_lib.smooth_nyquist(xtype, period, variable["powerEW"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              max_period)
-                    smooth_x, smooth["powerNS"] = \
-                        sf_lib.smooth_nyquist(xtype, period, variable["powerNS"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              max_period)
-                    smooth_x, smooth["powerLambda"] = \
-                        sf_lib.smooth_nyquist(xtype, period, variable["powerLambda"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              max_period)
-                    smooth_x, smooth["betaSquare"] = \
-                        sf_lib.smooth_nyquist(xtype, period, variable["betaSquare"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              max_period)
-
-                    # Smoothing of angular quantities.
-                    smooth_x, smooth["thetaH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, period, variable["thetaH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      max_period, 0.0)
-                    for ii in range(len(smooth["thetaH"])):
-                        if smooth["thetaH"][ii] < 0.0:
-                            smooth["thetaH"][ii] += 360.0
-
-                    smooth_x, smooth["thetaV"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, period, variable["thetaV"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      max_period, 90.0)
-
-                    smooth_x, smooth["phiVH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, period, variable["phiVH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      max_period, 90.0)
-                    for ii in range(len(smooth["phiVH"])):
-                        if smooth["phiVH"][ii] > 90.0:
-                            smooth["phiVH"][ii] -= 180.0
-                        elif smooth["phiVH"][ii] < -90.0:
-                            smooth["phiVH"][ii] += 180.0
-
-                    smooth_x, smooth["phiHH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, period, variable["phiHH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      max_period, 90.0)
-                    for ii in range(len(smooth["phiHH"])):
-                        if smooth["phiHH"][ii] > 180.0:
-                            smooth["phiHH"][ii] -= 360.0
-                        elif smooth["phiHH"][ii] < -180.0:
-                            smooth["phiHH"][ii] += 360.0
-                # Not Nyquist.
-                else:
-                    smooth_x, smooth["powerUD"] = \
-                        sf_lib.smooth_period(period, variable["powerUD"], sampling_frequency,
-                                             octave_window_width, octave_window_shift,
-                                             max_period,
-                                             float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerEW"] = \
-                        sf_lib.smooth_period(period, variable["powerEW"], sampling_frequency,
-                                             octave_window_width, octave_window_shift,
-                                             max_period,
-                                             float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerNS"] = \
-                        sf_lib.smooth_period(period, variable["powerNS"], sampling_frequency,
-                                             octave_window_width, octave_window_shift,
-                                             max_period,
-                                             float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerLambda"] = \
-                        sf_lib.smooth_period(period, variable["powerLambda"], sampling_frequency,
-                                             octave_window_width, octave_window_shift,
-                                             max_period,
-                                             float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["betaSquare"] = \
-                        sf_lib.smooth_period(period, variable["betaSquare"], sampling_frequency,
-                                             octave_window_width, octave_window_shift,
-                                             max_period,
-                                             float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-
-                    # Smoothing of angular quantities.
-                    smooth_x, smooth["thetaH"] = \
-                        sf_lib.smooth_period_angular(period, variable["thetaH"], sampling_frequency,
-                                                     octave_window_width, octave_window_shift,
-                                                     max_period,
-                                                     float(utils_lib.param(param, 'xStart').xStart[plot_index]), 0.0)
-                    for ii in range(len(smooth["thetaH"])):
-                        if smooth["thetaH"][ii] < 0.0:
-                            smooth["thetaH"][ii] += 360.0
-
-                    smooth_x, smooth["thetaV"] = \
-                        sf_lib.smooth_period_angular(period, variable["thetaV"], sampling_frequency,
-                                                     octave_window_width, octave_window_shift,
-                                                     max_period,
-                                                     float(utils_lib.param(param, 'xStart').xStart[plot_index]), 90.0)
-
-                    smooth_x, smooth["phiVH"] = \
-                        sf_lib.smooth_period_angular(period, variable["phiVH"], sampling_frequency,
-                                                     octave_window_width, octave_window_shift,
-                                                     max_period, 90.0)
-                    for ii in range(0, len(smooth["phiVH"])):
-                        if smooth["phiVH"][ii] > 90.0:
-                            smooth["phiVH"][ii] -= 180.0
-                        elif smooth["phiVH"][ii] < -90.0:
-                            smooth["phiVH"][ii] += 180.0
-
-                    smooth_x, smooth["phiHH"] = \
-                        sf_lib.smooth_period_angular(xtype, period, variable["phiHH"],
-                                                     sampling_frequency,
-                                                     octave_window_width, octave_window_shift,
-                                                     max_period, 90.0)
-                    for ii in range(0, len(smooth["phiHH"])):
-                        if smooth["phiHH"][ii] > 180.0:
-                            smooth["phiHH"][ii] -= 360.0
-                        elif smooth["phiHH"][ii] < -180.0:
-                            smooth["phiHH"][ii] += 360.0
-            else:
-                smooth_x = period
-                smooth["powerUD"] = variable["powerUD"]
-                smooth["powerEW"] = variable["powerEW"]
-                smooth["powerNS"] = variable["powerNS"]
-                smooth["powerLambda"] = variable["powerLambda"]
-                smooth["betaSquare"] = variable["betaSquare"]
-                smooth["thetaH"] = variable["thetaH"]
-                smooth["thetaV"] = variable["thetaV"]
-                smooth["phiVH"] = variable["phiVH"]
-                smooth["phiHH"] = variable["phiHH"]
-        else:
-            frequency = np.array(np.arange(0, spec_length) / float(num_samples * delta))
-            # Nyquist.
-            if param.doSmoothing:
-                if str(utils_lib.param(param, 'xStart').xStart[plot_index]) == 'Nyquist':
-                    smooth_x, smooth["powerUD"] = \
-                        sf_lib.smooth_nyquist(xtype, frequency, variable["powerUD"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              min_frequency)
-                    smooth_x, smooth["powerEW"] = \
-                        sf_lib.smooth_nyquist(xtype, frequency, variable["powerEW"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              min_frequency)
-                    smooth_x, smooth["powerNS"] = \
-                        sf_lib.smooth_nyquist(xtype, frequency, variable["powerNS"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              min_frequency)
-                    smooth_x, smooth["powerLambda"] = \
-                        sf_lib.smooth_nyquist(xtype, frequency, variable["powerLambda"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              min_frequency)
-                    smooth_x, smooth["betaSquare"] = \
-                        sf_lib.smooth_nyquist(xtype, frequency, variable["betaSquare"],
-                                              sampling_frequency,
-                                              octave_window_width, octave_window_shift,
-                                              min_frequency)
-                    # Smoothing of angular quantities
-                    smooth_x, smooth["thetaH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, frequency, variable["thetaH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      min_frequency, 0.0)
-                    for ii in range(0, len(smooth["thetaH"])):
-                        if smooth["thetaH"][ii] < 0.0:
-                            smooth["thetaH"][ii] += 360.0
-
-                    smooth_x, smooth["thetaV"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, frequency, variable["thetaV"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      min_frequency, 90.0)
-
-                    smooth_x, smooth["phiVH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, frequency, variable["phiVH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      min_frequency, 90.0)
-                    for ii in range(0, len(smooth["phiVH"])):
-                        if smooth["phiVH"][ii] > 90.0:
-                            smooth["phiVH"][ii] -= 180.0
-                        elif smooth["phiVH"][ii] < -90.0:
-                            smooth["phiVH"][ii] += 180.0
-
-                    smooth_x, smooth["phiHH"] = \
-                        sf_lib.smooth_nyquest_angular(xtype, frequency, variable["phiHH"],
-                                                      sampling_frequency,
-                                                      octave_window_width, octave_window_shift,
-                                                      min_frequency, 90.0)
-                    for ii in range(0, len(smooth["phiHH"])):
-                        if smooth["phiHH"][ii] > 180.0:
-                            smooth["phiHH"][ii] -= 360.0
-                        elif smooth["phiHH"][ii] < -180.0:
-                            smooth["phiHH"][ii] += 360.0
-                # Not Nyquist.
-                else:
-                    smooth_x, smooth["powerUD"] = \
-                        sf_lib.smooth_frequency(frequency, variable["powerUD"], sampling_frequency,
-                                                octave_window_width, octave_window_shift,
-                                                min_frequency,
-                                                float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerEW"] = \
-                        sf_lib.smooth_frequency(frequency, variable["powerEW"], sampling_frequency,
-                                                octave_window_width, octave_window_shift,
-                                                min_frequency,
-                                                float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerNS"] = \
-                        sf_lib.smooth_frequency(frequency, variable["powerNS"], sampling_frequency,
-                                                octave_window_width, octave_window_shift,
-                                                min_frequency,
-                                                float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["powerLambda"] = \
-                        sf_lib.smooth_frequency(frequency, variable["powerLambda"], sampling_frequency,
-                                                octave_window_width, octave_window_shift,
-                                                min_frequency,
-                                                float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-                    smooth_x, smooth["betaSquare"] = \
-                        sf_lib.smooth_frequency(frequency, variable["betaSquare"], sampling_frequency,
-                                                octave_window_width, octave_window_shift,
-                                                min_frequency,
-                                                float(utils_lib.param(param, 'xStart').xStart[plot_index]))
-
-                    # Smoothing of angular quantities.
-                    smooth_x, smooth["thetaH"] = \
-                        sf_lib.smooth_frequency_angular(frequency, variable["thetaH"], sampling_frequency,
-                                                        octave_window_width, octave_window_shift,
-                                                        min_frequency,
-                                                        float(utils_lib.param(param, 'xStart').xStart[plot_index]),
-                                                        0.0)
-                    for ii in range(0, len(smooth["thetaH"])):
-                        if smooth["thetaH"][ii] < 0.0:
-                            smooth["thetaH"][ii] += 360.0
-
-                    smooth_x, smooth["thetaV"] = \
-                        sf_lib.smooth_frequency_angular(frequency, variable["thetaV"], sampling_frequency,
-                                                        octave_window_width, octave_window_shift,
-                                                        min_frequency,
-                                                        float(utils_lib.param(param, 'xStart').xStart[plot_index]),
-                                                        90.0)
-
-                    smooth_x, smooth["phiVH"] = \
-                        sf_lib.smooth_frequency_angular(frequency, variable["phiVH"], sampling_frequency,
-                                                        octave_window_width, octave_window_shift,
-                                                        min_frequency,
-                                                        float(utils_lib.param(param, 'xStart').xStart[plot_index]),
-                                                        90.0)
-                    for ii in range(0, len(smooth["phiVH"])):
-                        if smooth["phiVH"][ii] > 90.0:
-                            smooth["phiVH"][ii] -= 180.0
-                        elif smooth["phiVH"][ii] < -90.0:
-                            smooth["phiVH"][ii] += 180.0
-
-                    smooth_x, smooth["phiHH"] = \
-                        sf_lib.smooth_frequency_angular(frequency, variable["phiHH"], sampling_frequency,
-                                                        octave_window_width, octave_window_shift,
-                                                        min_frequency,
-                                                        float(utils_lib.param(param, 'xStart').xStart[plot_index]),
-                                                        90.0)
-                    for ii in range(0, len(smooth["phiHH"])):
-                        if smooth["phiHH"][ii] > 180.0:
-                            smooth["phiHH"][ii] -= 360.0
-                        elif smooth["phiHH"][ii] < -180.0:
-                            smooth["phiHH"][ii] += 360.0
-            else:
-                smooth_x = frequency
-                smooth["powerUD"] = variable["powerUD"]
-                smooth["powerEW"] = variable["powerEW"]
-                smooth["powerNS"] = variable["powerNS"]
-                smooth["powerLambda"] = variable["powerLambda"]
-                smooth["betaSquare"] = variable["betaSquare"]
-                smooth["thetaH"] = variable["thetaH"]
-                smooth["thetaV"] = variable["thetaV"]
-                smooth["phiVH"] = variable["phiVH"]
-                smooth["phiHH"] = variable["phiHH"]
-        if timing:
-            t0 = utils_lib.time_it(f'SMOOTHING window {octave_window_width}, {octave_window_shift,} DONE', t0)
-
-        # Convert to dB.
-        variable["powerUD"] = 10.0 * np.log10(variable["powerUD"][0:spec_length])
-        variable["powerEW"] = 10.0 * np.log10(variable["powerEW"][0:spec_length])
-        variable["powerNS"] = 10.0 * np.log10(variable["powerNS"][0:spec_length])
-        variable["powerLambda"] = 10.0 * np.log10(variable["powerLambda"][0:spec_length])
-
-        smooth["powerUD"] = 10.0 * np.log10(smooth["powerUD"][0:spec_length])
-        smooth["powerEW"] = 10.0 * np.log10(smooth["powerEW"][0:spec_length])
-        smooth["powerNS"] = 10.0 * np.log10(smooth["powerNS"][0:spec_length])
-        smooth["powerLambda"] = 10.0 * np.log10(smooth["powerLambda"][0:spec_length])
-
-        # Create output paths if they do not exist.
-        if utils_lib.param(param, 'outputValues').outputValues > 0:
-            file_path, psd_file_tag = file_lib.get_dir(utils_lib.param(param, 'dataDirectory').dataDirectory,
-                                                       utils_lib.param(param, 'polarDbDirectory').polarDbDirectory,
-                                                       network, station, location, channelTag)
-            file_path = os.path.join(file_path, segment_start_year, segment_start_doy)
-            utils_lib.mkdir(file_path)
-
-            # Output is based on the xtype.
-            if verbose:
-                msg_lib.info(f'tr_channel_.stats: {channel_tr[0].stats} '
-                             f'REQUEST: {segment_start} '
-                             f'TRACE: {channel_tr[0].stats.starttime} '
-                             f'DELTA: {channel_tr[0].stats.delta}')
-                samples = int(utils_lib.param(param, "windowLength").windowLength /
-                              float(channel_tr[0].stats.delta) + 1)
-                msg_lib.info(f'SAMPLES: '
-                             f'{samples}')
-            channel_time = channel_tr[0].stats.starttime
-            # Avoid file names with 59.59.
-            channel_time += datetime.timedelta(microseconds=10)
-            tag_list = [psd_file_tag, channel_time.strftime("%Y-%m-%dT%H:%M:%S"),
-                        f'{param.windowLength}', xtype]
-            file_name = file_lib.get_file_name(utils_lib.param(param, 'namingConvention').namingConvention, file_path,
-                                               tag_list)
-            msg_lib.message(f'OUTPUT: {file_name}')
-            try:
-                with open(file_name, "w") as file:
-
-                    # Header.
-                    file.write(f'{x_units} {power_units}\n')
-                    file.write(f'{header}\n')
-
-                    # Data.
-                    for i in range(0, len(smooth_x)):
-                        file.write("%11.6f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f\n" % (
-                            float(smooth_x[i]), float(smooth["powerUD"][i]), float(smooth["powerEW"][i]),
-                            float(smooth["powerNS"][i]), float(smooth["powerLambda"][i]),
-                            float(smooth["betaSquare"][i]), float(smooth["thetaH"][i]), float(smooth["thetaV"][i]),
-                            float(smooth["phiVH"][i]), float(smooth["phiHH"][i])))
-
-            except Exception as ex:
-                code = msg_lib.error(
-                    f'failed to open {file_name}. Is the "namingConvention" parameter  of '
-                    f'"{utils_lib.param(param, "namingConvention").namingConvention}" set correctly?', 4)
-                sys.exit(code)
-
-        # Plot
-        if (utils_lib.param(param, 'plotSpectra').plotSpectra > 0 or \
-            utils_lib.param(param, 'plotSmooth').plotSmooth > 0) and \
-                do_plot > 0:
-            action = "Plot 2"
-
-            if timing:
-                t0 = utils_lib.time_it('start PLOT ', t0)
-
-            fig = plt.figure(figsize=param.figureSize)
-            fig.subplots_adjust(hspace=.2)
-            fig.subplots_adjust(wspace=.2)
-            fig.set_facecolor('w')
-            x, y = shared.production_label_position
-
-            ax = dict()
-            plot_count = 0
-            for var_index, var in enumerate(param.variables):
-                plot_count += 1
-                ax[var] = plt.subplot(param.subplot[var])
-                ax[var].set_xscale('log')
-
-                # Period for the x-axis.
-                if xtype == "period":
-                    if utils_lib.param(param, 'plotSpectra').plotSpectra:
-                        plt.plot(period, variable[var], utils_lib.param(param, 'colorSpectra').colorSpectra,
-                                 lw=0.6, label=var)
-                    if utils_lib.param(param, 'plotSmooth').plotSmooth:
-                        plt.plot(smooth_x, smooth[var], color=utils_lib.param(param, 'colorSmooth').colorSmooth,
-                                 lw=0.6, label=f'smoothed {var}')
-
-                # Frequency for the x-axis.
-                else:
-                    if utils_lib.param(param, 'plotSpectra').plotSpectra:
-                        plt.plot(frequency, variable[var], utils_lib.param(param, 'colorSpectra').colorSpectra,
-                                 lw=0.6, label=var)
-                    if utils_lib.param(param, 'plotSmooth').plotSmooth:
-                        plt.plot(smooth_x, smooth[var], color=utils_lib.param(param, 'colorSmooth').colorSmooth,
-                                 lw=0.6, label=f'smoothed {var}')
-
-                plt.xlabel(x_units)
-                plt.xticks(fontsize=6)
-                plt.xlim(utils_lib.param(param, 'xlimMin').xlimMin[var][xtype],
-                         utils_lib.param(param, 'xlimMax').xlimMax[var][xtype])
-                plt.ylabel(utils_lib.param(param, 'yLabel').yLabel[var], fontsize=8)
-                plt.yticks(fontsize=6)
-                plt.ylim([utils_lib.param(param, 'ylimLow').ylimLow[var],
-                          utils_lib.param(param, 'ylimHigh').ylimHigh[var]])
-
-                if plot_count == 0:
-                    plt.title(f'{station} from {segment_start} to {segment_end}')
-
-                if var_index == 2:
-                    ax[var].text(x, 3.0 * y, production_label, horizontalalignment='left', fontsize=5,
-                                 verticalalignment='top',
-                                 transform=ax[var].transAxes)
-
-                if do_plot_nnm and 0 <= var_index < 4:
-                    nlnm_x, nlnm_y = get_nlnm()
-                    nhnm_x, nhnm_y = get_nhnm()
-                    if xtype != 'period':
-                        nlnm_x = 1.0 / nlnm_x
-                        nhnm_x = 1.0 / nhnm_x
-                    plt.plot(nlnm_x, nlnm_y, lw=1, ls=':', c='k', label='NLNM, NHNM')
-                    plt.plot(nhnm_x, nhnm_y, lw=1, ls=':', c='k')
-                ax[var].legend(frameon=False, prop={'size': 6})
-            if timing:
-                t0 = utils_lib.time_it('show PLOT ', t0)
-
-            plt.suptitle(title, y=0.95)
-            plt.show()
+    window_list = [(_ind, t_step, min_starttime, min_endtime)
+                   for t_step in range(0, int(duration), int(utils_lib.param(param, 'windowShift').windowShift))]
+
+    # The windows are independent, run them in a pool of forked worker processes if requested. The workers
+    # share the stream of the data center request with this process (copy-on-write memory of the fork), so the
+    # traces are not pickled, and each worker writes the text output files of its windows. The binary
+    # polarization DB windows are returned in window order and written here, one write per station-day file.
+    if workers > 1 and len(window_list) > 1:
+        msg_lib.info(f'{script}, processing {len(window_list)} windows with {min(workers, len(window_list))} '
+                     f'workers')
+        with multiprocessing.get_context('fork').Pool(min(workers, len(window_list))) as pool:
+            process_results(pool.imap(run_window, window_list, chunksize=1))
+    else:
+        process_results(map(run_window, window_list))
 t0 = t1
 t0 = utils_lib.time_it('END', t0)
 msg_lib.info('Done!!')
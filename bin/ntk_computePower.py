@@ -2,7 +2,6 @@
 
 import sys
 import os
-import math
 import numpy as np
 import importlib
 
@@ -16,6 +15,7 @@ sys.path.append(param_path)
 import msgLib as msg_lib
 import staLib as sta_lib
 import utilsLib as utils_lib
+import powerLib as power_lib
 
 """
   NAME:   ntk_computePower.py - a Python 3 script to calculate power of each PSD window over selected bin period bands
@@ -42,6 +42,11 @@ import utilsLib as utils_lib
   PDF files
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: the PSD file is streamed and processed in batches of windowBatch windows.
+                This changes the output relative to V.2.0.0 in two cases: with xtype=frequency the first line of each
+                window is now converted to period like the rest of the window (V.2.0.0 kept the frequency), and
+                a last line with a new date-time now forms its own window (V.2.0.0 merged it into the previous one)
+     2026-10-19 IRIS DMC Product Team: band powers from a precomputed band integration weight matrix
      2020-11-16 Manoch: V.2.0.0 Python 3 and adoption of PEP 8 style guide.
      2015-04-22 Manoch: file name correction
      2014-11-24 Manoch: Beta release (V.0.5) to compute power based on a combined PSD file
@@ -185,161 +190,49 @@ power_file_name = os.path.join(power_directory, psd_file.replace(f'_{xtype}', ''
 out_file = open(power_file_name, 'w')
 
 # Write the output header.
-out_file.write('Period ranges\n')
-out_file.write('%20s %20s' % ('Date', 'Time'))
-for k in range(len(bin_start)):
-    out_file.write('%20s' % f'{bins[k]} ({bin_start[k]}-{bin_end[k]})')
-out_file.write('\n')
+power_lib.write_header(out_file, bins, bin_start, bin_end)
 
 msg_lib.info(f'PSD FILE: {psd_file_name}')
 msg_lib.info(f'POWER FILE: {power_file_name}')
 
-# Loop through the PSD file, compute bin powers and write them out.
-previous_date = None
-previous_time = None
 
+def write_batch(window_list):
+    """Compute and write the band powers of a batch of PSD windows. For each period grid, perform rectangular
+    integration to compute the band powers of all its windows at once (see powerLib.band_weights)."""
+    grid_windows = dict()
+    for index, (date, time, period, psd) in enumerate(window_list):
+        grid_key = period.tobytes()
+        if grid_key not in grid_windows:
+            grid_windows[grid_key] = list()
+        grid_windows[grid_key].append(index)
+
+    power = np.zeros((len(window_list), len(bins)))
+    for grid_key in grid_windows:
+        index_list = grid_windows[grid_key]
+        if grid_key not in grid_weights:
+            grid_weights[grid_key] = power_lib.band_weights(window_list[index_list[0]][2], bin_start, bin_end)
+        power[index_list] = power_lib.band_power(grid_weights[grid_key],
+                                                 np.array([window_list[i][3] for i in index_list]))
+
+    for index, (date, time, period, psd) in enumerate(window_list):
+        power_lib.write_power(out_file, date, time, power[index])
+
+
+# Stream the PSD file window by window and process the windows in batches of windowBatch windows, so memory
+# use does not grow with the file size. The integration weights are kept for each period grid seen.
+grid_weights = dict()
+window_count = 0
+window_list = list()
 with open(psd_file_name) as in_file:
-    # init the records
-    period = list()
-    psd = list()
-    power = list()
-
-    # rRad the entire PSD file.
-    lines = in_file.readlines()
-
-    # Find the last non-blank line.
-    line_count = len(lines)
-    for i in range(1, len(lines)):
-        line = lines[-i].strip()
-        if len(line) > 0:
-            line_count = len(lines) - i + 1
-            break
-    if verbose:
-        msg_lib.info(f'INPUT: {line_count} lines')
-
-    # Process line by line.
-    for i in range(line_count):
-        line = lines[i]
-        line = line.strip()
-        # Each row, split columns.
-        date, time, this_x, this_y = line.split()
-
-        # Depending on type, recompute X if needed.
-        if xtype == 'frequency':
-            this_x = 1.0 / float(this_x)
-
-        if previous_date is None:
-            previous_date = date
-            previous_time = time
-
-        # Group lines based on date and time
-        # save the period and value of interest.
-        if (date == previous_date and time == previous_time) and i < line_count - 1:
-            period.append(float(this_x))
-            psd.append(float(this_y))
-
-        # New date-time, jump out and compute power for the previous date-time.
-        else:
-            previous_line = line
-
-            # Save the values from the last row, if we are at the end of the file
-            if i == line_count - 1:
-                period.append(float(this_x))
-                psd.append(float(this_y))
-
-            power = np.zeros(len(bins))
-
-            # Compute power.
-            if len(period) > 0:
-                # Sort them to keep the code simple.
-                period, psd = zip(*sorted(zip(period, psd)))
-
-                """Go through the records and for each bin convert to power from dB
-                   NOTE: PSD is equal to the power as the a measure point divided by the width of the bin
-                        PSD = P / W
-                        log(PSD) = Log(P) - log(W)
-                        log(P) = log(PSD) + log(W)  here W is width in frequency
-                        log(P) = log(PSD) - log(Wt) here Wt is width in period
-                """
-                for k in range(len(bins)):
-                    if verbose > 1:
-                        msg_lib.message(f' CHAN: {channel}, DATE": {previous_date} {previous_time}'
-                                        f'PERIOD: {bins[k]} from {bin_start[k]} to {bin_end[k]}')
-
-                    """
-                      For each bin perform rectangular integration to compute power
-                      power is assigned to the period at the begining of the interval
-                           _   _
-                          | |_| |
-                          |_|_|_|
-                    """
-
-                    for j in range(0, len(psd) - 1):
-                        # Since to calculate the area we take the width between point j and j+1, as a result we
-                        # only accept the point if it falls before the end point, hence (<).
-                        if float(bin_start[k]) <= float(period[j]) < float(bin_end[k]):
-
-                            # Here we want to add the area just before the first sample if our window start
-                            # does not fall on a data point. We set start of the band as the start of our window.
-                            if j > 0 and (float(period[j]) > float(bin_start[k]) > float(period[j - 1])):
-                                if verbose > 1:
-                                    msg_lib.info(f'{j} ADJUST THE BAND START {period[j]} BAND NOW GOES'
-                                                 f'   FROM 1: {bin_start[k]} to {period[j + 1]}')
-                                bin_width_hz = abs((1.0 / float(bin_start[k])) - (1.0 / float(period[j + 1])))
-                            elif j == 0 and float(period[j]) > float(bin_start[k]):
-                                if verbose > 1:
-                                    msg_lib.info(f'{j} ADJUST THE BAND START {period[j]} BAND NOW GOES'
-                                                 f'   FROM 1: {bin_start[k]} to {period[j + 1]}')
-                                bin_width_hz = abs((1.0 / float(bin_start[k])) - (1.0 / float(period[j + 1])))
-
-                            # Here we want to adjust the width if our window end
-                            # does not fall on a data point.
-                            elif j < len(psd) - 1 and (float(period[j]) < float(bin_end[k]) <= float(period[j + 1])):
-                                if verbose > 1:
-                                    msg_lib.info(f'{j} ADJUST THE BAND END {period[j]} BAND NOW GOES'
-                                                 f'    FROM 2: {period[j]} to {bin_end[k]}')
-                                bin_width_hz = abs((1.0 / float(period[j])) - (1.0 / float(bin_end[k])))
-                            elif j == len(psd) - 1 and float(period[j]) < float(bin_end[k]):
-                                if verbose > 1:
-                                    msg_lib.info(f'{j} ADJUST THE BAND END {period[j]} BAND NOW GOES'
-                                                 f'    FROM 2: {period[j]} to {bin_end[k]}')
-                                bin_width_hz = abs((1.0 / float(period[j])) - (1.0 / float(bin_end[k])))
-
-                            # For the rest in between.
-                            else:
-                                if verbose > 1:
-                                    msg_lib.info(f'{j} NO ADJUSTMENT BAND FROM 3: {period[j]} to {period[j + 1]}')
-                                bin_width_hz = abs((1.0 / float(period[j])) - (1.0 / float(period[j + 1])))
-
-                            if verbose > 1:
-                                msg_lib.info(f'    BIN WIDTH {bin_width_hz} Hz')
-
-                            power[k] += (math.pow(10.0, float(psd[j]) / 10.0) * bin_width_hz)
-                            if verbose > 1:
-                                msg_lib.info(
-                                    f'POWER {psd[j]} ----> {math.pow(10.0, float(psd[j]) / 10.0) * bin_width_hz}')
-
-                        else:
-                            if verbose > 1:
-                                msg_lib.info(f'{j} {period[j]} REJECTED')
-                    if verbose > 1:
-                        msg_lib.info(f'TOTAL POWER {power[k]}')
-                out_file.write("%20s %20s" % (previous_date, previous_time))
-                for index in range(0, len(bin_start)):
-                    out_file.write("%20.5e" % (power[index]))
-                out_file.write("\n")
-
-                # Init the records.
-                period = list()
-                psd = list()
-                power = list()
-
-                # Capture the first line tht was left over from previous iteration.
-                previous_line = previous_line.strip()
-                date, time, this_x, this_y = previous_line.split()
-                if type == 'frequency':
-                    this_x = 1.0 / float(this_x)
-                period.append(float(this_x))
-                psd.append(float(this_y))
-                previous_date = date
-                previous_time = time
+    for window in power_lib.read_windows(in_file, xtype):
+        window_list.append(window)
+        if len(window_list) >= param.windowBatch:
+            write_batch(window_list)
+            window_count += len(window_list)
+            window_list = list()
+if window_list:
+    write_batch(window_list)
+    window_count += len(window_list)
+out_file.close()
+if verbose:
+    msg_lib.info(f'INPUT: {window_count} PSD windows')
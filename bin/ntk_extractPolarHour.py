@@ -4,7 +4,6 @@ import sys
 import os
 import glob
 import importlib
-from obspy.core import UTCDateTime
 from datetime import date, timedelta as td
 
 # Import the Noise Toolkit libraries.
@@ -20,6 +19,7 @@ import msgLib as msg_lib
 import fileLib as file_lib
 import staLib as sta_lib
 import utilsLib as utils_lib
+import polarLib as polar_lib
 
 """  NAME:   ntk_ExtractPolarHour.py - is a Python a Python 3 script to extract hourly polarization values for 
           each of the variables defined by the "variables" parameter in the computePolarization parameter file 
@@ -44,9 +44,11 @@ import utilsLib as utils_lib
      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
   INPUT:
-      hourly polarization files
+      hourly polarization files or daily binary polarization DB files (polarDbFormat)
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: reads the binary polarization DB (polarDbFormat)
+     2026-10-19 IRIS DMC Product Team: the file start times of each day are parsed at once (utilsLib.get_datetime64)
      2020-11-16 Manoch: V.2.0.0 Python 3, use of Fedcatalog and adoption of PEP 8 style guide.
      2020-09-25 Timothy C. Bartholomaus, University of Idaho: conversion to python 3
      2015-09-15 V.0.5.0: Beta release
@@ -142,6 +144,13 @@ variable_list = param.variables
 data_directory = param.dataDirectory
 channel_directory = utils_lib.get_param(args, 'chandir', utils_lib.param(param, 'chanDir').chanDir, usage)
 
+# Polarization DB format.
+polar_db_format = utils_lib.param(param, 'polarDbFormat').polarDbFormat
+if polar_db_format not in polar_lib.POLAR_DB_FORMATS:
+    code = msg_lib.error(f'{script}, Invalid polarDbFormat  [{polar_db_format}] in the parameter file, '
+                         f'must be one of {polar_lib.POLAR_DB_FORMATS}', 2)
+    sys.exit(code)
+
 if channel_directory is None:
     code = msg_lib.error(f'{script}, could not find the "chanDir"  parameter in the parameter file', 2)
     sys.exit(code)
@@ -181,6 +190,8 @@ except Exception as ex:
     sys.exit(code)
 
 duration = end_datetime - start_datetime
+start_datetime64 = utils_lib.get_datetime64(start_datetime)
+end_datetime64 = utils_lib.get_datetime64(end_datetime)
 
 end_date = date(int(end_year), int(end_month), int(end_day))
 start_date = date(int(start_year), int(start_month), int(start_day))
@@ -233,8 +244,12 @@ for pn, variable in enumerate(variable_list):
             # Loop through the windows.
             for n in range(len(data_day_list)):
 
-                thisFile = os.path.join(polarDbDirTag, data_day_list[n],
-                                        polarization_db_file_tag + f'*{xtype}.txt')
+                if polar_db_format == 'binary':
+                    thisFile = os.path.join(polarDbDirTag, data_day_list[n],
+                                            f'{polarization_db_file_tag}.*.{xtype}.{polar_lib.POLAR_DAY_EXTENSION}')
+                else:
+                    thisFile = os.path.join(polarDbDirTag, data_day_list[n],
+                                            polarization_db_file_tag + f'*{xtype}.txt')
                 msg_lib.info(f'Day: {data_day_list[n]}, {thisFile}')
                 this_file_list = sorted(glob.glob(thisFile))
 
@@ -246,14 +261,43 @@ for pn, variable in enumerate(variable_list):
                 elif len(this_file_list) > 1:
                     if verbose:
                         msg_lib.info(f'{len(this_file_list)} files  found!')
+
+                # Binary polarization DB, the day files hold the values of all windows of the day.
+                if polar_db_format == 'binary':
+                    for this_polarization_file in this_file_list:
+                        if verbose > 0:
+                            msg_lib.info(f'polarization FILE: {this_polarization_file}')
+                        polar_day = polar_lib.load_polar_day(this_polarization_file)
+                        variable_index = list(polar_day['variables']).index(variable)
+                        x_label_list = polar_lib.x_labels(polar_day['x'])
+                        in_range_list = (start_datetime64 <= polar_day['times']) & \
+                                        (polar_day['times'] < end_datetime64)
+                        for window_time, window_values in zip(polar_day['times'][in_range_list],
+                                                              polar_day['values'][in_range_list]):
+                            this_file_time_label = str(window_time)
+                            if param.namingConvention != 'PQLX':
+                                this_file_time_label = this_file_time_label.replace(':', '_')
+                            this_out_date, this_out_time = this_file_time_label.split('T')
+                            for X, value in zip(x_label_list, window_values[:, variable_index].tolist()):
+                                V = str(round(value, param.decimalPlaces[variable]))
+                                output_file.write(f'{this_out_date}{param.separator}{this_out_time}'
+                                                  f'{param.separator}{X}{param.separator}{V}\n')
+                    continue
+
+                # The file start times of the day, parsed at once.
+                file_time_label_list = [this_polarization_file.split(polarization_db_file_tag + '.')[1].split('.')[0]
+                                        for this_polarization_file in this_file_list]
+                file_time_list = utils_lib.get_datetime64(file_time_label_list)
+                in_range_list = (start_datetime64 <= file_time_list) & (file_time_list < end_datetime64)
+
                 # Found the file, open it and read it.
-                for this_polarization_file in this_file_list:
+                for this_polarization_file, this_file_time_label, in_range in zip(this_file_list,
+                                                                                  file_time_label_list,
+                                                                                  in_range_list):
                     if verbose > 0:
                         msg_lib.info(f'polarization FILE: {this_polarization_file}')
-                    this_file_time_label = this_polarization_file.split(polarization_db_file_tag + '.')[1].split('.')[0]
-                    this_file_time = UTCDateTime(this_file_time_label)
 
-                    if start_datetime <= this_file_time < end_datetime:
+                    if in_range:
                         with open(this_polarization_file) as file:
                             if verbose > 0:
                                 msg_lib.info(f'OK, working on ...{this_polarization_file}')
@@ -47,6 +47,7 @@ import utilsLib as utils_lib
   hourly PSD files
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: the file start times of each day are parsed at once (utilsLib.get_datetime64)
      2020-11-16 Manoch: V.2.0.0 Python 3 and adoption of PEP 8 style guide.
      2015-04-02 Manoch: based on feedback from Robert Anthony, in addition to nan values other
                         non-numeric values may exist. The write that contains a flot() conversion
@@ -168,6 +169,9 @@ except Exception as ex:
     code = msg_lib.error(f'Invalid end ({end_date_time})\n{ex}', 2)
     sys.exit(code)
 
+start_datetime64 = utils_lib.get_datetime64(start_datetime)
+end_datetime64 = utils_lib.get_datetime64(end_datetime)
+
 delta = date(int(end_year), int(end_month), int(end_day)) - \
         date(int(start_year), int(start_month), int(start_day))
 
@@ -210,13 +214,17 @@ with open(output_file_name, 'w') as output_file:
             if verbose:
                 msg_lib.info(f'{len(this_file_list)} files  found!')
 
+        # The file start times of the day, parsed at once.
+        file_time_label_list = [file_lib.get_file_times(param.namingConvention, channel, this_psd_file)
+                                for this_psd_file in this_file_list]
+        file_time_list = utils_lib.get_datetime64([label[0] for label in file_time_label_list])
+        in_range_list = (start_datetime64 <= file_time_list) & (file_time_list <= end_datetime64)
+
         # Found the file, open it and read it.
-        for this_psd_file in this_file_list:
+        for this_psd_file, this_file_time_label, in_range in zip(this_file_list, file_time_label_list, in_range_list):
             if verbose > 0:
                 msg_lib.info(f'PSD FILE: {this_psd_file}')
-            this_file_time_label = file_lib.get_file_times(param.namingConvention, channel, this_psd_file)
-            this_file_time = UTCDateTime(this_file_time_label[0])
-            if start_datetime <= this_file_time <= end_datetime:
+            if in_range:
                 with open(this_psd_file) as file:
                     if verbose > 0:
                         msg_lib.info(f'working on ... {this_psd_file}')
@@ -20,6 +20,7 @@ import msgLib as msg_lib
 import fileLib as file_lib
 import staLib as sta_lib
 import utilsLib as utils_lib
+import powerLib as power_lib
 
 """
   NAME:
@@ -45,6 +46,9 @@ import utilsLib as utils_lib
      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: incremental update mode
+     2026-10-19 IRIS DMC Product Team: several window lengths and extra statistics from one read of the power file
+     2026-10-19 IRIS DMC Product Team: power file parsed once, medians from a sliding-window engine
      2020-11-16 Manoch: V.2.0.0 Python 3 and adoption of PEP 8 style guide.
      2015-02-20 Manoch: addressed the output file naming issue
      2014-11-24 Manoch: Beta (V.0.5) release
@@ -78,14 +82,22 @@ def usage():
           f'\n\nUsage:\n\t{script} to display the usage message (this message)'
           f'\n\n\t  OR'
           f'\n\n\t{script} param=FileName net=network sta=station loc=location chan=channel '
-          f' start=YYYY-MM-DDTHH:MM:SS end=YYYY-MM-DDTHH:MM:SS win=hour verbose=[0|1] file=PSD_file_name'
+          f' start=YYYY-MM-DDTHH:MM:SS end=YYYY-MM-DDTHH:MM:SS win=hour[,hour,...] stats=statistic[,statistic,...]'
+          f' update=[0|1] verbose=[0|1] file=PSD_file_name'
           f'\n\tto compute median power where:'
           f'\n\t  param\t\t[default: {default_param_file}] the configuration file name '
           f'\n\t  net\t\t[required] network code'
           f'\n\t  sta\t\t[required] station code'
           f'\n\t  loc\t\t[required] location ID'
           f'\n\t  chan\t\t[required] channel ID'
-          f'\n\t  win\t\t[required] smoothing window length in hours '
+          f'\n\t  win\t\t[required] smoothing window length in hours, separate multiple window lengths by comma '
+          f'(no space), all computed from one read of the power file'
+          f'\n\t  stats\t\t[default: {",".join(param.statistics) if param.statistics else "none"}] statistics to '
+          f'compute in addition to the median, mean and/or percentiles as p followed by the percent (like p10), '
+          f'separated by comma (no space)'
+          f'\n\t  update\t[0 or 1, default: 0] incremental mode, existing output files are kept up to the last '
+          f'window that ends before their last center and only the following windows (that may overlap new '
+          f'power values) are recomputed and appended, up to end; start is only used for new output files'
           f'\n\t  start\t\t[required] start date-time (UTC) for extraction '
           f'(format YYYY-MM-DDTHH:MM:SS)'
           f'\n\t  end\t\t[required] end date-time (UTC) for extraction '
@@ -101,6 +113,7 @@ def usage():
           f'\n\tThe smooth PDFs are stored  under the corresponding "POWER"/window directory:'
           f'\n\tWin(h)     Dir\n\t   6    ->  6h\n\t  12    -> 12h\n\t  24    ->  1d\n\t  96    ->  4d\n\t'
           f' 384    -> 16d'
+          f'\n\tthe other statistics are stored next to the median with the statistic name added to the file name.'
           f'\n\nExamples:'
           f'\n\n\t- usage:'
           f'\n\tpython {script}'
@@ -111,6 +124,10 @@ def usage():
           f'\n\tpython {script} param={default_param_file} net=TA sta=O18A loc=DASH chan=BHZ xtype=period verbose=0 '
           f'win=12 start=2008-08-14T00:00:00 end=2008-08-14T23:00:00 '
           f'file=TA.O18A.--.BHZ.2008-08-14.2008-08-14.txt'
+          f'\n\n\tor compute several window lengths with the 10th and 90th percentiles and the mean via:'
+          f'\n\tpython {script} param={default_param_file} net=TA sta=O18A loc=DASH chan=BHZ xtype=period verbose=0 '
+          f'win=6,24,96,384 stats=p10,p90,mean start=2008-08-14T00:00:00 end=2008-08-14T23:00:00 '
+          f'file=TA.O18A.--.BHZ.2008-08-14.2008-08-14.txt'
           f'\n\n\n\n')
 
 
@@ -128,7 +145,7 @@ else:
     usage()
     sys.exit()
 
-verbose = utils_lib.get_param(args, 'verbose', False, usage)
+verbose = utils_lib.is_true(utils_lib.get_param(args, 'verbose', False, usage))
 
 if verbose:
     msg_lib.info(f'script: {script} {len(sys.argv) - 1} args: {sys.argv}')
@@ -164,7 +181,20 @@ location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
 channel = utils_lib.get_param(args, 'chan', None, usage)
 start = utils_lib.get_param(args, 'start', None, usage)
 end = utils_lib.get_param(args, 'end', None, usage)
-window_width_hour = utils_lib.get_param(args, 'win', None, usage)
+window_width_hour_list = utils_lib.get_param(args, 'win', None, usage).split(',')
+update = utils_lib.is_true(utils_lib.get_param(args, 'update', 0, usage))
+statistic_list = utils_lib.get_param(args, 'stats', ','.join(param.statistics), usage).split(',')
+statistic_list = [statistic for statistic in statistic_list if statistic and statistic != 'median']
+for window_width_hour in window_width_hour_list:
+    if not utils_lib.is_number(window_width_hour) or float(window_width_hour) <= 0:
+        usage()
+        code = msg_lib.error(f'bad window length [{window_width_hour}]', 2)
+        sys.exit(code)
+for statistic in statistic_list:
+    if statistic != 'mean' and power_lib.statistic_percent(statistic) is None:
+        usage()
+        code = msg_lib.error(f'bad statistic [{statistic}], must be mean or p followed by a percent (like p10)', 2)
+        sys.exit(code)
 
 # NOTE: the input PSD file is assumed to have the same format as the output of the ntk_extractPsdHour.py script.
 power_file = utils_lib.get_param(args, 'file', None, usage)
@@ -177,107 +207,116 @@ if not os.path.isfile(power_file_name):
     code = msg_lib.error(f'Could not find the POWER file [{power_file_name}]', 2)
     sys.exit(code)
 
-with open(power_file_name) as input_file:
-    # Read the entire power file
-    lines = input_file.readlines()
-
-    # Find the last non-blank line
-    line_count = len(lines)
-    for i in range(1, len(lines)):
-        line = lines[-i].strip()
-        if len(line) > 0:
-            line_count = len(lines) - i + 1
-            break
-    if verbose:
-        msg_lib.info(f'INPUT: {line_count} lines')
-
-# Get the time of each line, skip headers.
-power_time = list()
-for i in range(2, line_count):
-    line = lines[i].strip()
-    values = line.split()
-    power_time.append(UTCDateTime(values[0] + 'T' + values[1]))
-
-# Window length in hours.
-#
-window_tag = file_lib.get_window_tag(window_width_hour)
-msg_lib.info(f'smoothing window {window_width_hour} hours')
-
-power_directory = os.path.join(power_directory, window_tag)
-if not os.path.exists(power_directory):
-    os.makedirs(power_directory)
-
-# Window length in hours and second plus the half window length
-# base on these calculate number of shifts that will be performed.
-window_width_second = float(window_width_hour) * 3600.0
-window_shift_second = param.windowShiftSecond
-msg_lib.info(f'Wind length and shift in seconds {window_width_second}, {window_shift_second}')
-start_time = UTCDateTime(start) - (window_width_second / 2.0)  # we want the first sample at start_time
-end_time = UTCDateTime(end) + (window_width_second / 2.0)
-duration = end_time - start_time  # seconds to process
-n_shift = int(float(duration / window_shift_second))
-
-# Place the median directory under the power directory.
+# Read the power file once into time-sorted arrays.
+power_time, power = power_lib.read_power(power_file_name)
 if verbose:
-    msg_lib.info(f'POWER PATH: {power_directory}')
-
-if not file_lib.make_path(power_directory):
-    code = msg_lib.error(f'Error, failed to access {power_directory}', 2)
-    sys.exit(code)
-
-# Out_power_file_name = file_lib.getFileName(param.namingConvention, power_directory,
-out_power_file_name = file_lib.get_file_name(param.namingConvention, power_directory,
-                                           [power_file.replace('.txt', ''), window_tag])
-
-# Open the output file.
-with open(os.path.join(power_directory, out_power_file_name), 'w') as output_file:
-    # w\Write the output header.
-    output_file.write(f'Period\n')
-    output_file.write(f'{"Date-Time":20s}')
-    for k in range(len(bin_start)):
-        output_file.write(f"{f'{bins[k]} ({bin_start[k]}-{bin_end[k]})':20s}")
-    output_file.write("\n")
-
-    # Loop through the windows.
-    for n in range(0, n_shift + 1):
-        # Get start and end of the current window.
-        this_window_start = start_time + float(n * window_shift_second)
-        this_window_end = this_window_start + window_width_second
-        center_time = this_window_start + (this_window_end - this_window_start) / 2.0
-        if center_time < UTCDateTime(start) or center_time > UTCDateTime(end):
-            continue
+    msg_lib.info(f'INPUT: {len(power_time)} lines')
+
+# All the windows share the parsed power file, each window length gets its own window directory under the power
+# directory.
+for window_width_hour in window_width_hour_list:
+    # Window length in hours.
+    #
+    window_tag = file_lib.get_window_tag(window_width_hour)
+    msg_lib.info(f'smoothing window {window_width_hour} hours')
+
+    window_directory = os.path.join(power_directory, window_tag)
+    if not os.path.exists(window_directory):
+        os.makedirs(window_directory)
+
+    # Window length in hours and second plus the half window length
+    # base on these calculate number of shifts that will be performed.
+    window_width_second = float(window_width_hour) * 3600.0
+    window_shift_second = param.windowShiftSecond
+    msg_lib.info(f'Wind length and shift in seconds {window_width_second}, {window_shift_second}')
+    start_time = UTCDateTime(start) - (window_width_second / 2.0)  # we want the first sample at start_time
+    end_time = UTCDateTime(end) + (window_width_second / 2.0)
+    duration = end_time - start_time  # seconds to process
+    n_shift = int(float(duration / window_shift_second))
+
+    # Place the median directory under the power directory.
+    if verbose:
+        msg_lib.info(f'POWER PATH: {window_directory}')
+
+    if not file_lib.make_path(window_directory):
+        code = msg_lib.error(f'Error, failed to access {window_directory}', 2)
+        sys.exit(code)
+
+    # The windows centered between start and end.
+    window_start = start_time.timestamp + np.arange(n_shift + 1) * float(window_shift_second)
+    center_time = window_start + window_width_second / 2.0
+    keep = (UTCDateTime(start).timestamp <= center_time) & (center_time <= UTCDateTime(end).timestamp)
+    window_start = window_start[keep]
+
+    # The output files, the median goes to the window file and each of the other statistics to a window file
+    # tagged with the statistic name. In the update mode, an existing output file is kept up to the last center
+    # whose window ends before its last center, the windows of the following centers (on the grid of the file)
+    # overlap the new input and are recomputed and appended. Files with the same windows are computed together.
+    file_groups = dict()
+    for statistic in ['median'] + statistic_list:
+        tag_list = [power_file.replace('.txt', ''), window_tag]
+        if statistic != 'median':
+            tag_list.append(statistic)
+        out_power_file_name = file_lib.get_file_name(param.namingConvention, window_directory, tag_list)
+        this_window_start = window_start
+        offset = None
+        if update and os.path.isfile(out_power_file_name):
+            centers, offsets = power_lib.read_centers(out_power_file_name)
+            if len(centers) > 0:
+                cut_time = centers[-1] - window_width_second / 2.0
+                offset = offsets[np.searchsorted(centers, cut_time, side='right')]
+                first_shift = int(np.floor(-window_width_second / 2.0 / window_shift_second)) + 1
+                last_shift = int(np.floor((max(centers[-1], UTCDateTime(end).timestamp) - centers[-1]) /
+                                          window_shift_second))
+                this_window_start = centers[-1] - window_width_second / 2.0 + \
+                    np.arange(first_shift, last_shift + 1) * float(window_shift_second)
+                msg_lib.info(f'UPDATE: {out_power_file_name} after '
+                             f'{UTCDateTime(cut_time).strftime("%Y-%m-%dT%H:%M:%S.0")}')
+        group_key = this_window_start.tobytes()
+        if group_key not in file_groups:
+            file_groups[group_key] = (this_window_start, list())
+        file_groups[group_key][1].append((statistic, out_power_file_name, offset))
+
+    for window_start, file_list in file_groups.values():
+        window_end = window_start + window_width_second
+        center_time = window_start + window_width_second / 2.0
+        center_label = np.datetime_as_string(np.round(center_time * 1000.0).astype('datetime64[ms]'), unit='s')
 
         if verbose:
-            msg_lib.info(f'START: {this_window_start.strftime("%Y-%m-%dT%H:%M:%S.0")} '
-                         f'END: {this_window_end.strftime("%Y-%m-%dT%H:%M:%S.0")}')
-            msg_lib.info(f'POINT: {center_time.strftime("%Y-%m-%dT%H:%M:%S.0")}')
-
-        # Initialize the list that will hold all the extracted hourly Power.
-        all_power = list()
-        for i in range(len(bins)):
-            all_power.append(list())
-
-        # Cycle through all the power lines for this window and extract the values that fall in this window.
-        for p in range(2, line_count):
-            if this_window_start <= power_time[p - 2] <= this_window_end:
-                """ For each row, split column values
-                    columns are:
-                        Date      Time 
-                        values[0] values[1]  values[2]  values[3] ...
-                """
-                line = lines[p]
-                line = line.strip()
-                values = line.split()
-
-                # Save the the value of interest (start at column 2, 0=Date and 1=Time).
-                for i in range(len(bins)):
-                    all_power[i].append(float(values[2 + i]))
+            for n in range(len(window_start)):
+                msg_lib.info(f'START: {UTCDateTime(window_start[n]).strftime("%Y-%m-%dT%H:%M:%S.0")} '
+                             f'END: {UTCDateTime(window_end[n]).strftime("%Y-%m-%dT%H:%M:%S.0")}')
+                msg_lib.info(f'POINT: {center_label[n]}.0')
 
-        # Done, write out the results.
-        if len(all_power[0]) > 0:
-            output_file.write(f'{center_time.strftime("%Y-%m-%dT%H:%M:%S.0"):20s}')
-            for i in range(len(bins)):
-                output_file.write(f'{np.median(all_power[i]):20.5e}')
-            output_file.write("\n")
+        # Median and other statistics of the power values that fall in each window, updated incrementally as the
+        # window slides.
+        sample_count, window_statistics = power_lib.rolling_statistics(power_time, power, window_start, window_end,
+                                                                       [item[0] for item in file_list])
 
-msg_lib.info(f'OUTPUT: {os.path.join(power_directory, out_power_file_name)}')
+        # Done, write out the results.
+        for statistic, out_power_file_name, offset in file_list:
+            if offset is None:
+                # Open the output file.
+                output_file = open(out_power_file_name, 'w')
+
+                # Write the output header.
+                output_file.write(f'Period\n')
+                output_file.write(f'{"Date-Time":20s}')
+                for k in range(len(bin_start)):
+                    output_file.write(f"{f'{bins[k]} ({bin_start[k]}-{bin_end[k]})':20s}")
+                output_file.write("\n")
+            else:
+                # Drop the lines to recompute and append to the rest.
+                with open(out_power_file_name, 'rb+') as output_file:
+                    output_file.truncate(offset)
+                output_file = open(out_power_file_name, 'a')
+
+            for n in range(len(window_start)):
+                if sample_count[n] > 0:
+                    output_file.write(f'{f"{center_label[n]}.0":20s}')
+                    for i in range(len(bins)):
+                        output_file.write(f'{window_statistics[statistic][n][i]:20.5e}')
+                    output_file.write("\n")
+            output_file.close()
+
+            msg_lib.info(f'OUTPUT: {out_power_file_name}')
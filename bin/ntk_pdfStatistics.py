@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import glob
+import importlib
+from datetime import date
+
+# Import the Noise Toolkit libraries.
+ntk_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+param_path = os.path.join(ntk_directory, 'param')
+lib_path = os.path.join(ntk_directory, 'lib')
+
+sys.path.append(param_path)
+sys.path.append(lib_path)
+
+import msgLib as msg_lib
+import fileLib as file_lib
+import staLib as sta_lib
+import utilsLib as utils_lib
+import pdfLib as pdf_lib
+
+"""
+ Name: ntk_pdfStatistics.py - a Python 3 script to compute the percentile and mode curves of the PDF of a time range
+       directly from the PDF count matrices saved by ntk_binPsdDay.py and ntk_binPolarDay.py.
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ INPUT:
+
+    daily PDF count matrices and their monthly and yearly rollups (see ntk_rollupPdf.py), the daily files
+    (D???.bin or D???.npz) and the group PDF files of ntk_binPsdDay.py and ntk_binPolarDay.py
+
+ HISTORY:
+
+    2026-10-19 IRIS DMC Product Team: reads the daily and group PDF files, the PDF store is no longer required
+    2026-10-19 IRIS DMC Product Team: created
+
+"""
+
+version = 'V.2.0.0'
+script = sys.argv[0]
+script = os.path.basename(script)
+
+# Initial mode settings.
+verbose = False
+default_param_file = 'pdfStatistics'
+if os.path.isfile(os.path.join(param_path, f'{default_param_file}.py')):
+    param = importlib.import_module(default_param_file)
+else:
+    code = msg_lib.error(f'could not load the default parameter file  [param/{default_param_file}.py]', 2)
+    sys.exit(code)
+
+
+def usage():
+    """ Usage message.
+   """
+    print(f'\n\n{script} version {version}\n\n'
+          f'A Python 3 script to compute the percentile and mode curves of the PDF of a time range directly from '
+          f'the daily PDFs of ntk_binPsdDay.py and ntk_binPolarDay.py, without re-reading the PSD/polarization '
+          f'files. The PDF of the time range is built from the PDF store (pdfStoreSave parameter) as '
+          f'ntk_rollupPdf.py does, the days that the store does not cover are read from the daily files '
+          f'(D???.bin or D???.npz). The statistics of all periods/frequencies are computed from the cumulative '
+          f'counts of the PDF. With the group argument, the statistics of each key of a PDF group '
+          f'(pdfGroups parameter of ntk_binPsdDay.py) are computed from the group files instead.'
+          f'\n\nUsage:\n\t{script} to display the usage message (this message)'
+          f'\n\t  OR'
+          f'\n\t{script} param=FileName net=network sta=station loc=location chan=channel'
+          f' start=YYYY-MM-DD end=YYYY-MM-DD xtype=[period|frequency] var=variable group=group'
+          f' percentiles=p1,p2,... verbose=[0|1]\n'
+          f'\n\twhere:'
+          f'\n\t  param\t\t[default: {default_param_file}] the configuration file name '
+          f'\n\t  net\t\t[required] network code'
+          f'\n\t  sta\t\t[required] station code'
+          f'\n\t  loc\t\t[required] location ID'
+          f'\n\t  chan\t\t[required] channel ID (PSD PDFs) or channel directory (polarization PDFs, '
+          f'for example BHZ_BHE_BHN)'
+          f'\n\t  xtype\t\t[required] X-axis type of the PDF (period or frequency), as binned by '
+          f'ntk_binPsdDay.py/ntk_binPolarDay.py'
+          f'\n\t  var\t\t[default: None] polarization variable (as defined by the "variables" parameter '
+          f'in the computePolarization parameter file), required for polarization PDFs only'
+          f'\n\t  group\t\t[default: None] PDF group ({", ".join(pdf_lib.PDF_GROUPS)}) of the PSD PDFs, the '
+          f'statistics are computed for each key of the group files binned for the same start and end dates'
+          f'\n\t  start\t\t[required] start date (UTC) of the PDF (format YYYY-MM-DD)'
+          f'\n\t  end\t\t[required] end date (UTC) of the PDF, included (format YYYY-MM-DD)'
+          f'\n\t  percentiles\t[default: {",".join([str(p) for p in param.percentiles])}] comma-separated list '
+          f'of the percentiles to compute'
+          f'\n\t  verbose\t[0 or 1, default: {param.verbose}] to run in verbose mode set to 1'
+          f'\n\nOutput format: '
+          f'\n\n\tX-value (period/frequency), the percentiles, the mode and the number of hits with values '
+          f'separated using the "separator" character specified in the parameter file. A percentile is the start '
+          f'of the first bin where the cumulative count reaches that percent of the hits and the mode is the start '
+          f'of the bin with the most hits.'
+          f'\n\nOutput file: '
+          f'\n\tFull path to the  output data file is provided at the end of the run. '
+          f'\n\n\tThe output file name has the form:'
+          f'\n\t\tnet.sta.loc.chan.start.end[.var].xtype.stats.txt'
+          f'\n\tfor example:'
+          f'\n\t\tTA.O18A.--.BHZ.2008-01-01.2008-12-31.period.stats.txt'
+          f'\n\nExamples:'
+          f'\n\n\t- usage:'
+          f'\n\tpython {script}'
+          f'\n\n\t- Assuming that you already have binned the PSDs "successfully" via:'
+          f'\n\tpython ntk_binPsdDay.py net=TA sta=O18A loc=DASH chan=BHZ start=2008-08-14T12:00:00 '
+          f'end=2008-08-14T13:30:00 xtype=period'
+          f'\n\n\tyou can compute the noise percentiles and mode of a long time range via:'
+          f'\n\tpython {script} net=TA sta=O18A loc=DASH chan=BHZ start=2008-01-01 end=2008-12-31 '
+          f'xtype=period'
+          f'\n\n\tand for the polarization PDFs:'
+          f'\n\tpython {script} net=TA sta=O18A loc=DASH chan=BHZ_BHE_BHN var=thetaH start=2008-01-01 '
+          f'end=2008-12-31 xtype=frequency percentiles=5,50,95'
+          f'\n\n\n\n')
+
+
+# Get the run arguments.
+args = utils_lib.get_args(sys.argv, usage)
+if not args:
+    usage()
+    sys.exit(0)
+
+# Import the user-provided parameter file. The parameter file is under the param directory at the same level
+# as the script directory.
+param_file = utils_lib.get_param(args, 'param', default_param_file, usage)
+
+# Import the parameter file if it exists.
+if os.path.isfile(os.path.join(param_path, f'{param_file}.py')):
+    param = importlib.import_module(param_file)
+else:
+    usage()
+    code = msg_lib.error(f'bad parameter file name [{param_file}]', 2)
+    sys.exit(code)
+
+verbose = utils_lib.is_true(utils_lib.get_param(args, 'verbose', param.verbose, usage))
+network = utils_lib.get_param(args, 'net', None, usage)
+station = utils_lib.get_param(args, 'sta', None, usage)
+location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
+channel = utils_lib.get_param(args, 'chan', None, usage)
+xtype = utils_lib.get_param(args, 'xtype', None, usage)
+variable = args.get('var', None)
+group = args.get('group', None)
+percentiles = utils_lib.get_param(args, 'percentiles', ','.join([str(p) for p in param.percentiles]), usage)
+try:
+    percentiles = [float(p) for p in percentiles.split(',')]
+except Exception as ex:
+    usage()
+    code = msg_lib.error(f'Invalid percentiles ({percentiles})\n{ex}', 2)
+    sys.exit(code)
+
+if not percentiles or min(percentiles) < 0 or max(percentiles) > 100:
+    usage()
+    code = msg_lib.error(f'Percentiles must be between 0 and 100 {percentiles}', 2)
+    sys.exit(code)
+
+# The PDF days, we always work with full days, so we discard user hours, if any.
+start_date_time = utils_lib.get_param(args, 'start', None, usage).split('T')[0]
+end_date_time = utils_lib.get_param(args, 'end', None, usage).split('T')[0]
+try:
+    start_date = date(*map(int, start_date_time.split('-')))
+    end_date = date(*map(int, end_date_time.split('-')))
+except Exception as ex:
+    usage()
+    code = msg_lib.error(f'Invalid start/end ({start_date_time}, {end_date_time})\n{ex}', 2)
+    sys.exit(code)
+
+if end_date < start_date:
+    usage()
+    code = msg_lib.error(f'Bad start/end times [{start_date_time}, {end_date_time}]', 2)
+    sys.exit(code)
+
+if xtype not in param.xType:
+    usage()
+    code = msg_lib.error(f'Bad xtype [{xtype}], must be one of {param.xType}', 2)
+    sys.exit(code)
+
+if group is not None and group not in pdf_lib.PDF_GROUPS:
+    usage()
+    code = msg_lib.error(f'Bad group [{group}], must be one of {pdf_lib.PDF_GROUPS}', 2)
+    sys.exit(code)
+
+if group is not None and variable is not None:
+    usage()
+    code = msg_lib.error(f'The PDF groups are only binned for the PSDs, group [{group}] can not be used with '
+                         f'var [{variable}]', 2)
+    sys.exit(code)
+
+# The bins of the binning script, to read the text daily and group files.
+if variable is None:
+    pdf_edges = pdf_lib.get_bin_edges(*param.psdBins)
+    pdf_separator = param.psdSeparator
+elif variable in param.polarBins:
+    pdf_edges = pdf_lib.get_bin_edges(*param.polarBins[variable])
+    pdf_separator = param.polarSeparator
+else:
+    usage()
+    code = msg_lib.error(f'Bad var [{variable}], must be one of {list(param.polarBins)}', 2)
+    sys.exit(code)
+
+pdf_dir_tag, pdf_file_tag = file_lib.get_dir(param.dataDirectory, param.pdfDirectory, network,
+                                             station, location, channel)
+msg_lib.info(f'PDF DIR TAG: {pdf_dir_tag}')
+
+# The PDFs to compute the statistics of, keyed by their group key (None without group).
+pdf_list = dict()
+files_read = list()
+if group is None:
+    try:
+        pdf, files_read = pdf_lib.load_range(pdf_dir_tag, start_date, end_date, xtype, variable, edges=pdf_edges,
+                                             separator=pdf_separator)
+    except Exception as ex:
+        code = msg_lib.error(f'failed to read the PDFs under {pdf_dir_tag}\n{ex}', 3)
+        sys.exit(code)
+    if pdf is not None:
+        pdf_list[None] = pdf
+else:
+    # The group files of the same start and end dates, in the text or the sparse daily format.
+    group_path = os.path.join(pdf_dir_tag, param.pdfGroupDirectory, group)
+    group_file = file_lib.get_file_name(param.namingConvention, group_path,
+                                        [pdf_file_tag, start_date_time, end_date_time, group, '*'])
+    group_file = os.path.splitext(group_file)[0]
+    try:
+        for file_name in sorted(glob.glob(f'{group_file}.txt')) + \
+                sorted(glob.glob(f'{group_file}.{pdf_lib.STORE_EXTENSION}')):
+            key = os.path.splitext(file_name)[0].split('.')[-1]
+            if file_name.endswith(f'.{pdf_lib.STORE_EXTENSION}'):
+                pdf_list[key] = pdf_lib.load(file_name)
+            else:
+                pdf_list[key] = pdf_lib.load_text(file_name, pdf_edges, pdf_separator)
+            files_read.append(file_name)
+    except Exception as ex:
+        code = msg_lib.error(f'failed to read the PDF group files under {group_path}\n{ex}', 3)
+        sys.exit(code)
+
+if verbose:
+    for file_name in files_read:
+        msg_lib.info(f'READ: {file_name}')
+msg_lib.info(f'{len(files_read)} PDF file(s) read')
+
+if not pdf_list:
+    code = msg_lib.error(f'No PDF count matrices found for {start_date_time} to {end_date_time}', 2)
+    sys.exit(code)
+
+for key in pdf_list:
+    keys, percentile_values, mode_values, total = pdf_lib.statistics(pdf_list[key], percentiles)
+
+    tag_list = [pdf_file_tag, start_date_time, end_date_time]
+    if variable is not None:
+        tag_list.append(variable)
+    if group is not None:
+        tag_list.extend([group, key])
+    tag_list.append(xtype)
+    tag_list.append('stats')
+    output_file_name = file_lib.get_file_name(param.namingConvention, pdf_dir_tag, tag_list)
+    with open(output_file_name, 'w') as output_file:
+        header = [f'P{p:g}' for p in percentiles]
+        output_file.write(f'X{param.separator}{param.separator.join(header)}{param.separator}Mode'
+                          f'{param.separator}Hits\n')
+        for i, x_key in enumerate(keys):
+            values = param.separator.join([str(float(value)) for value in percentile_values[i]])
+            output_file.write(f'{x_key}{param.separator}{values}{param.separator}{float(mode_values[i])}'
+                              f'{param.separator}{total[i]}\n')
+    msg_lib.info(f'OUTPUT FILE: {output_file_name}')
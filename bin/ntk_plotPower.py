@@ -6,7 +6,8 @@ import os
 import datetime
 
 import importlib
-from obspy.core import UTCDateTime
+import multiprocessing
+import numpy as np
 
 import matplotlib.pyplot as plt
 
@@ -24,6 +25,7 @@ import msgLib as msg_lib
 import fileLib as file_lib
 import staLib as sta_lib
 import utilsLib as utils_lib
+import powerLib as power_lib
 import shared
 
 """
@@ -48,6 +50,10 @@ import shared
      along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
   HISTORY:
+     2026-10-19 IRIS DMC Product Team: batch mode, a list of plot jobs rendered off screen by a pool of processes
+     2026-10-19 IRIS DMC Product Team: the median power series is downsampled before plotting
+     2026-10-19 IRIS DMC Product Team: zoomed-out views are plotted from the coarsest sufficient power rollup
+     2026-10-19 IRIS DMC Product Team: the time column is parsed at once (utilsLib.get_datetime64)
      2020-11-16 Manoch: V.2.0.0 Python 3 and adoption of PEP 8 style guide.
      2015-02-20 Manoch: addressed the output file naming issue
      2014-11-24 Manoch: V.0.5, modified the inpot format to read
@@ -91,12 +97,26 @@ def usage():
           f'\n\t  chan\t\t[required] channel ID'
           f'\n\t  bin\t\t[required] bin to process(name as defined in the parameter file)'
           f'\n\t  ymax\t\tmaximum value for the y-axis'
-          f'\n\t  file\t\t[required] the median PSD power file '
+          f'\n\t  file\t\t[required] the median PSD power file, optional with power '
           f'frequency for outputs and plots)'
+          f'\n\t  power\t\t[default: None] the band power file (ntk_computePower.py output) whose daily, weekly '
+          f'and monthly rollups (ntk_rollupPower.py) are used for the zoomed-out views. The coarsest rollup with at '
+          f'least one period per plot pixel (plotSize and plotDpi parameters) over the start to end time span is '
+          f'plotted (median with the min-max range); file and win are only required when no rollup is coarse '
+          f'enough'
+          f'\n\t  downsample\t[none, minmax or lttb, default: {param.plotDownsample}] downsampling of the median '
+          f'power series to about plotPoints ({param.plotPoints}) points before plotting: minmax keeps the minimum '
+          f'and maximum of each pixel column (envelope and outliers), lttb the Largest-Triangle-Three-Buckets points'
           f'\n\t  start\t\t[required] start date-time (UTC) for extraction '
           f'(format YYYY-MM-DDTHH:MM:SS)'
           f'\n\t  end\t\t[required] end date-time (UTC) for extraction '
           f'(format YYYY-MM-DDTHH:MM:SS)'
+          f'\n\t  jobs\t\t[default: None] batch mode job file, one plot per line given as run arguments '
+          f'(key=value, for example sta=SLM chan=BHZ bin=LM,SM,PM win=12 file=...) that override those of the '
+          f'command line, a comma separated bin list makes one plot per bin. The plots are rendered off screen '
+          f'(Agg), each input file is read once and the jobs that share it are plotted by the same process on a '
+          f'reused figure. Lines starting with # are ignored'
+          f'\n\t  workers\t[default: {param.plotWorkers}] number of processes of the batch mode'
           f'\n\t  verbose\t[0 or 1, default: {param.verbose}] to run in verbose mode set to 1'
           f'\n\n\t   INPUT:'
           f'\n\n\t   The PSD median power file created by ntk_medianPower.py \n'
@@ -138,9 +158,284 @@ def usage():
           f'\n\t\tpython {script} param={default_param_file} param=plotPower net=NM sta=SLM loc=DASH chan=BHZ '
           f'start=2009-03-01T00:00:00 end=2009-03-31T00:00:00 win=12 bin=SM '
           f'file=NM.SLM.--.BHZ.2009-03-01.2009-03-31.12h.txt ymax=0.06 bin=SM'
+          f'\n\n\tor, for a multi-year view, from the rollups of the power file built by ntk_rollupPower.py:'
+          f'\n\t\tpython {script} net=NM sta=SLM loc=DASH chan=BHZ start=2005-01-01T00:00:00 '
+          f'end=2009-12-31T00:00:00 bin=SM power=NM.SLM.--.BHZ.2005-01-01.2009-12-31.txt ymax=0.06'
+          f'\n\n\tor, in batch mode with the jobs listed in nightly.txt:'
+          f'\n\t\tpython {script} net=NM loc=DASH start=2009-03-01T00:00:00 end=2009-03-31T00:00:00 ymax=0.06 '
+          f'jobs=nightly.txt workers=4'
           f'\n\n\n\n')
 
 
+def get_job(job_args):
+    """Check the run arguments of one plot and return them as a plot job."""
+    job = utils_lib.ObjDict()
+    job.network = utils_lib.get_param(job_args, 'net', None, usage)
+    job.station = utils_lib.get_param(job_args, 'sta', None, usage)
+    job.location = sta_lib.get_location(utils_lib.get_param(job_args, 'loc', None, usage))
+    job.channel = utils_lib.get_param(job_args, 'chan', None, usage)
+    job.start_date_time = utils_lib.get_param(job_args, 'start', None, usage)
+    job.end_date_time = utils_lib.get_param(job_args, 'end', None, usage)
+    job.ymax = utils_lib.get_param(job_args, 'ymax', None, usage)
+
+    # The band power file whose rollups (ntk_rollupPower.py) are used for the zoomed-out views, if any. The median
+    # power file and its window are then only needed when no rollup level is coarse enough.
+    job.rollup_power_file = utils_lib.get_param(job_args, 'power', '', usage)
+    job.window_width_hour = utils_lib.get_param(job_args, 'win', '' if job.rollup_power_file else None, usage)
+
+    # Moving window length in hours
+    #  - 6hrs 1d(24h) 4d(96h) 16d(384h) ...
+    job.window_tag = file_lib.get_window_tag(job.window_width_hour) if job.window_width_hour else None
+
+    job.period_bin = utils_lib.get_param(job_args, 'bin', None, usage)
+    if job.period_bin not in param.bins:
+        code = msg_lib.error(f'bad bin name [{job.period_bin}]', 2)
+        sys.exit(code)
+
+    job.file_name = utils_lib.get_param(job_args, 'file', '' if job.rollup_power_file else None, usage)
+
+    job.downsample_method = utils_lib.get_param(job_args, 'downsample', param.plotDownsample, usage)
+    if job.downsample_method not in power_lib.DOWNSAMPLE_METHODS:
+        usage()
+        code = msg_lib.error(f'bad downsample method [{job.downsample_method}], must be one of '
+                             f'{", ".join(power_lib.DOWNSAMPLE_METHODS)}', 2)
+        sys.exit(code)
+
+    # We always want to start_date_time from the beginning of the day, so we discard user hours, if any
+    job.start_datetime = utils_lib.time_info(job.start_date_time)[0]
+
+    # end_date_time is inclusive.
+    job.end_datetime = utils_lib.time_info(job.end_date_time)[0]
+
+    job.power_directory = os.path.join(param.dataDirectory, param.powerDirectory,
+                                       ".".join([job.network, job.station, job.location]), job.channel)
+
+    # The coarsest power rollup level that still has one period per plot pixel over the requested time span.
+    job.rollup_level = None
+    if job.rollup_power_file:
+        rollup_directory = os.path.join(job.power_directory, param.rollupDirectory)
+        level_list = [level for level in power_lib.ROLLUP_LEVELS
+                      if os.path.isfile(power_lib.rollup_file_name(rollup_directory, job.rollup_power_file, level))]
+        job.rollup_level = power_lib.select_rollup_level(job.end_datetime - job.start_datetime,
+                                                         param.plotSize[0] * param.plotDpi, level_list)
+        if verbose:
+            msg_lib.info(f'ROLLUP LEVELS: {level_list}, selected: {job.rollup_level}')
+        if job.rollup_level is None and not (job.file_name and job.window_tag):
+            code = msg_lib.error(f'no rollup of {job.rollup_power_file} is coarse enough for the requested time '
+                                 f'span, the median power file (file) and its window (win) are required', 2)
+            sys.exit(code)
+
+    # The input file of the plot, a power rollup or a median power file.
+    if job.rollup_level is not None:
+        job.input_file = power_lib.rollup_file_name(rollup_directory, job.rollup_power_file, job.rollup_level)
+    else:
+        job.input_file = os.path.join(job.power_directory, job.window_tag, job.file_name)
+    return job
+
+
+def read_input(input_file, is_rollup):
+    """Read the input file of a plot once per process, a power rollup or a median power file (times and all the bin
+    columns)."""
+    if input_file in input_cache:
+        return input_cache[input_file]
+
+    if verbose:
+        msg_lib.info(f'OPENING: {input_file}')
+    if is_rollup:
+        input_cache[input_file] = power_lib.load_rollup(input_file)
+        return input_cache[input_file]
+
+    with open(input_file) as file:
+        # Read the entire power file.
+        lines = file.readlines()
+
+    # Find the last non-blank line.
+    line_count = len(lines)
+    for i in range(1, len(lines)):
+        line = lines[-i].strip()
+        if len(line) > 0:
+            line_count = len(lines) - i + 1
+            break
+    if verbose:
+        msg_lib.info(f'INPUT: {line_count} lines')
+
+    #
+    # get the time of each line and the power, skip headers
+    #
+    time_label_list = list()
+    power_list = list()
+    for i in range(2, line_count):
+        line = lines[i]
+        line = line.strip()
+        values = line.split()
+        time_label_list.append(values[0])
+        power_list.append([float(value) for value in values[1:]])
+
+    # Parse the time column at once.
+    input_cache[input_file] = {'time': utils_lib.get_datetime64(time_label_list),
+                               'power': np.array(power_list, dtype=float).reshape(len(time_label_list), -1)}
+    return input_cache[input_file]
+
+
+def plot_job(fig, job):
+    """Plot the power of a job on the (cleared) figure and save it. Return the image file name, None if there is
+    no data to plot."""
+    binIndex = param.binIndex[job.period_bin]
+    rangeLabel = param.rangeLabel[binIndex]
+    factor = param.factor[binIndex]
+    factorLabel = param.factorLabel[binIndex]
+    ymin = param.ymin[binIndex]
+    image_tag = param.imageTag[binIndex]
+    ymax = job.ymax
+
+    yLabel = rangeLabel + factorLabel
+    if verbose:
+        msg_lib.info(f'PERIOD BIN {job.period_bin} from {param.binStart[job.period_bin]} to '
+                     f'{param.binEnd[job.period_bin]}')
+
+    start_datetime64 = utils_lib.get_datetime64(job.start_datetime)
+    end_datetime64 = utils_lib.get_datetime64(job.end_datetime)
+    xStartL = job.start_date_time.split('T')[0]
+    xEndL = job.end_date_time.split('T')[0]
+
+    xminL = datetime.datetime(int(xStartL.split('-')[0]), int(xStartL.split('-')[1]), int(xStartL.split('-')[2]),
+                              0, 0, 0)
+    xmaxL = datetime.datetime(int(xEndL.split('-')[0]), int(xEndL.split('-')[1]), int(xEndL.split('-')[2]), 0, 0, 0)
+
+    if verbose:
+        msg_lib.info(f'START: {job.start_date_time} END: {job.end_date_time}  YMAX: {ymax}')
+
+    data = read_input(job.input_file, job.rollup_level is not None)
+    Y_min = list()
+    Y_max = list()
+    if job.rollup_level is not None:
+        title = " ".join([file_lib.get_tag(".", [job.network, job.station.replace(',', '+'), job.location]),
+                          job.period_bin, job.rollup_level, "median, min and max"])
+        rollup_time = data['start'].astype('datetime64[m]')
+        in_range = (start_datetime64 <= rollup_time) & (rollup_time <= end_datetime64)
+        X = rollup_time[in_range].astype(object).tolist()
+        Y = (data['median'][in_range, binIndex - 1] * factor).tolist()
+        Y_min = (data['minimum'][in_range, binIndex - 1] * factor).tolist()
+        Y_max = (data['maximum'][in_range, binIndex - 1] * factor).tolist()
+    else:
+        title = " ".join([file_lib.get_tag(".", [job.network, job.station.replace(',', '+'), job.location]),
+                          job.period_bin, "with", job.window_tag, "sliding window"])
+        image_tag = "_".join([image_tag, job.window_tag])
+        in_range = (start_datetime64 <= data['time']) & (data['time'] <= end_datetime64)
+        power_time = data['time'][in_range]
+        power_value = data['power'][in_range, binIndex - 1] * factor
+
+        # Downsample the series to a fixed number of points before plotting, the plot times are to the minute.
+        keep = power_lib.downsample(power_time.astype(np.int64), power_value, param.plotPoints,
+                                    job.downsample_method)
+        if verbose:
+            msg_lib.info(f'DOWNSAMPLE ({job.downsample_method}): {len(power_value)} -> {len(keep)} points')
+        X = power_time[keep].astype('datetime64[m]').astype(object).tolist()
+        Y = power_value[keep].tolist()
+
+    if len(X) <= 1:
+        msg_lib.error(f'No data found in {job.input_file}', 2)
+        return None
+    msg_lib.info(f'Maximum Y: {max(Y)}')
+
+    # Convert the column XYZ data to grid for plotting.
+    if verbose:
+        msg_lib.info(f'PLOT SIZE: {param.plotSize}')
+
+    # The production label.
+    production_date = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+    production_label = f'{shared.production_label}'
+    production_label = f'{production_label} {script} {version}'
+    production_label = f'{production_label} {production_date} UTC'
+    production_label = f'{production_label} doi:{shared.ntk_doi}'
+
+    plabel_x, plabel_y = shared.production_label_position
+
+    fig.clf()
+    fig.set_facecolor('w')
+
+    xStart = datetime.datetime(int(xStartL.split('-')[0]), int(xStartL.split('-')[1]), int(xStartL.split('-')[2]),
+                               0, 0, 0) + datetime.timedelta(seconds=7200)
+
+    for i in range(0, 1):
+        ax = fig.add_subplot(1, 1, i + 1)
+        ax.text(plabel_x, 2 * plabel_y, production_label, horizontalalignment='left', fontsize=5,
+                verticalalignment='top', transform=ax.transAxes)
+
+        if verbose:
+            msg_lib.info(f'DOT COLOR: {dotColor[i]}')
+        if job.rollup_level is not None:
+            ax.fill_between(X, Y_min, Y_max, step='post', color=dotColor[i], alpha=0.3, linewidth=0)
+        ax.scatter(X, Y, s=dotSize[i], marker='o', alpha=1.0, color=dotColor[i], label=columnLabel[i + 1])
+
+        # ".   " is added for proper spacing
+        ax.text(xStart, 0.9 * float(ymax), ".    " + ".".join([job.network, job.station, job.channel]),
+                horizontalalignment='left', fontsize=10, weight='bold', color=dotColor[i])
+
+        # "   ." is added for proper spacing
+
+        ax.set_xticklabels(list())
+        ax.set_ylabel(yLabel, fontsize='small')
+        ax.set_title(title)
+        ax.set_ylim(ymin, float(ymax))
+        ax.set_xlim(xminL, xmaxL)
+
+    # Format the ticks for the date axis depending on the duration.
+    ax.xaxis_date()
+    date_range = (xmaxL - xminL).days
+    if date_range < 21:
+        ax.xaxis.set_major_locator(DayLocator())
+        ax.xaxis.set_major_formatter(daysFmt)
+    elif date_range < 45:
+        ax.xaxis.set_major_locator(WeekdayLocator(byweekday=MONDAY, interval=1))
+        ax.xaxis.set_major_formatter(daysFmt)
+    elif date_range < 90:
+        ax.xaxis.set_major_locator(WeekdayLocator(byweekday=MONDAY, interval=1))
+        ax.xaxis.set_major_formatter(monthsFmt)
+    elif date_range < 400:
+        ax.xaxis.set_major_locator(MonthLocator())
+        ax.xaxis.set_major_formatter(monthsFmt)
+    else:
+        ax.xaxis.set_major_locator(YearLocator())
+        ax.xaxis.set_major_formatter(yearsFmt)
+
+    #
+    # rotate the x labels by 60 degrees
+    #
+    for xlab in ax.get_xticklabels():
+        xlab.set_rotation(60)
+
+    fig.subplots_adjust(top=0.95, right=0.95, bottom=0.2, hspace=0)
+    image_directory = os.path.join(param.ntkDirectory, param.imageDirectory)
+    file_lib.make_path(image_directory)
+    image_file = os.path.join(image_directory, "_".join([os.path.splitext(job.input_file)[0], image_tag]))
+    fig.savefig(f'{image_file}.eps', format="eps", dpi=300)
+    msg_lib.info(f'image file: {image_file}.eps')
+    fig.savefig(f'{image_file}.png', format="png", dpi=param.plotDpi)
+    msg_lib.info(f'image file: {image_file}.png')
+    return image_file
+
+
+def plot_jobs(job_list):
+    """Batch mode worker, plot a list of jobs that share the same input file on a figure reused across the jobs
+    of the process."""
+    global batch_figure
+    if batch_figure is None:
+        batch_figure = plt.figure(figsize=param.plotSize)
+    image_list = list()
+    for job in job_list:
+        try:
+            image_list.append(plot_job(batch_figure, job))
+        except Exception as ex:
+            msg_lib.error(f'failed to plot {job.input_file} {job.period_bin}\n{ex}', 3)
+            image_list.append(None)
+    return image_list
+
+
+# Inputs read by this process and the figure reused by the batch mode.
+input_cache = dict()
+batch_figure = None
+
 # See if user has provided the run arguments.
 args = utils_lib.get_args(sys.argv, usage)
 
@@ -155,29 +450,20 @@ else:
     usage()
     sys.exit()
 
-verbose = utils_lib.get_param(args, 'verbose', False, usage)
+verbose = utils_lib.is_true(utils_lib.get_param(args, 'verbose', False, usage))
 
 if verbose:
     msg_lib.info(f'script: {script} {len(sys.argv) - 1} args: {sys.argv}')
 
-if len(sys.argv) < 9:
+# The batch mode job file, one plot per line as run arguments that override those of the command line.
+jobs_file = utils_lib.get_param(args, 'jobs', '', usage)
+
+if len(sys.argv) < 9 and not jobs_file:
     code = msg_lib.error('not enough argument(s)', 1)
     usage()
     sys.exit(code)
 
-# The run arguments.
-network = utils_lib.get_param(args, 'net', None, usage)
-station = utils_lib.get_param(args, 'sta', None, usage)
-location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
-
 # Set parameters for the time axis labeling.
-# Every year.
-years = YearLocator()
-# Every month.
-months = MonthLocator()
-# Every day.
-days = DayLocator()
-weeks = WeekdayLocator(byweekday=MONDAY, interval=1)
 yearsFmt = DateFormatter('%Y')
 monthsFmt = DateFormatter('%Y-%m')
 daysFmt = DateFormatter('%m-%d')
@@ -188,196 +474,51 @@ columnLabel = param.columnLabel
 dotColor = param.dotColor
 dotSize = param.dotSize
 
-network = utils_lib.get_param(args, 'net', None, usage)
-station = utils_lib.get_param(args, 'sta', None, usage)
-if verbose:
-    msg_lib.info(f'NET: {network}  STA: {station}')
-
-location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
-channel = utils_lib.get_param(args, 'chan', None, usage)
-start_date_time = utils_lib.get_param(args, 'start', None, usage)
-end_date_time = utils_lib.get_param(args, 'end', None, usage)
-
-# We always want to start_date_time from the beginning of the day, so we discard user hours, if any
-start_datetime, start_year, start_month, start_day, start_doy = utils_lib.time_info(start_date_time)
-
-# end_date_time is inclusive.
-end_datetime, end_year, end_month, end_day, end_doy = utils_lib.time_info(end_date_time)
-
-window_width_hour = utils_lib.get_param(args, 'win', None, usage)
-ymax = utils_lib.get_param(args, 'ymax', None, usage)
-
-# Moving window length in hours
-#  - 6hrs 1d(24h) 4d(96h) 16d(384h) ...
-window_tag = file_lib.get_window_tag(window_width_hour)
-if verbose:
-    msg_lib.info(f'WINDOW {window_width_hour}')
-
-period_bin = utils_lib.get_param(args, 'bin', None, usage)
-if period_bin not in param.bins:
-    code = msg_lib.error(f'bad bin name [{period_bin}]', 2)
-    sys.exit(code)
-
-if verbose:
-    msg_lib.info(f'PERIOD BIN {period_bin} from {param.binStart[period_bin]} to {param.binEnd[period_bin]}')
-
-binIndex = param.binIndex[period_bin]
-rangeLabel = param.rangeLabel[binIndex]
-factor = param.factor[binIndex]
-factorLabel = param.factorLabel[binIndex]
-ymin = param.ymin[binIndex]
-yticks = param.yticks[binIndex]
-ytickLabels = param.ytickLabels[binIndex]
-image_tag = param.imageTag[binIndex]
-
-yLabel = rangeLabel + factorLabel
-
-file_name = utils_lib.get_param(args, 'file', None, usage)
-start_year = int(start_date_time.split("-")[0])
-xStartL = start_date_time.split('T')[0]
-
-end_date_time = end_date_time
-end_year = int(end_date_time.split("-")[0])
-xEndL = end_date_time.split('T')[0]
-
-xminL = datetime.datetime(int(xStartL.split('-')[0]), int(xStartL.split('-')[1]), int(xStartL.split('-')[2]), 0, 0, 0)
-xmaxL = datetime.datetime(int(xEndL.split('-')[0]), int(xEndL.split('-')[1]), int(xEndL.split('-')[2]), 0, 0, 0)
-
-if verbose:
-    msg_lib.info(f'START: {start_date_time} END: {end_date_time}  YMAX: {ymax}')
-
-# Set the target for the Power directory. The associated window directory
-# is under the corresponding power directory also
-power_file_tag = list()
-power_file_path = list()
-
-title = " ".join([file_lib.get_tag(".", [network, station.replace(',', '+'), location]),
-                  period_bin, "with", window_tag, "sliding window"])
-
-# Plot bg color.
-bgColor = (1, 1, 1)
-
-# Start_date_time reading the PDF file.
-# Initialize the limits.
-X = list()
-Y = list()
-XLabel = list()
-power_directory = os.path.join(param.dataDirectory, param.powerDirectory)
-file_name = os.path.join(power_directory, ".".join([network, station, location]), channel, window_tag, file_name)
-with open(file_name) as file:
+if not jobs_file:
+    job = get_job(args)
     if verbose:
-        msg_lib.info(f'OPENING: {file_name}')
-
-    # Read the entire power file.
-    lines = file.readlines()
-
-    # Find the last non-blank line.
-    line_count = len(lines)
-    for i in range(1, len(lines)):
-        line = lines[-i].strip()
-        if len(line) > 0:
-            line_count = len(lines) - i + 1
-            break
-    if verbose:
-        msg_lib.info(f'INPUT: {line_count} lines')
-
-    #
-    # get the time of each line and the power, skip headers
-    #
-    powerTime = list()
-    for i in range(2, line_count):
-        line = lines[i]
-        line = line.strip()
-        values = line.split()
-        this_time = UTCDateTime(values[0])
-        if start_date_time <= this_time <= end_date_time:
-            date, time = values[0].split('T')
-            dateValues = date.split('-')
-            timeValues = time.split(':')
-            X.append(datetime.datetime(int(dateValues[0]), int(dateValues[1]),
-                                       int(dateValues[2]), int(timeValues[0]), int(timeValues[1])))
-            Y.append(float(values[binIndex]) * factor)
-
-msg_lib.info(f'Maximum Y: {max(Y)}')
-if len(X) <= 1:
-    code = msg_lib.error("No data found", 2)
+        msg_lib.info(f'NET: {job.network}  STA: {job.station}')
+        msg_lib.info(f'WINDOW {job.window_width_hour}')
+
+    fig = plt.figure(figsize=param.plotSize)
+    if plot_job(fig, job) is None:
+        sys.exit(2)
+    plt.show()
+    sys.exit(0)
+
+# Batch mode, the jobs are rendered off screen.
+plt.switch_backend('Agg')
+if not os.path.isfile(jobs_file):
+    code = msg_lib.error(f'Could not find the jobs file [{jobs_file}]', 2)
     sys.exit(code)
 
-# Convert the column XYZ data to grid for plotting.
-if verbose:
-    msg_lib.info(f'PLOT SIZE: {param.plotSize}')
-
-# The production label.
-production_date = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
-production_label = f'{shared.production_label}'
-production_label = f'{production_label} {script} {version}'
-production_label = f'{production_label} {production_date} UTC'
-production_label = f'{production_label} doi:{shared.ntk_doi}'
-
-fig = plt.figure(figsize=param.plotSize)
-
-plabel_x, plabel_y = shared.production_label_position
-
-fig.set_facecolor('w')
-
-xStart = datetime.datetime(int(xStartL.split('-')[0]), int(xStartL.split('-')[1]), int(xStartL.split('-')[2]), 0, 0, 0) \
-         + datetime.timedelta(seconds=7200)
-xEnd = datetime.datetime(int(xEndL.split('-')[0]), int(xEndL.split('-')[1]), int(xEndL.split('-')[2]), 00, 00, 00) \
-       - datetime.timedelta(seconds=7200)
-
-for i in range(0, 1):
-    ax = fig.add_subplot(1, 1, i + 1)
-    ax.text(plabel_x, 2 * plabel_y, production_label, horizontalalignment='left', fontsize=5, verticalalignment='top',
-            transform=ax.transAxes)
-
-    if verbose:
-        msg_lib.info(f'DOT COLOR: {dotColor[i]}')
-    ax.scatter(X, Y, s=dotSize[i], marker='o', alpha=1.0, color=dotColor[i], label=columnLabel[i + 1])
-
-    # ".   " is added for proper spacing
-    ax.text(xStart, 0.9 * float(ymax), ".    " + ".".join([network, station, channel]),
-            horizontalalignment='left', fontsize=10, weight='bold', color=dotColor[i])
-
-    # "   ." is added for proper spacing
-
-    ax.set_xticklabels(list())
-    ax.set_ylabel(yLabel, fontsize='small')
-    plt.title(title)
-    plt.ylim(ymin, float(ymax))
-    plt.xlim(xminL, xmaxL)
-
-# Format the ticks for the date axis depending on the duration.
-ax.xaxis_date()
-date_range = 15
-if date_range < 21:
-    ax.xaxis.set_major_locator(days)
-    ax.xaxis.set_major_formatter(daysFmt)
-elif date_range < 45:
-    ax.xaxis.set_major_locator(weeks)
-    ax.xaxis.set_major_formatter(daysFmt)
-elif date_range < 90:
-    ax.xaxis.set_major_locator(weeks)
-    ax.xaxis.set_major_formatter(monthsFmt)
-elif date_range < 400:
-    ax.xaxis.set_major_locator(months)
-    ax.xaxis.set_major_formatter(monthsFmt)
+# Each job line holds key=value run arguments, a comma separated bin list is expanded to one job per bin.
+job_list = list()
+with open(jobs_file) as job_file:
+    for line in job_file:
+        line = line.split('#')[0].strip()
+        if not line:
+            continue
+        job_args = dict(args)
+        job_args.update(utils_lib.get_args([script] + line.split(), usage))
+        for period_bin in utils_lib.get_param(job_args, 'bin', None, usage).split(','):
+            job_args['bin'] = period_bin
+            job_list.append(get_job(job_args))
+msg_lib.info(f'{len(job_list)} plot jobs')
+
+# The jobs that share an input file are plotted by the same worker so that each input is read once.
+job_groups = dict()
+for job in job_list:
+    job_groups.setdefault(job.input_file, list()).append(job)
+
+workers = int(utils_lib.get_param(args, 'workers', param.plotWorkers, usage))
+if workers > 1 and len(job_groups) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+    with multiprocessing.get_context('fork').Pool(min(workers, len(job_groups))) as pool:
+        image_lists = pool.map(plot_jobs, list(job_groups.values()))
 else:
-    ax.xaxis.set_major_locator(years)
-    ax.xaxis.set_major_formatter(yearsFmt)
-
-#
-# rotate the x labels by 60 degrees
-#
-for xlab in ax.get_xticklabels():
-    xlab.set_rotation(60)
-
-fig.subplots_adjust(top=0.95, right=0.95, bottom=0.2, hspace=0)
-image_directory = os.path.join(param.ntkDirectory, param.imageDirectory)
-file_lib.make_path(image_directory)
-image_file = os.path.join(image_directory, "_".join([file_name.replace('.txt', ''), image_tag, window_tag]))
-plt.savefig(f'{image_file}.eps', format="eps", dpi=300)
-msg_lib.info(f'image file: {image_file}.eps')
-plt.savefig(f'{image_file}.png', format="png", dpi=150)
-msg_lib.info(f'image file: {image_file}.png')
-plt.show()
+    image_lists = [plot_jobs(group) for group in job_groups.values()]
 
+failed = sum(image is None for image_list in image_lists for image in image_list)
+msg_lib.info(f'{len(job_list) - failed} of {len(job_list)} plots done')
+if failed:
+    sys.exit(2)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import glob
+import importlib
+from datetime import date, timedelta as td
+
+import numpy as np
+
+# Import the Noise Toolkit libraries.
+ntk_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+param_path = os.path.join(ntk_directory, 'param')
+lib_path = os.path.join(ntk_directory, 'lib')
+
+sys.path.append(param_path)
+sys.path.append(lib_path)
+
+import msgLib as msg_lib
+import fileLib as file_lib
+import staLib as sta_lib
+import utilsLib as utils_lib
+import polarLib as polar_lib
+
+"""
+ Name: ntk_reprocessPolarization.py - a Python 3 script to derive the polarization parameters from the spectral
+       covariance archive of ntk_computePolarization.py alone (no data requests, response removal or FFTs).
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ INPUT:
+
+    spectral covariance archive files written by ntk_computePolarization.py with the outputCovariance parameter set
+
+ HISTORY:
+
+    2026-10-19 IRIS DMC Product Team: optional binary polarization DB output (polarDbFormat)
+    2026-10-19 IRIS DMC Product Team: created
+
+"""
+
+version = 'V.2.0.0'
+script = sys.argv[0]
+script = os.path.basename(script)
+
+# Initial mode settings.
+verbose = False
+default_param_file = 'reprocessPolarization'
+if os.path.isfile(os.path.join(param_path, f'{default_param_file}.py')):
+    param = importlib.import_module(default_param_file)
+else:
+    code = msg_lib.error(f'could not load the default parameter file  [param/{default_param_file}.py]', 2)
+    sys.exit(code)
+
+
+def usage():
+    """ Usage message.
+    """
+    print(f'\n\n{script} version {version}\n\n'
+          f'A Python 3 script to derive the polarization parameters of each window from the spectral covariance '
+          f'archive of ntk_computePolarization.py alone. Use it to redo the polarization files with a different '
+          f'smoothing or xtype without requesting the data, removing the response and computing the FFTs again.'
+          f'\n\nUsage:\n\t{script} to display the usage message (this message)'
+          f'\n\t  OR'
+          f'\n\t{script} param=FileName net=network sta=station loc=location chandir=channel_directory'
+          f' start=YYYY-MM-DDTHH:MM:SS end=YYYY-MM-DDTHH:MM:SS xtype=[period|frequency] sw_width=octave '
+          f'sw_shift=octave sw_matrix=[0|1] verbose=[0|1]\n'
+          f'\n\tto perform reprocessing where:'
+          f'\n\t  param\t\t[default: {default_param_file}] the configuration file name '
+          f'\n\t  net\t\t[required] network code'
+          f'\n\t  sta\t\t[required] station code'
+          f'\n\t  loc\t\t[required] location ID'
+          f'\n\t  chandir\t[default: {param.chanDir}] is the channel directory under {param.polarCovDirectory} '
+          f'where the covariance archive files are stored'
+          f'\n\t  xtype\t\t[period or frequency, default: {param.xType[0]}] X-axis type (period or '
+          f'frequency for outputs)'
+          f'\n\t  start\t\t[required] start date-time (UTC) of the windows to reprocess '
+          f'(format YYYY-MM-DDTHH:MM:SS)'
+          f'\n\t  end\t\t[required] end date-time (UTC) of the windows to reprocess '
+          f'(format YYYY-MM-DDTHH:MM:SS)'
+          f'\n\t  sw_width\t[default: {param.octaveWindowWidth}] Smoothing window width in octave'
+          f'\n\t  sw_shift\t[default: {param.octaveWindowShift}] Smoothing window shift in fraction of octave'
+          f'\n\t  sw_matrix\t[0 or 1, default: {param.smoothMatrix}] set to 1 to smooth the spectral covariance '
+          f'matrices and run the eigen-analysis only at the smoothing centers'
+          f'\n\t  verbose\t[0 or 1, default: {param.verbose}] to run in verbose mode set to 1'
+          f'\n\nOutput: Polarization data file(s) are stored under the Polarization Database directory '
+          f'({param.polarDbDirectory}) in the ntk_computePolarization.py format and under the same names.'
+          f'\n\nExamples:'
+          f'\n\n\t- usage:'
+          f'\n\tpython {script}'
+          f'\n\n\t- assuming that you already have executed the following command "successfully" with the '
+          f'outputCovariance parameter set to 1:'
+          f'\n\tpython ntk_computePolarization.py net=TA sta=O18A loc=DASH start=2008-08-14T12:00:00 '
+          f'end=2008-08-14T14:00:00 client=FILES'
+          f'\n\n\tyou can redo the polarization files as a function of frequency with 1/2 octave smoothing via:'
+          f'\n\tpython {script} net=TA sta=O18A loc=DASH chandir=BHZ_BHE_BHN start=2008-08-14T12:00:00 '
+          f'end=2008-08-14T14:00:00 xtype=frequency sw_width=0.5 sw_shift=0.25'
+          f'\n\n\n\n')
+
+
+# Get the run arguments.
+args = utils_lib.get_args(sys.argv, usage)
+if not args:
+    usage()
+    sys.exit(0)
+
+# Import the user-provided parameter file. The parameter file is under the param directory at the same level
+# as the script directory.
+param_file = utils_lib.get_param(args, 'param', default_param_file, usage)
+
+if param_file is None:
+    usage()
+    code = msg_lib.error(f'{script}, parameter file is required', 2)
+    sys.exit(code)
+
+# Import the parameter file if it exists.
+if os.path.isfile(os.path.join(param_path, f'{param_file}.py')):
+    param = importlib.import_module(param_file)
+else:
+    usage()
+    code = msg_lib.error(f'{script}, bad parameter file name [{param_file}]', 2)
+    sys.exit(code)
+
+# Set the run mode.
+verbose = utils_lib.get_param(args, 'verbose', utils_lib.param(param, 'verbose').verbose, usage)
+verbose = utils_lib.is_true(verbose)
+
+if verbose:
+    msg_lib.info(f'{script}, script: {script} {len(sys.argv) - 1} args: {sys.argv}')
+
+# The run arguments.
+network = utils_lib.get_param(args, 'net', None, usage)
+station = utils_lib.get_param(args, 'sta', None, usage)
+location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
+channel_directory = utils_lib.get_param(args, 'chandir', utils_lib.param(param, 'chanDir').chanDir, usage)
+
+xtype = utils_lib.get_param(args, 'xtype', utils_lib.param(param, 'xType').xType[0], usage)
+if xtype not in param.xType:
+    usage()
+    code = msg_lib.error(f'{script}, Invalid xtype  [{xtype}]', 2)
+    sys.exit(code)
+plot_index = param.xType.index(xtype)
+
+octave_window_width = float(utils_lib.get_param(args, 'sw_width',
+                                                utils_lib.param(param, 'octaveWindowWidth').octaveWindowWidth, usage))
+octave_window_shift = float(utils_lib.get_param(args, 'sw_shift',
+                                                utils_lib.param(param, 'octaveWindowShift').octaveWindowShift, usage))
+smooth_matrix = utils_lib.is_true(utils_lib.get_param(args, 'sw_matrix',
+                                                     utils_lib.param(param, 'smoothMatrix').smoothMatrix, usage))
+
+# Maximum period needed to compute value at maxT period point.
+max_period = utils_lib.param(param, 'maxT').maxT * pow(2, octave_window_width / 2.0)
+
+# Minimum frequency  needed to compute value at 1.0/maxT frequency point.
+min_frequency = 1.0 / float(max_period)
+
+start_date_time = utils_lib.get_param(args, 'start', None, usage)
+try:
+    start_datetime, start_year, start_month, start_day, start_doy = utils_lib.time_info(start_date_time)
+except Exception as ex:
+    usage()
+    code = msg_lib.error(f'Invalid start ({start_date_time})\n{ex}', 2)
+    sys.exit(code)
+
+end_date_time = utils_lib.get_param(args, 'end', None, usage)
+try:
+    end_datetime, end_year, end_month, end_day, end_doy = utils_lib.time_info(end_date_time)
+except Exception as ex:
+    usage()
+    code = msg_lib.error(f'Invalid end ({end_date_time})\n{ex}', 2)
+    sys.exit(code)
+
+duration = end_datetime - start_datetime
+start_datetime64 = utils_lib.get_datetime64(start_datetime)
+end_datetime64 = utils_lib.get_datetime64(end_datetime)
+
+end_date = date(int(end_year), int(end_month), int(end_day))
+start_date = date(int(start_year), int(start_month), int(start_day))
+data_day_list = list()
+for i in range((end_date - start_date).days + 1):
+    this_day = start_date + td(days=i)
+    data_day_list.append(this_day.strftime("%Y/%j"))
+
+if duration <= 0 or len(data_day_list) <= 0:
+    usage()
+    code = msg_lib.error(f'bad start/end times [{start_date_time}, {end_date_time}]', 2)
+    sys.exit(code)
+
+covariance_directory, covariance_file_tag = file_lib.get_dir(param.dataDirectory, param.polarCovDirectory,
+                                                             network, station, location, channel_directory)
+polar_db_directory, polar_db_file_tag = file_lib.get_dir(param.dataDirectory, param.polarDbDirectory,
+                                                         network, station, location, channel_directory)
+msg_lib.info(f'Covariance archive DIR TAG: {covariance_directory}')
+
+# Polarization DB format of the output values.
+polar_db_format = utils_lib.param(param, 'polarDbFormat').polarDbFormat
+if polar_db_format not in polar_lib.POLAR_DB_FORMATS:
+    code = msg_lib.error(f'{script}, Invalid polarDbFormat  [{polar_db_format}] in the parameter file, '
+                         f'must be one of {polar_lib.POLAR_DB_FORMATS}', 2)
+    sys.exit(code)
+
+x_units = utils_lib.param(param, 'xlabel').xlabel[xtype.lower()]
+header = utils_lib.param(param, 'header').header[xtype.lower()]
+
+file_count = 0
+for data_day in data_day_list:
+    this_file = os.path.join(covariance_directory, data_day,
+                             f'{covariance_file_tag}.*.{polar_lib.COVARIANCE_EXTENSION}')
+    this_file_list = sorted(glob.glob(this_file))
+    if verbose:
+        msg_lib.info(f'Day: {data_day}, {this_file}, {len(this_file_list)} files')
+    if not this_file_list:
+        continue
+
+    # The file start time and window length labels of the day, start times parsed at once.
+    file_label_list = [this_covariance_file.split(covariance_file_tag + '.')[1].split('.')[0:2]
+                       for this_covariance_file in this_file_list]
+    file_time_list = utils_lib.get_datetime64([label[0] for label in file_label_list])
+    in_range_list = (start_datetime64 <= file_time_list) & (file_time_list < end_datetime64)
+
+    # The binary polarization DB windows of the day by DB file, each file is written once for the day.
+    polar_windows = dict()
+    for this_covariance_file, file_label, in_range in zip(this_file_list, file_label_list, in_range_list):
+        if not in_range:
+            continue
+        if verbose:
+            msg_lib.info(f'Covariance FILE: {this_covariance_file}')
+        try:
+            covariance = polar_lib.load_covariance(this_covariance_file)
+        except Exception as ex:
+            msg_lib.warning(script, f'skipped {this_covariance_file}, failed to read: {ex}')
+            continue
+
+        spectra_matrix = covariance['spectra_matrix']
+        sampling_frequency = float(covariance['sampling_frequency'])
+        delta = float(covariance['delta'])
+        num_samples = int(covariance['num_samples'])
+        spec_length = len(spectra_matrix)
+
+        # To convert FFT to  average spectral covariance matrix
+        norm = 4.0 * delta / float(num_samples)
+
+        x_values, x_limit = polar_lib.x_axis(xtype, spec_length, num_samples, delta, max_period, min_frequency)
+
+        x_start = utils_lib.param(param, 'xStart').xStart[plot_index]
+        if param.doSmoothing and smooth_matrix:
+            smooth_x, smooth = polar_lib.smooth_polarization(param.variables, xtype, x_values, spectra_matrix, norm,
+                                                             sampling_frequency, octave_window_width,
+                                                             octave_window_shift, x_limit, x_start)
+        else:
+            variable = polar_lib.variable_buffer(param.variables, spec_length)[1]
+            polar_lib.polarization_variables(variable, spectra_matrix, norm)
+            if param.doSmoothing:
+                smooth_x, smooth = polar_lib.smooth_variables(variable, xtype, x_values, sampling_frequency,
+                                                              octave_window_width, octave_window_shift, x_limit,
+                                                              x_start)
+            else:
+                smooth_x = x_values
+                smooth = dict(variable)
+
+        # Convert to dB.
+        polar_lib.power_to_db(smooth)
+
+        # Output, same path and name as ntk_computePolarization.py.
+        file_path = os.path.join(polar_db_directory, data_day)
+        utils_lib.mkdir(file_path)
+        if polar_db_format == 'binary':
+            window_time = utils_lib.get_datetime64(file_label[0], unit='s')
+            file_name = polar_lib.polar_day_file_name(file_path, polar_db_file_tag, str(window_time)[0:10],
+                                                      file_label[1], xtype)
+            msg_lib.message(f'OUTPUT: {file_name} {window_time}')
+            if file_name not in polar_windows:
+                polar_windows[file_name] = {'power_units': str(covariance['power_units']), 'windows': list()}
+            polar_windows[file_name]['windows'].append((window_time, smooth_x,
+                                                        np.column_stack([smooth[var] for var in param.variables])))
+        else:
+            tag_list = [polar_db_file_tag, file_label[0], file_label[1], xtype]
+            file_name = file_lib.get_file_name(param.namingConvention, file_path, tag_list)
+            msg_lib.message(f'OUTPUT: {file_name}')
+            try:
+                polar_lib.write_polarization(file_name, x_units, covariance["power_units"], header, smooth_x, smooth)
+            except Exception as ex:
+                code = msg_lib.error(f'failed to write {file_name}: {ex}', 4)
+                sys.exit(code)
+        file_count += 1
+
+    for file_name in polar_windows:
+        try:
+            skipped = polar_lib.save_polar_day(file_name, polar_windows[file_name]['windows'], param.variables,
+                                               x_units, polar_windows[file_name]['power_units'])
+        except Exception as ex:
+            code = msg_lib.error(f'failed to write {file_name}: {ex}', 4)
+            sys.exit(code)
+        for window_time in skipped:
+            msg_lib.error(f'skipped the {window_time} window, its x-axis or variables differ from those of '
+                          f'{file_name}', 4)
+            file_count -= 1
+
+if file_count <= 0:
+    msg_lib.warning(script, f'no covariance archive files found under {covariance_directory} from '
+                            f'{start_date_time} to {end_date_time}')
+msg_lib.info(f'{file_count} windows reprocessed')
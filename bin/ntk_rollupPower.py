@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+
+import sys
+import os
+import importlib
+
+# Import the Noise Toolkit libraries.
+ntk_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+param_path = os.path.join(ntk_directory, 'param')
+lib_path = os.path.join(ntk_directory, 'lib')
+
+sys.path.append(param_path)
+sys.path.append(lib_path)
+
+import msgLib as msg_lib
+import fileLib as file_lib
+import staLib as sta_lib
+import utilsLib as utils_lib
+import powerLib as power_lib
+
+"""
+ Name: ntk_rollupPower.py - a Python 3 script to build the daily, weekly and monthly rollups of a band power file
+       produced by ntk_computePower.py.
+
+ Copyright (C) 2026  Product Team, IRIS Data Management Center
+
+    This is a free software; you can redistribute it and/or modify
+    it under the terms of the GNU Lesser General Public License as
+    published by the Free Software Foundation; either version 3 of the
+    License, or (at your option) any later version.
+
+    This script is distributed in the hope that it will be useful, but
+    WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License (GNU-LGPL) for more details.  The
+    GNU-LGPL and further information can be found here:
+    http://www.gnu.org/
+
+    You should have received a copy of the GNU Affero General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+ INPUT:
+
+    band power file produced by ntk_computePower.py
+
+ HISTORY:
+
+    2026-10-19 IRIS DMC Product Team: created
+
+"""
+
+version = 'V.2.0.0'
+script = sys.argv[0]
+script = os.path.basename(script)
+
+# Initial mode settings.
+verbose = False
+default_param_file = 'rollupPower'
+if os.path.isfile(os.path.join(param_path, f'{default_param_file}.py')):
+    param = importlib.import_module(default_param_file)
+else:
+    code = msg_lib.error(f'could not load the default parameter file  [param/{default_param_file}.py]', 2)
+    sys.exit(code)
+
+
+def usage():
+    """ Usage message.
+   """
+    print(f'\n\n{script} version {version}\n\n'
+          f'A Python 3 script to build the daily, weekly (ISO weeks, starting on Monday) and monthly rollups of a '
+          f'band power file produced by ntk_computePower.py. For each period and band, a rollup holds the median, '
+          f'minimum and maximum of the band powers and their count (NaN values are not counted). ntk_plotPower.py '
+          f'uses the coarsest rollup that still has one period per pixel of the plot for the zoomed-out views.'
+          f'\n\nUsage:\n\t{script} to display the usage message (this message)'
+          f'\n\t  OR'
+          f'\n\t{script} param=FileName net=network sta=station loc=location chan=channel'
+          f' levels=level1,level2 file=power_file_name verbose=[0|1]\n'
+          f'\n\twhere:'
+          f'\n\t  param\t\t[default: {default_param_file}] the configuration file name '
+          f'\n\t  net\t\t[required] network code'
+          f'\n\t  sta\t\t[required] station code'
+          f'\n\t  loc\t\t[required] location ID'
+          f'\n\t  chan\t\t[required] channel ID'
+          f'\n\t  levels\t[default: {",".join(param.rollupLevels)}] comma separated rollup levels '
+          f'(any of {", ".join(power_lib.ROLLUP_LEVELS)})'
+          f'\n\t  file\t\t[required] the band power file name (ntk_computePower.py output)'
+          f'\n\t  verbose\t[0 or 1, default: {param.verbose}] to run in verbose mode set to 1'
+          f'\n\nOutput file: '
+          f'\n\tFull path to the output rollup files is provided at the end of the run. '
+          f'\n\n\tThe rollups are saved in the binary rollup format under the "{param.rollupDirectory}" directory '
+          f'of the power directory as:'
+          f'\n\t\tpower_file_name.level.{power_lib.ROLLUP_EXTENSION}'
+          f'\n\tfor example:'
+          f'\n\t\tTA.O18A.--.BHZ.2008-01-01.2010-12-31.day.{power_lib.ROLLUP_EXTENSION}'
+          f'\n\nExamples:'
+          f'\n\n\t- usage:'
+          f'\n\tpython {script}'
+          f'\n\n\t- Assuming that you already have computed the band powers "successfully" via:'
+          f'\n\tpython ntk_computePower.py net=TA sta=O18A loc=DASH chan=BHZ xtype=period '
+          f'file=TA.O18A.--.BHZ.2008-01-01.2010-12-31.period.txt'
+          f'\n\n\tyou can build the rollups via:'
+          f'\n\tpython {script} net=TA sta=O18A loc=DASH chan=BHZ file=TA.O18A.--.BHZ.2008-01-01.2010-12-31.txt'
+          f'\n\n\n\n')
+
+
+# Get the run arguments.
+args = utils_lib.get_args(sys.argv, usage)
+if not args:
+    usage()
+    sys.exit(0)
+
+# Import the user-provided parameter file. The parameter file is under the param directory at the same level
+# as the script directory.
+param_file = utils_lib.get_param(args, 'param', default_param_file, usage)
+
+# Import the parameter file if it exists.
+if os.path.isfile(os.path.join(param_path, f'{param_file}.py')):
+    param = importlib.import_module(param_file)
+else:
+    usage()
+    code = msg_lib.error(f'bad parameter file name [{param_file}]', 2)
+    sys.exit(code)
+
+verbose = utils_lib.is_true(utils_lib.get_param(args, 'verbose', param.verbose, usage))
+network = utils_lib.get_param(args, 'net', None, usage)
+station = utils_lib.get_param(args, 'sta', None, usage)
+location = sta_lib.get_location(utils_lib.get_param(args, 'loc', None, usage))
+channel = utils_lib.get_param(args, 'chan', None, usage)
+power_file = utils_lib.get_param(args, 'file', None, usage)
+
+level_list = utils_lib.get_param(args, 'levels', ','.join(param.rollupLevels), usage).split(',')
+for level in level_list:
+    if level not in power_lib.ROLLUP_LEVELS:
+        usage()
+        code = msg_lib.error(f'bad rollup level [{level}], must be one of {", ".join(power_lib.ROLLUP_LEVELS)}', 2)
+        sys.exit(code)
+
+power_directory, power_file_tag = file_lib.get_dir(param.dataDirectory, param.powerDirectory, network,
+                                                   station, location, channel)
+power_file_name = os.path.join(power_directory, power_file)
+if not os.path.isfile(power_file_name):
+    code = msg_lib.error(f'Could not find the POWER file [{power_file_name}]', 2)
+    sys.exit(code)
+
+if verbose:
+    msg_lib.info(f'OPENING: {power_file_name}')
+
+# The band header line (second line) of the power file labels the rollup bands.
+with open(power_file_name) as power_file_handle:
+    next(power_file_handle, None)
+    header = next(power_file_handle, '').strip()
+power_time, power = power_lib.read_power(power_file_name)
+if len(power_time) <= 0:
+    code = msg_lib.error(f'No band powers in [{power_file_name}]', 2)
+    sys.exit(code)
+if verbose:
+    msg_lib.info(f'INPUT: {len(power_time)} windows')
+
+rollup_directory = os.path.join(power_directory, param.rollupDirectory)
+file_lib.make_path(rollup_directory)
+for level in level_list:
+    period_start, count, median, minimum, maximum = power_lib.rollup(power_time, power, level)
+    rollup_file_name = power_lib.rollup_file_name(rollup_directory, power_file, level)
+    power_lib.save_rollup(rollup_file_name, period_start, count, median, minimum, maximum, header)
+    msg_lib.info(f'OUTPUT FILE: {rollup_file_name} ({len(period_start)} {level} periods)')
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import msgLib as msg_lib
 
 
@@ -76,3 +77,23 @@ def get_file_times(naming_convention, channel, filename):
 
     return start_time, end_time
 
+
+def read_columns(file_name, header_lines=0):
+    """Read a text file made of an x-value column followed by numeric columns in a single pass.
+
+    The x-values are returned as the strings found in the file (they label the outputs) and the numeric columns
+    as a (rows x columns) float array, 'nan' and 'inf' values included."""
+    labels = list()
+    rows = list()
+    with open(file_name) as input_file:
+        for line_index, line in enumerate(input_file):
+            if line_index < header_lines:
+                continue
+            values = line.split()
+            if not values:
+                continue
+            labels.append(values[0])
+            rows.append(values[1:])
+    if not rows:
+        return labels, np.zeros((0, 0))
+    return labels, np.array(rows, dtype=float)
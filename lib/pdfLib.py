@@ -0,0 +1,393 @@
+import os
+import glob
+from datetime import date, timedelta as td
+
+import numpy as np
+
+"""
+ Name: pdfLib.py - a Python 3 library to bin values into PDF count matrices.
+
+ A PDF is kept as a count matrix with one row per x-value (period/frequency, kept as the string used in the
+ input files so the output matches the input labels) and one column per value bin.
+
+ HISTORY:
+    2026-10-19 IRIS DMC Product Team: created to replace the per-value np.histogram calls of the binning scripts
+"""
+
+
+def get_bin_edges(bin_start, bin_end, bin_width):
+    """Compute the bin edges for a [bin_start, bin_end, bin_width] bin definition.
+
+    The edges are the same as those the binning scripts always used, i.e. bin_count + 1 edges starting at
+    bin_start where bin_count = int((bin_end - bin_start) / bin_width) + 1.
+    """
+    bin_count = int((float(bin_end) - float(bin_start)) / float(bin_width)) + 1
+    return float(bin_start) + np.arange(bin_count + 1, dtype=float) * float(bin_width)
+
+
+def digitize(values, edges):
+    """Find the bin index of each value following the np.histogram convention (bins are half-open except the
+    last one that also includes the last edge). Values that fall outside the edges or are NaN get -1.
+    """
+    values = np.asarray(values, dtype=float)
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = len(edges) - 2
+    index[(values < edges[0]) | (values > edges[-1]) | np.isnan(values)] = -1
+    return index
+
+
+class PdfAccumulator:
+    """Accumulate the PDF counts of one variable as a (x-value x bin) count matrix.
+
+    Rows are created in the order x-values are first seen. A row is created for every x-value that has at least
+    one non-NaN value, even if the value falls outside the bins, so the output keeps listing that x-value with
+    zero hits.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.keys = list()
+        self.index = dict()
+        self.counts = np.zeros((0, len(self.edges) - 1), dtype=np.int64)
+
+    def rows(self, keys):
+        """Return the row index of each key, adding rows for the new keys."""
+        new_keys = [key for key in dict.fromkeys(keys) if key not in self.index]
+        if new_keys:
+            for key in new_keys:
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+            self.counts = np.vstack((self.counts, np.zeros((len(new_keys), self.counts.shape[1]),
+                                                           dtype=self.counts.dtype)))
+        return np.array([self.index[key] for key in keys], dtype=int)
+
+    def add(self, keys, values):
+        """Bin a column of values, keys[i] is the x-value of values[i]. Return the bin index of each value."""
+        values = np.asarray(values, dtype=float)
+        bins = digitize(values, self.edges)
+        valid = ~np.isnan(values)
+        if np.any(valid):
+            rows = self.rows([key for key, flag in zip(keys, valid) if flag])
+            hits = bins[valid] >= 0
+            np.add.at(self.counts, (rows[hits], bins[valid][hits]), 1)
+        return bins
+
+    def sorted_keys(self):
+        """Keys in the order they are written out (sorted as strings, as the binning scripts always did)."""
+        return sorted(self.keys)
+
+    def write(self, file_name, separator, nonzero_only=False, integer_edges=False):
+        """Write the PDF as text, one x-value bin-start hits line per bin (per bin with hits if nonzero_only).
+        The bin starts are written as integers if integer_edges (as the PSD daily files list the dB values)."""
+        edges = [int(edge) if integer_edges else float(edge) for edge in self.edges]
+        with open(file_name, 'w') as output_file:
+            for key in self.sorted_keys():
+                row = self.counts[self.index[key]]
+                for ii in range(len(row)):
+                    if nonzero_only and row[ii] == 0:
+                        continue
+                    output_file.write(f'{key}{separator}{edges[ii]}{separator}{row[ii]}\n')
+
+    def merge(self, other, scale=1):
+        """Add (scale=1) or remove (scale=-1) the counts of another PDF with the same bins."""
+        if len(other.edges) != len(self.edges) or not np.allclose(other.edges, self.edges):
+            raise ValueError(f'can not merge PDFs with different bins ({other.edges[0]}-{other.edges[-1]}, '
+                             f'{len(other.edges) - 1} bins vs {self.edges[0]}-{self.edges[-1]}, '
+                             f'{len(self.edges) - 1} bins)')
+        if other.keys:
+            rows = self.rows(other.keys)
+            self.counts[rows] += scale * other.counts
+        return self
+
+    def prune(self):
+        """Drop the x-values with no hits."""
+        keep = np.nonzero(self.counts.sum(axis=1) > 0)[0]
+        self.keys = [self.keys[i] for i in keep]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        self.counts = self.counts[keep]
+        return self
+
+    def save(self, file_name):
+        """Save the count matrix in the sparse binary PDF format.
+
+        Most cells of a PDF are zero, so only the non-zero cells are kept as (row, bin, count) triplets (COO).
+        The keys are all kept, so x-values with no hits are preserved.
+        """
+        rows, bins = np.nonzero(self.counts)
+        with open(file_name, 'wb') as output_file:
+            np.savez(output_file, edges=self.edges, keys=np.array(self.keys, dtype=str),
+                     rows=rows.astype(np.int32), bins=bins.astype(np.int32),
+                     counts=self.counts[rows, bins].astype(np.int32))
+
+
+def statistics(pdf, percentiles):
+    """Compute the percentiles and the mode of each x-value of a PDF from the cumulative counts of its rows.
+
+    The percentile p of an x-value is the start of the first bin where the cumulative count reaches p% of its
+    hits, the mode is the start of the bin with the most hits (the lowest one on ties). X-values without hits get
+    NaN. Return the x-values (sorted by value), the (x-value x percentile) array, the modes and the hit counts.
+    """
+    keys = sorted(pdf.keys, key=float)
+    counts = pdf.counts[[pdf.index[key] for key in keys]].reshape(len(keys), len(pdf.edges) - 1)
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    percentiles = np.asarray(percentiles, dtype=float)
+
+    # First bin where the cumulative count reaches the percentile, for all x-values and percentiles at once.
+    reached = (cumulative[:, np.newaxis, :] * 100.0 >= percentiles[np.newaxis, :, np.newaxis] *
+               total[:, np.newaxis, np.newaxis]) & (cumulative[:, np.newaxis, :] > 0)
+    percentile_values = pdf.edges[np.argmax(reached, axis=2)]
+    mode_values = pdf.edges[np.argmax(counts, axis=1)]
+    percentile_values[total == 0] = np.nan
+    mode_values[total == 0] = np.nan
+    return keys, percentile_values, mode_values, total
+
+
+def load(file_name):
+    """Load a count matrix saved in the sparse binary PDF format (or in the dense format used before)."""
+    with np.load(file_name) as data:
+        pdf = PdfAccumulator(data['edges'])
+        pdf.keys = [str(key) for key in data['keys']]
+        pdf.index = {key: i for i, key in enumerate(pdf.keys)}
+        if 'rows' in data.files:
+            pdf.counts = np.zeros((len(pdf.keys), len(pdf.edges) - 1), dtype=np.int64)
+            pdf.counts[data['rows'], data['bins']] = data['counts']
+        else:
+            pdf.counts = data['counts'].reshape(len(pdf.keys), len(pdf.edges) - 1).astype(np.int64)
+    return pdf
+
+
+"""
+ The PDF groups collect the PDFs of all the files that fall in the same hour of the day (UTC or local), day of the
+ week (local) or month of the year (UTC) so diurnal and seasonal PDFs are binned in the same pass as the daily ones.
+"""
+PDF_GROUPS = ('utcHour', 'localHour', 'weekday', 'month')
+
+
+def group_key(group, utc_time, local_hour_offset=0):
+    """The key of a file start time (datetime, UTC) in a PDF group. The local time is the UTC time shifted by
+    local_hour_offset hours."""
+    local_time = utc_time + td(hours=float(local_hour_offset))
+    if group == 'utcHour':
+        return utc_time.strftime('%H')
+    elif group == 'localHour':
+        return local_time.strftime('%H')
+    elif group == 'weekday':
+        return f'{local_time.isoweekday()}{local_time.strftime("%a")}'
+    elif group == 'month':
+        return utc_time.strftime('%m')
+    raise ValueError(f'unknown PDF group {group}, must be one of {PDF_GROUPS}')
+
+
+"""
+ The PDF store keeps the daily count matrices under the daily output directory along with their monthly and yearly
+ rollups:
+      {pdf directory}/Y{year}[/{variable}]/{xtype}/D{doy}.npz   daily PDF
+      {pdf directory}/Y{year}[/{variable}]/{xtype}/M{month}.npz monthly rollup, sum of the daily PDFs of the month
+      {pdf directory}/Y{year}[/{variable}]/{xtype}/Y{year}.npz  yearly rollup, sum of the daily PDFs of the year
+ where variable is only used for the polarization PDFs and xtype (period or frequency) keeps the PDFs of the two
+ x-axis types apart. All are saved in the sparse binary PDF format. While a day is saved, the store directory holds
+ an update marker file (.updating) that is removed once the rollups and the day file are all saved.
+"""
+STORE_EXTENSION = 'npz'
+STORE_UPDATE_MARKER = '.updating'
+DAILY_FORMATS = ('text', 'sparse')
+
+
+def store_directory(pdf_directory, year, xtype, variable=None):
+    """The store directory for a given year, x-axis type (and variable)."""
+    if variable is None:
+        return os.path.join(pdf_directory, f'Y{year}', xtype)
+    return os.path.join(pdf_directory, f'Y{year}', variable, xtype)
+
+
+def day_file_name(directory, doy):
+    """Store file name of a daily PDF."""
+    return os.path.join(directory, f'D{int(doy):03d}.{STORE_EXTENSION}')
+
+
+def month_file_name(directory, month):
+    """Store file name of a monthly rollup."""
+    return os.path.join(directory, f'M{int(month):02d}.{STORE_EXTENSION}')
+
+
+def year_file_name(directory, year):
+    """Store file name of a yearly rollup."""
+    return os.path.join(directory, f'Y{year}.{STORE_EXTENSION}')
+
+
+def day_month(year, doy):
+    """Month of a day of the year."""
+    return (date(int(year), 1, 1) + td(days=int(doy) - 1)).month
+
+
+def update_rollup(file_name, pdf, old_pdf=None):
+    """Incrementally update a rollup file by adding the new daily PDF and removing the one it replaces. The rollup
+    is not saved and None is returned if removing the old daily PDF would leave negative counts, that is the rollup
+    does not contain the day it replaces and has to be rebuilt from the daily PDFs."""
+    if os.path.isfile(file_name):
+        rollup = load(file_name)
+        if old_pdf is not None:
+            rollup.merge(old_pdf, scale=-1)
+            if np.any(rollup.counts < 0):
+                return None
+    else:
+        rollup = PdfAccumulator(pdf.edges)
+    rollup.merge(pdf)
+    rollup.prune().save(file_name)
+    return rollup
+
+
+def save_day(directory, year, month, doy, pdf):
+    """Save a daily PDF in the store and update its monthly and yearly rollups. If the day is being rebuilt,
+    the previous version of the day is taken out of the rollups first.
+
+    The rollups are updated first and the day file is saved last. They are rebuilt from the daily PDFs instead when
+    they can not be updated incrementally: the previous update of the directory was interrupted (its update marker
+    is still there), a rollup file is missing while days of its month or year are stored, or the rollup does not
+    contain the previous version of the day."""
+    file_name = day_file_name(directory, doy)
+    marker_file = os.path.join(directory, STORE_UPDATE_MARKER)
+    rebuild = os.path.isfile(marker_file)
+    open(marker_file, 'w').close()
+
+    old_pdf = load(file_name) if os.path.isfile(file_name) else None
+    day_files = glob.glob(os.path.join(directory, f'D*.{STORE_EXTENSION}'))
+    month_files = [day_file for day_file in day_files
+                   if day_month(year, os.path.basename(day_file)[1:4]) == int(month)]
+    for rollup_file, stored_files in ((month_file_name(directory, month), month_files),
+                                      (year_file_name(directory, year), day_files)):
+        if rebuild:
+            break
+        if not os.path.isfile(rollup_file) and stored_files:
+            rebuild = True
+        elif update_rollup(rollup_file, pdf, old_pdf) is None:
+            rebuild = True
+
+    pdf.save(f'{file_name}.tmp')
+    os.replace(f'{file_name}.tmp', file_name)
+    if rebuild:
+        rebuild_rollups(directory, year)
+    os.remove(marker_file)
+    return file_name
+
+
+def rebuild_rollups(directory, year):
+    """Rebuild the monthly and yearly rollups of a store directory from its daily PDFs."""
+    rollups = dict()
+    for file_name in sorted(glob.glob(os.path.join(directory, f'D*.{STORE_EXTENSION}'))):
+        month = day_month(year, os.path.basename(file_name)[1:4])
+        pdf = load(file_name)
+        for rollup_file in (month_file_name(directory, month), year_file_name(directory, year)):
+            if rollup_file not in rollups:
+                rollups[rollup_file] = PdfAccumulator(pdf.edges)
+            rollups[rollup_file].merge(pdf)
+    for rollup_file in rollups:
+        rollups[rollup_file].prune().save(rollup_file)
+    return sorted(rollups)
+
+
+def range_files(pdf_directory, start_date, end_date, xtype, variable=None):
+    """List the fewest store files that cover the days from start_date to end_date (both included): yearly rollups
+    for the complete years, monthly rollups for the complete months and daily PDFs for the rest. Return a
+    (file name, first day, last day) tuple for each file."""
+    file_list = list()
+    this_date = start_date
+    while this_date <= end_date:
+        directory = store_directory(pdf_directory, this_date.strftime('%Y'), xtype, variable)
+        year_end = date(this_date.year, 12, 31)
+        month_end = (date(this_date.year, this_date.month, 28) + td(days=4)).replace(day=1) - td(days=1)
+        if this_date.timetuple().tm_yday == 1 and year_end <= end_date:
+            file_list.append((year_file_name(directory, this_date.year), this_date, year_end))
+            this_date = year_end + td(days=1)
+        elif this_date.day == 1 and month_end <= end_date:
+            file_list.append((month_file_name(directory, this_date.month), this_date, month_end))
+            this_date = month_end + td(days=1)
+        else:
+            file_list.append((day_file_name(directory, this_date.timetuple().tm_yday), this_date, this_date))
+            this_date += td(days=1)
+    return file_list
+
+
+"""
+ The daily output files of the binning scripts are written whether the PDF store is on or not:
+      {pdf directory}/Y{year}[/{variable}]/D{doy}.bin   text daily PDF (pdfDailyFormat = 'text')
+      {pdf directory}/Y{year}[/{variable}]/D{doy}.npz   sparse daily PDF (pdfDailyFormat = 'sparse')
+ They are not kept per x-axis type, they hold the x-axis type of the last binning run of the day. The text files
+ list x-value, value, hits lines. The values are bin starts (polarization PDFs, group PDFs) or the PSD values
+ rounded to dB (PSD PDFs), so the text files are read back by binning their values with the bins of the binning
+ script.
+"""
+DAILY_TEXT_EXTENSION = 'bin'
+
+
+def load_text(file_name, edges, separator):
+    """Load a PDF text file (x-value, value, hits lines) into a count matrix with the given bin edges. Values that
+    fall outside the edges are dropped."""
+    keys = list()
+    values = list()
+    hits = list()
+    with open(file_name) as input_file:
+        for line in input_file:
+            line = line.strip()
+            if len(line) <= 0:
+                continue
+            key, value, count = line.split(separator)
+            keys.append(key.strip())
+            values.append(float(value))
+            hits.append(int(count))
+    pdf = PdfAccumulator(edges)
+    if keys:
+        rows = pdf.rows(keys)
+        bins = digitize(values, pdf.edges)
+        valid = bins >= 0
+        np.add.at(pdf.counts, (rows[valid], bins[valid]), np.asarray(hits, dtype=np.int64)[valid])
+    return pdf
+
+
+def load_daily(pdf_directory, day, edges, separator, variable=None):
+    """Load the daily output file of a day, the sparse file if there is one or else the text file (see load_text).
+    Return the daily PDF and its file name, (None, None) if there is no daily file for the day."""
+    directory = os.path.join(pdf_directory, f'Y{day.year}')
+    if variable is not None:
+        directory = os.path.join(directory, variable)
+    file_name = day_file_name(directory, day.timetuple().tm_yday)
+    if os.path.isfile(file_name):
+        return load(file_name), file_name
+    file_name = os.path.join(directory, f'D{day.timetuple().tm_yday:03d}.{DAILY_TEXT_EXTENSION}')
+    if os.path.isfile(file_name):
+        return load_text(file_name, edges, separator), file_name
+    return None, None
+
+
+def load_range(pdf_directory, start_date, end_date, xtype, variable=None, edges=None, separator='\t'):
+    """Combine the stored PDFs from start_date to end_date (both included) into a single PDF.
+
+    The days of a missing rollup are read from the daily PDFs of the store. If edges (the bin edges of the binning
+    script) are given, the days that the store does not cover are read from the daily output files (see
+    load_daily). Return the combined PDF (None if nothing is found for the range) and the list of files read."""
+    pdf = None
+    files_read = list()
+    for file_name, first_day, last_day in range_files(pdf_directory, start_date, end_date, xtype, variable):
+        pdf_list = list()
+        if os.path.isfile(file_name):
+            pdf_list.append((load(file_name), file_name))
+        else:
+            this_date = first_day
+            while this_date <= last_day:
+                day_file = day_file_name(os.path.dirname(file_name), this_date.timetuple().tm_yday)
+                if os.path.isfile(day_file):
+                    pdf_list.append((load(day_file), day_file))
+                elif edges is not None:
+                    pdf_list.append(load_daily(pdf_directory, this_date, edges, separator, variable))
+                this_date += td(days=1)
+        for this_pdf, this_file in pdf_list:
+            if this_pdf is None:
+                continue
+            if pdf is None:
+                pdf = PdfAccumulator(this_pdf.edges)
+            pdf.merge(this_pdf)
+            files_read.append(this_file)
+    if pdf is not None:
+        pdf.prune()
+    return pdf, files_read
@@ -1,7 +1,11 @@
+import os
+
 import numpy as np
 import cmath
 import math
 
+import sfLib as sf_lib
+
 
 def complex_phase(c):
     """
@@ -67,7 +71,9 @@ def polarization_degree(m11, m12, m13, m22, m23, m33):
 
     t2 = m11.real + m22.real + m33.real
 
-    beta = (3.0 * t1 - t2 * t2) / (2.0 * t2 * t2)
+    # Not defined (NaN) without power.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = (3.0 * t1 - t2 * t2) / (2.0 * t2 * t2)
 
     return beta
 
@@ -179,3 +185,425 @@ def polarization_angles(z1, z2, z3):
 
     return thetah, phihh, thetav, phivh
 
+
+def complex_phase_array(c):
+    """
+   compute the phase of an array of complex numbers, element by element the same as complex_phase:
+   0 for magnitudes below 1.0e-6 and a -0 imaginary part taken as +0
+   """
+    c = np.asarray(c, dtype=complex)
+    phase = np.arctan2(np.where(c.imag == 0.0, 0.0, c.imag), c.real)
+    return np.where(np.abs(c) < 1.0e-6, 0.0, phase)
+
+
+def polarization_angles_array(z1, z2, z3):
+    """
+       Polarization Angles of arrays of primary eigenvectors
+
+      array version of polarization_angles, z1, z2, and z3 are the arrays of the eigenvector components of the
+      maximum eigenvalue of each frequency. The angles follow the same equations, candidate selection (first
+      maximum), sign, wrap and -0 imaginary part conventions as polarization_angles.
+   """
+    z1 = np.asarray(z1, dtype=complex)
+    z2 = np.asarray(z2, dtype=complex)
+    z3 = np.asarray(z3, dtype=complex)
+    phase1 = complex_phase_array(z1)
+    phase2 = complex_phase_array(z2)
+    phase3 = complex_phase_array(z3)
+
+    # Theta_h first by trying 4 posibilities of equation 7
+    # picking the one that maximizes (not minimizes) equation 5.
+    val = -0.5 * complex_phase_array(z2 * z2 + z3 * z3)
+    for l in range(0, 4):
+        angle = val + float(l) * math.pi / 2.0
+        tmp = (np.abs(z2) * np.abs(z2) * np.cos(angle + phase2) * np.cos(angle + phase2)) + \
+              (np.abs(z3) * np.abs(z3) * np.cos(angle + phase3) * np.cos(angle + phase3))
+        if l == 0:
+            max_tmp = tmp
+            theta_h = angle
+        else:
+            theta_h = np.where(tmp > max_tmp, angle, theta_h)
+            max_tmp = np.where(tmp > max_tmp, tmp, max_tmp)
+
+    # Now calculate thetaH from theta_h following equation 8 and taking care
+    # to get the sign right. Note the Park et al. gives thetaH as counterclockwise
+    # from East, whearas for backazimuth we normally want clockwise from North.
+    ztmp = np.empty(theta_h.shape, dtype=complex)
+    ztmp.real = np.cos(theta_h)
+    ztmp.imag = - np.sin(theta_h)
+
+    zval3 = z3 * ztmp
+    zval2 = z2 * ztmp
+    thetah = np.arctan2(zval3.real, zval2.real)
+
+    zval13 = z1 * z3.conjugate()
+    val = zval13.real
+
+    thetah = np.where(val < 0.0, np.where(thetah < 0.0, thetah + math.pi, thetah),
+                      np.where(thetah > 0.0, thetah - math.pi, thetah))
+
+    thetah = math.pi / 2.0 - thetah
+    thetah = np.where(thetah < 0.0, thetah + 2.0 * math.pi, thetah)
+
+    thetah = thetah * (180.0 / math.pi)
+
+    # Get phiHH, which is the phase difference between horizontals.
+    phihh = (phase3 - phase2) * 180.0 / math.pi
+    phihh = np.where(phihh > 180.0, phihh - 360.0, np.where(phihh < -180.0, phihh + 360.0, phihh))
+
+    # Theta_v by trying 4 posibilities of equation 9
+    # picking the one that maximizes the proper expression (not in the paper).
+    val = -0.5 * complex_phase_array(z1 * z1 + z2 * z2 + z3 * z3)
+    for l in range(0, 4):
+        angle = val + float(l) * math.pi / 2.0
+        tmp = np.abs(z1) * np.abs(z1) * np.cos(angle + phase1) * np.cos(angle + phase1) + \
+              np.abs(z2) * np.abs(z2) * np.cos(angle + phase2) * np.cos(angle + phase2) + \
+              np.abs(z3) * np.abs(z3) * np.cos(angle + phase3) * np.cos(angle + phase3)
+        if l == 0:
+            max_tmp = tmp
+            theta_v = angle
+        else:
+            theta_v = np.where(tmp > max_tmp, angle, theta_v)
+            max_tmp = np.where(tmp > max_tmp, tmp, max_tmp)
+
+    # Calculate thetav from theta_v following equation 10
+    # this gives the incidence angle, 0 for vertical, 90 for horizontal.
+    zh = np.sqrt(z2 * z2 + z3 * z3)
+    zh = np.where(zh.imag < 0, -zh, zh)
+    ztmp = np.empty(theta_v.shape, dtype=complex)
+    ztmp.real = np.cos(theta_v)
+    ztmp.imag = -1 * np.sin(theta_v)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        thetav = np.arctan(np.abs((z1 * ztmp).real / (zh * ztmp).real))
+    thetav = thetav * (180.0 / math.pi)
+    thetav = 90 - thetav
+
+    # Get phiVH, between -90 and 90.
+    phivh = (theta_h - phase1) * 180.0 / math.pi
+    phivh = np.where(phivh > 90.0, phivh - 180.0, np.where(phivh < -90.0, phivh + 180.0, phivh))
+
+    return thetah, phihh, thetav, phivh
+
+
+def variable_buffer(variables, length):
+    """
+   preallocated result buffer, a (variables x length) array and a dictionary of its per-variable row views,
+   the rows are filled in place and the dictionary is what the smoothing and output use
+   """
+    buffer = np.empty((len(variables), length))
+    return buffer, {var: buffer[index] for index, var in enumerate(variables)}
+
+
+def segment_view(data, num_samples, n_shift, n_segments):
+    """
+   strided (channels x segments x num_samples) view of the Welch segments of a (channels x samples) array,
+   segments are num_samples long and n_shift samples apart, only the full segments are included
+   """
+    return np.lib.stride_tricks.sliding_window_view(data, num_samples, axis=-1)[:, ::n_shift][:, :n_segments]
+
+
+def taper_segments(segments, taper_window):
+    """
+   remove the mean of each segment and apply the taper, returns a new (channels x segments x num_samples) array
+   """
+    return (segments - np.mean(segments, axis=-1, keepdims=True)) * taper_window
+
+
+def spectral_matrix(segments):
+    """
+   average spectral covariance matrices of the tapered segments of 3 channels
+
+   one batched rfft of all segments of all channels and one einsum that forms and averages
+   the 3x3 matrices, element [i, j] of each frequency is the segment average of FFTj x conj(FFTi),
+   so [0, 1] is m12, etc. The matrices are complex Hermitian, returned as a (frequencies x 3 x 3) stack.
+   """
+    fft = np.fft.rfft(segments, axis=-1)
+    return np.einsum('isf,jsf->fij', fft.conjugate(), fft) / float(segments.shape[1])
+
+
+def polarization_variables(variable, spectra_matrix, norm):
+    """
+   fill the variable row views (see variable_buffer) from a (frequencies x 3 x 3) stack of average spectral
+   covariance matrices, norm converts the FFT to power
+
+   one stacked eigh call for all matrices, the eigenvalues of each matrix are in ascending order and the
+   corresponding unit eigenvectors are in the columns, the first maximum eigenvalue is the primary one.
+   Matrices with NaN elements (empty smoothing bins) give NaN values, all-zero matrices give zero powers and NaN
+   polarization parameters.
+   """
+    valid = np.all(np.isfinite(spectra_matrix), axis=(1, 2))
+    for var in variable:
+        variable[var][:] = np.nan
+
+    spectra_matrix = spectra_matrix[valid]
+    m11 = spectra_matrix[:, 0, 0]
+    m12 = spectra_matrix[:, 0, 1]
+    m13 = spectra_matrix[:, 0, 2]
+    m22 = spectra_matrix[:, 1, 1]
+    m23 = spectra_matrix[:, 1, 2]
+    m33 = spectra_matrix[:, 2, 2]
+
+    eig_values, eig_vectors = np.linalg.eigh(spectra_matrix)
+    max_eig_value_index = np.argmax(eig_values, axis=1)
+    max_eig_values = eig_values[np.arange(len(spectra_matrix)), max_eig_value_index]
+    max_eig_vectors = eig_vectors[np.arange(len(spectra_matrix)), :, max_eig_value_index]
+
+    variable["powerUD"][valid] = norm * np.abs(m11)
+    variable["powerEW"][valid] = norm * np.abs(m22)
+    variable["powerNS"][valid] = norm * np.abs(m33)
+
+    # power spectrum of the primary eigenvalue (Lambda).
+    variable["powerLambda"][valid] = norm * max_eig_values
+    variable["betaSquare"][valid] = polarization_degree(m11, m12, m13, m22, m23, m33)
+    (variable["thetaH"][valid], variable["phiHH"][valid], variable["thetaV"][valid],
+     variable["phiVH"][valid]) = polarization_angles_array(max_eig_vectors[:, 0], max_eig_vectors[:, 1],
+                                                           max_eig_vectors[:, 2])
+
+    # All-zero matrices (no power, e.g. outside the deconFilter band of the frequency domain response removal)
+    # have no primary eigenvector, their polarization parameters are not defined.
+    no_power = np.zeros(len(valid), dtype=bool)
+    no_power[valid] = (m11 == 0) & (m22 == 0) & (m33 == 0)
+    for var in ("betaSquare", "thetaH", "thetaV", "phiVH", "phiHH"):
+        variable[var][no_power] = np.nan
+    return variable
+
+
+def smooth_polarization(variables, xtype, x, spectra_matrix, norm, sampling_rate, octave_window_width,
+                        octave_window_shift, x_limit, x_start):
+    """
+   polarization variables at the smoothing centers from octave-averaged spectral covariance matrices
+
+   the matrices of all frequencies x that fall in each smoothing bin (the same centers and bins as the sfLib
+   smoothing) are averaged first and the eigen-analysis runs only at the bin centers. This is not the same as
+   smoothing the per-frequency variables:
+     - powerUD, powerEW and powerNS are the same (to rounding), the diagonal is real and positive
+     - powerLambda is the largest eigenvalue of the bin mean matrix, it is less than or equal to the bin mean
+       of the per-frequency largest eigenvalues
+     - betaSquare is lower where the polarization changes across the bin, mixing the matrices of
+       different frequencies makes the average less polarized
+     - thetaH, thetaV, phiVH and phiHH are the angles of the primary eigenvector of the bin mean matrix, that is
+       weighted by power, rather than the unweighted circular mean of the per-frequency angles
+
+   returns the smoothing centers and the dictionary of the variables at the centers
+   """
+    smooth_x = sf_lib.smoothing_centers(xtype, sampling_rate, octave_window_width, octave_window_shift, x_limit,
+                                        x_start)
+    smooth_matrix = sf_lib.bin_mean(x, spectra_matrix, smooth_x, float(octave_window_width / 2.0))
+    smooth = variable_buffer(variables, len(smooth_x))[1]
+    return smooth_x, polarization_variables(smooth, smooth_matrix, norm)
+
+
+# Rotation (0 from horizontal, 90 from vertical) of the angular variables for smoothing.
+ANGULAR_ROTATION = {'thetaH': 0.0, 'thetaV': 90.0, 'phiVH': 90.0, 'phiHH': 90.0}
+
+
+def smooth_variables(variable, xtype, x, sampling_rate, octave_window_width, octave_window_shift, x_limit, x_start):
+    """
+   octave smoothing of the per-frequency polarization variables with the sfLib smoothing functions
+
+   x is the period or frequency of the variable values, x_limit the maximum period or the minimum frequency and
+   x_start the smoothing start ('Nyquist' or a period/frequency). Angular variables are smoothed as angles and
+   wrapped back to their range. Returns the smoothing centers and the dictionary of the smoothed variables.
+   """
+    smooth_x = list()
+    smooth = dict()
+    for var in variable:
+        rotation = ANGULAR_ROTATION.get(var)
+        if str(x_start) == 'Nyquist':
+            if rotation is None:
+                smooth_x, smooth[var] = sf_lib.smooth_nyquist(xtype, x, variable[var], sampling_rate,
+                                                              octave_window_width, octave_window_shift, x_limit)
+            else:
+                smooth_x, smooth[var] = sf_lib.smooth_nyquest_angular(xtype, x, variable[var], sampling_rate,
+                                                                      octave_window_width, octave_window_shift,
+                                                                      x_limit, rotation)
+        elif xtype == 'period':
+            if rotation is None:
+                smooth_x, smooth[var] = sf_lib.smooth_period(x, variable[var], sampling_rate, octave_window_width,
+                                                             octave_window_shift, x_limit, float(x_start))
+            else:
+                smooth_x, smooth[var] = sf_lib.smooth_period_angular(x, variable[var], sampling_rate,
+                                                                     octave_window_width, octave_window_shift,
+                                                                     x_limit, float(x_start), rotation)
+        else:
+            if rotation is None:
+                smooth_x, smooth[var] = sf_lib.smooth_frequency(x, variable[var], sampling_rate,
+                                                                octave_window_width, octave_window_shift, x_limit,
+                                                                float(x_start))
+            else:
+                smooth_x, smooth[var] = sf_lib.smooth_frequency_angular(x, variable[var], sampling_rate,
+                                                                        octave_window_width, octave_window_shift,
+                                                                        x_limit, float(x_start), rotation)
+        smooth[var] = np.array(smooth[var])
+
+    # Wrap the smoothed angles back to their range.
+    if 'thetaH' in smooth:
+        smooth['thetaH'] = np.where(smooth['thetaH'] < 0.0, smooth['thetaH'] + 360.0, smooth['thetaH'])
+    if 'phiVH' in smooth:
+        smooth['phiVH'] = np.where(smooth['phiVH'] > 90.0, smooth['phiVH'] - 180.0,
+                                   np.where(smooth['phiVH'] < -90.0, smooth['phiVH'] + 180.0, smooth['phiVH']))
+    if 'phiHH' in smooth:
+        smooth['phiHH'] = np.where(smooth['phiHH'] > 180.0, smooth['phiHH'] - 360.0,
+                                   np.where(smooth['phiHH'] < -180.0, smooth['phiHH'] + 360.0, smooth['phiHH']))
+    return smooth_x, smooth
+
+
+# The power variables, output in dB.
+POWER_VARIABLES = ('powerUD', 'powerEW', 'powerNS', 'powerLambda')
+
+
+def x_axis(xtype, spec_length, num_samples, delta, max_period, min_frequency):
+    """
+   the x-values (period or frequency) of the spec_length frequencies of the num_samples long segments and the
+   smoothing limit (maximum period or minimum frequency)
+   """
+    if xtype == "period":
+        # 10.0*maxT to avoid 1.0/0.0 at zero frequency
+        period = np.append([10.0 * max_period], 1.0 / (np.arange(1.0, spec_length) / float(num_samples * delta)))
+        return period, max_period
+    frequency = np.array(np.arange(0, spec_length) / float(num_samples * delta))
+    return frequency, min_frequency
+
+
+def power_to_db(variable):
+    """
+   convert the power variables of a variable dictionary to dB, zero powers (outside the deconFilter band of the
+   frequency domain response removal) are -inf dB
+   """
+    with np.errstate(divide='ignore'):
+        for var in POWER_VARIABLES:
+            if var in variable:
+                variable[var] = 10.0 * np.log10(variable[var])
+    return variable
+
+
+def write_polarization(file_name, x_units, power_units, header, smooth_x, smooth):
+    """Write the smoothed polarization values of a window in the text polarization DB format."""
+    with open(file_name, "w") as file:
+
+        # Header.
+        file.write(f'{x_units} {power_units}\n')
+        file.write(f'{header}\n')
+
+        # Data.
+        for i in range(0, len(smooth_x)):
+            file.write("%11.6f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f %11.4f\n" % (
+                float(smooth_x[i]), float(smooth["powerUD"][i]), float(smooth["powerEW"][i]),
+                float(smooth["powerNS"][i]), float(smooth["powerLambda"][i]),
+                float(smooth["betaSquare"][i]), float(smooth["thetaH"][i]), float(smooth["thetaV"][i]),
+                float(smooth["phiVH"][i]), float(smooth["phiHH"][i])))
+
+
+COVARIANCE_EXTENSION = 'npz'
+
+# The independent elements (upper triangle) of the Hermitian spectral matrices, m11, m12, m13, m22, m23, m33.
+COVARIANCE_ELEMENTS = ((0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2))
+
+
+def covariance_file_name(file_name):
+    """The covariance archive file of a polarization file name."""
+    if file_name.endswith('.txt'):
+        file_name = file_name[:-len('.txt')]
+    return f'{file_name}.{COVARIANCE_EXTENSION}'
+
+
+def save_covariance(file_name, spectra_matrix, sampling_frequency, delta, num_samples, segments_count, power_units,
+                    channels):
+    """Save the (frequencies x 3 x 3) average spectral covariance matrices of a window in the compressed binary
+    covariance archive format, only the 6 independent elements of each matrix are stored, in single precision."""
+    with open(file_name, 'wb') as out_file:
+        np.savez_compressed(out_file,
+                            spectra=np.array([spectra_matrix[:, i, j] for i, j in COVARIANCE_ELEMENTS],
+                                             dtype=np.complex64),
+                            sampling_frequency=sampling_frequency, delta=delta, num_samples=num_samples,
+                            segments_count=segments_count,
+                            power_units=np.array(power_units), channels=np.array(channels))
+
+
+def load_covariance(file_name):
+    """Load a covariance archive saved by save_covariance as a dictionary, the 'spectra_matrix' entry is the
+    (frequencies x 3 x 3) Hermitian stack rebuilt from the stored elements, in double precision."""
+    with np.load(file_name) as covariance_file:
+        covariance = {key: covariance_file[key] for key in covariance_file.files}
+    spectra = covariance.pop('spectra').astype(complex)
+    spectra_matrix = np.empty((spectra.shape[1], 3, 3), dtype=spectra.dtype)
+    for (i, j), element in zip(COVARIANCE_ELEMENTS, spectra):
+        spectra_matrix[:, i, j] = element
+        if i != j:
+            spectra_matrix[:, j, i] = element.conjugate()
+    covariance['spectra_matrix'] = spectra_matrix
+    return covariance
+
+
+def channel_psds(spectra_matrix, delta, taper_window):
+    """
+   power spectral densities of the 3 channels from the diagonal (m11, m22, m33) of a (frequencies x 3 x 3) stack of
+   average spectral covariance matrices of the tapered segments, as a (3 x frequencies) array without the zero
+   frequency
+
+   scaled as the ntk_computePSD.py spectra (one-sided density corrected for the taper power, the Nyquist
+   frequency of an even number of samples is not doubled), not as the polarization powers
+   """
+    psd = np.abs(np.diagonal(spectra_matrix[1:], axis1=1, axis2=2)).T * (2.0 * delta / np.sum(taper_window ** 2))
+    if len(taper_window) % 2 == 0:
+        psd[:, -1] /= 2.0
+    return psd
+
+
+# Polarization DB formats, 'text' (one file per window, one row per x-value) or 'binary' (one file per station-day
+# with the shared x-axis, the window start time index and a (windows x x-values x variables) float32 array).
+POLAR_DB_FORMATS = ('text', 'binary')
+POLAR_DAY_EXTENSION = 'npz'
+
+
+def polar_day_file_name(file_path, file_tag, day, window_length, xtype):
+    """The binary polarization DB file of a station-day (day as YYYY-MM-DD)."""
+    return os.path.join(file_path, f'{file_tag}.{day}.{window_length}.{xtype}.{POLAR_DAY_EXTENSION}')
+
+
+def save_polar_day(file_name, windows, variables, x_units, power_units):
+    """Add the windows of a station-day, a list of (window start time, x-values, (x-values x variables) values), to
+    the binary polarization DB file of the day in a single write. The windows are kept sorted by start time and a
+    window already in the file is replaced. All windows of a file must share the same x-axis and variables, the
+    windows that do not are not saved. Return the start times of the windows not saved."""
+    day_windows = dict()
+    if os.path.isfile(file_name):
+        polar_day = load_polar_day(file_name)
+        day_x = polar_day['x']
+        if list(polar_day['variables']) != list(variables):
+            return [str(np.datetime64(window[0], 's')) for window in windows]
+        for window_time, values in zip(polar_day['times'], polar_day['values']):
+            day_windows[window_time] = values
+    else:
+        day_x = np.asarray(windows[0][1], dtype=float) if windows else None
+
+    skipped = list()
+    for window_time, x, values in windows:
+        window_time = np.datetime64(window_time, 's')
+        if not np.array_equal(day_x, np.asarray(x, dtype=float)):
+            skipped.append(str(window_time))
+            continue
+        day_windows[window_time] = np.asarray(values, dtype=np.float32)
+    if len(skipped) >= len(windows):
+        return skipped
+
+    # Write a new file and move it in place, so a failed write does not lose the windows already stored.
+    times = np.array(sorted(day_windows), dtype='datetime64[s]')
+    temp_file_name = f'{file_name}.tmp'
+    with open(temp_file_name, 'wb') as out_file:
+        np.savez(out_file, x=day_x, times=times, values=np.array([day_windows[time] for time in times]),
+                 variables=np.array(variables), x_units=np.array(x_units), power_units=np.array(power_units))
+    os.replace(temp_file_name, file_name)
+    return skipped
+
+
+def load_polar_day(file_name):
+    """Load a binary polarization DB file saved by save_polar_day as a dictionary of arrays, 'x' (x-values),
+    'times' (window start times, datetime64[s]) and 'values' (windows x x-values x variables)."""
+    with np.load(file_name) as polar_file:
+        return {key: polar_file[key] for key in polar_file.files}
+
+
+def x_labels(x):
+    """The x-values labels, as written in the text polarization files."""
+    return [f'{value:.6f}' for value in x]
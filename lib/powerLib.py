@@ -0,0 +1,415 @@
+import bisect
+import os
+
+import numpy as np
+
+import utilsLib as utils_lib
+
+"""
+ Name: powerLib.py - a Python 3 library to compute the power of PSDs over period bands.
+
+ HISTORY:
+    2026-10-19 IRIS DMC Product Team: created to replace the per-sample band integration loop of ntk_computePower.py
+    2026-10-19 IRIS DMC Product Team: window times are parsed by column with utilsLib.get_epoch
+    2026-10-19 IRIS DMC Product Team: daily, weekly and monthly power rollups
+    2026-10-19 IRIS DMC Product Team: min/max-per-pixel and LTTB downsampling of the plotted series
+"""
+
+
+def write_header(out_file, bins, bin_start, bin_end):
+    """Write the header of a band power file."""
+    out_file.write('Period ranges\n')
+    out_file.write('%20s %20s' % ('Date', 'Time'))
+    for k in range(len(bin_start)):
+        out_file.write('%20s' % f'{bins[k]} ({bin_start[k]}-{bin_end[k]})')
+    out_file.write('\n')
+
+
+def write_power(out_file, date, time, power):
+    """Write the band powers of one PSD window."""
+    out_file.write("%20s %20s" % (date, time))
+    for k in range(0, len(power)):
+        out_file.write("%20.5e" % (power[k]))
+    out_file.write("\n")
+
+
+def read_windows(in_file, xtype):
+    """Read a combined PSD file (ntk_extractPsdHour.py output) in a single forward pass and yield its PSD windows
+    one at a time as (date, time, period, psd) with period and psd sorted by period. The lines of a window are the
+    consecutive lines with the same date and time, blank lines are skipped."""
+    window = None
+    for line in in_file:
+        line = line.strip()
+        if len(line) <= 0:
+            continue
+
+        # Each row, split columns.
+        date, time, this_x, this_y = line.split()
+
+        # Depending on type, recompute X if needed.
+        if xtype == 'frequency':
+            this_x = 1.0 / float(this_x)
+
+        if window is None or (date, time) != window[0:2]:
+            if window is not None:
+                yield sort_window(window)
+            window = (date, time, list(), list())
+        window[2].append(float(this_x))
+        window[3].append(float(this_y))
+
+    # The trailing window.
+    if window is not None:
+        yield sort_window(window)
+
+
+def sort_window(window):
+    """Sort the samples of a (date, time, period, psd) window by period."""
+    date, time, period, psd = window
+    period = np.array(period)
+    psd = np.array(psd)
+    order = np.lexsort((psd, period))
+    return date, time, period[order], psd[order]
+
+
+def band_weights(period, bin_start, bin_end):
+    """Compute the (bands x periods) rectangular integration weight matrix of a sorted period grid.
+
+    NOTE: PSD is equal to the power as the a measure point divided by the width of the bin
+          PSD = P / W
+          log(P) = log(PSD) + log(W)  here W is width in frequency
+
+    For each band, the power of sample j is assigned to the interval from period j to period j + 1
+    (the last sample is never used) and only samples with bin_start <= period < bin_end are accepted:
+           _   _
+          | |_| |
+          |_|_|_|
+
+    The width is adjusted if the band start does not fall on a data point (the interval then starts at the band
+    start) or, otherwise, if the band end does not fall on a data point (the interval then ends at the band end).
+    The weight of sample j is the width of its interval in Hz.
+    """
+    period = np.asarray(period, dtype=float)
+    weights = np.zeros((len(bin_start), len(period)))
+    if len(period) < 2:
+        return weights
+    this_period = period[:-1]
+    next_period = period[1:]
+    previous_period = np.concatenate(([-np.inf], period[:-2]))
+    for k in range(len(bin_start)):
+        start = float(bin_start[k])
+        end = float(bin_end[k])
+        width = np.abs(1.0 / this_period - 1.0 / next_period)
+
+        # The band end falls between this and the next period.
+        end_adjust = (this_period < end) & (end <= next_period)
+        width[end_adjust] = np.abs(1.0 / this_period[end_adjust] - 1.0 / end)
+
+        # The band start falls between the previous (if any) and this period, takes precedence over the end.
+        start_adjust = (this_period > start) & (start > previous_period)
+        width[start_adjust] = np.abs(1.0 / start - 1.0 / next_period[start_adjust])
+
+        accept = (start <= this_period) & (this_period < end)
+        weights[k, :-1] = np.where(accept, width, 0.0)
+    return weights
+
+
+def band_power(weights, psd):
+    """Compute the band powers of one (periods) or many (windows x periods) PSDs in dB using the weights of their
+    period grid. Samples with a zero weight never contribute, even if their PSD is not finite."""
+    power = np.power(10.0, np.asarray(psd, dtype=float) / 10.0)
+    finite = np.isfinite(power)
+    if np.all(finite):
+        return power @ weights.T
+    with np.errstate(invalid='ignore'):
+        return np.sum(np.where(weights != 0, weights * power[..., np.newaxis, :], 0.0), axis=-1)
+
+
+def parseval_weights(frequency, resolution, bin_start, bin_end):
+    """Compute the (bands x frequencies) weights that integrate a one-sided PSD (linear units) over period bands
+    (Parseval). The band mask accepts the frequencies with bin_start <= 1 / frequency < bin_end, as the band
+    integration of the smoothed PSDs does, and each accepted sample contributes its PSD times the frequency
+    resolution."""
+    period = 1.0 / np.asarray(frequency, dtype=float)
+    bin_start = np.asarray(bin_start, dtype=float)[:, np.newaxis]
+    bin_end = np.asarray(bin_end, dtype=float)[:, np.newaxis]
+    return ((bin_start <= period) & (period < bin_end)) * float(resolution)
+
+
+def read_power(file_name):
+    """Read a band power file (ntk_computePower.py output) in one pass. Return the window times (epoch seconds)
+    and the (windows x bands) band powers, both sorted by time."""
+    date_list = list()
+    time_list = list()
+    power_list = list()
+    with open(file_name) as in_file:
+        # Skip the two header lines.
+        next(in_file, None)
+        next(in_file, None)
+        for line in in_file:
+            values = line.split()
+            if len(values) <= 0:
+                continue
+            date_list.append(values[0])
+            time_list.append(values[1])
+            power_list.append([float(value) for value in values[2:]])
+    times = utils_lib.get_epoch(date_list, time_list)
+    power = np.array(power_list, dtype=float).reshape(len(time_list), -1)
+    order = np.argsort(times, kind='stable')
+    return times[order], power[order]
+
+
+def read_centers(file_name):
+    """Read the window center times (epoch seconds) of a smoothed power file (ntk_medianPower.py output) and the
+    byte offset of each of its data lines. The offsets have one more element, the end of the file."""
+    label_list = list()
+    offset_list = list()
+    offset = 0
+    with open(file_name, 'rb') as in_file:
+        for index, line in enumerate(in_file):
+            # Skip the two header lines.
+            if index >= 2 and len(line.strip()) > 0:
+                label_list.append(line.split()[0].decode())
+                offset_list.append(offset)
+            offset += len(line)
+    offset_list.append(offset)
+    centers = utils_lib.get_epoch(label_list)
+    return centers, np.array(offset_list, dtype=np.int64)
+
+
+class RollingMedian:
+    """Median (and percentiles) of a sliding set of values kept as a sorted list, updated one value at a time. As
+    with np.median and np.percentile, the result is NaN if any of the values is NaN."""
+
+    def __init__(self):
+        self.values = list()
+        self.nan_count = 0
+
+    def add(self, value):
+        if np.isnan(value):
+            self.nan_count += 1
+        else:
+            bisect.insort(self.values, value)
+
+    def remove(self, value):
+        if np.isnan(value):
+            self.nan_count -= 1
+        else:
+            del self.values[bisect.bisect_left(self.values, value)]
+
+    def median(self):
+        count = len(self.values)
+        if self.nan_count > 0 or count <= 0:
+            return np.nan
+        if count % 2:
+            return self.values[count // 2]
+        return (self.values[count // 2 - 1] + self.values[count // 2]) / 2.0
+
+    def percentile(self, percent):
+        """Percentile with the linear interpolation of np.percentile."""
+        count = len(self.values)
+        if self.nan_count > 0 or count <= 0:
+            return np.nan
+        index = (count - 1) * (percent / 100.0)
+        low = int(np.floor(index))
+        high = min(low + 1, count - 1)
+        fraction = index - low
+        difference = self.values[high] - self.values[low]
+        if fraction >= 0.5:
+            return self.values[high] - difference * (1 - fraction)
+        return self.values[low] + difference * fraction
+
+
+def statistic_percent(statistic):
+    """The percent of a percentile statistic name (p10 -> 10.0), None if not a valid percentile name."""
+    if not statistic.startswith('p'):
+        return None
+    try:
+        percent = float(statistic[1:])
+    except ValueError:
+        return None
+    if 0 <= percent <= 100:
+        return percent
+    return None
+
+
+def rolling_statistics(times, power, window_start, window_end, statistics=('median',)):
+    """Compute band power statistics over the windows [window_start, window_end] (both included, start and end
+    sorted) of the time-sorted band powers. The window limits are located with searchsorted and the order
+    statistics (median and percentiles p{percent}) are updated incrementally as the windows slide; the mean is
+    taken over the window slice. Return the number of samples of each window and a dictionary of
+    (windows x bands) arrays keyed by statistic."""
+    first = np.searchsorted(times, window_start, side='left')
+    last = np.searchsorted(times, window_end, side='right')
+    results = {statistic: np.full((len(window_start), power.shape[1]), np.nan) for statistic in statistics}
+    band_values = [RollingMedian() for _ in range(power.shape[1])]
+    low = high = 0
+    for n in range(len(window_start)):
+        while high < last[n]:
+            for k in range(power.shape[1]):
+                band_values[k].add(power[high, k])
+            high += 1
+        while low < first[n]:
+            for k in range(power.shape[1]):
+                band_values[k].remove(power[low, k])
+            low += 1
+        if last[n] <= first[n]:
+            continue
+        for statistic in statistics:
+            if statistic == 'median':
+                results[statistic][n] = [band_values[k].median() for k in range(power.shape[1])]
+            elif statistic == 'mean':
+                results[statistic][n] = np.mean(power[first[n]:last[n]], axis=0)
+            else:
+                percent = statistic_percent(statistic)
+                results[statistic][n] = [band_values[k].percentile(percent) for k in range(power.shape[1])]
+    return last - first, results
+
+
+"""
+ The power rollups are the daily, weekly (ISO weeks, starting on Monday) and monthly aggregates of a band power file
+ (ntk_computePower.py output): for each period and band, the median, minimum and maximum of the band powers and
+ the number of band powers aggregated (NaN values are not counted). They are saved in the binary rollup format:
+      {power directory}/ROLLUP/{power file name}.{level}.npz
+ The nominal length (seconds) of each level is used to select the level that is sufficient for a plot.
+"""
+ROLLUP_EXTENSION = 'npz'
+ROLLUP_LEVELS = {'day': 86400.0, 'week': 7 * 86400.0, 'month': 30.436875 * 86400.0}
+
+
+def rollup_start(times, level):
+    """The start time (datetime64, day precision) of the rollup period of each time (epoch seconds)."""
+    days = (np.asarray(times, dtype=float) // 86400).astype('datetime64[D]')
+    if level == 'day':
+        return days
+    elif level == 'week':
+        # Epoch day 0 is a Thursday.
+        return days - (days.astype(np.int64) + 3) % 7
+    elif level == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f'unknown rollup level {level}, must be one of {tuple(ROLLUP_LEVELS)}')
+
+
+def rollup(times, power, level):
+    """Aggregate the time-sorted (windows x bands) band powers by rollup period. Return the period start times
+    (datetime64) and the (periods x bands) number of values, median, minimum and maximum. The medians are those of
+    np.median over the non-NaN values of each period, NaN if there are none."""
+    power = np.asarray(power, dtype=float).reshape(len(times), -1)
+    period_start, group = np.unique(rollup_start(times, level), return_inverse=True)
+    shape = (len(period_start), power.shape[1])
+    count = np.zeros(shape, dtype=np.int64)
+    median = np.full(shape, np.nan)
+    minimum = np.full(shape, np.nan)
+    maximum = np.full(shape, np.nan)
+    for k in range(power.shape[1]):
+        valid = ~np.isnan(power[:, k])
+        values = power[valid, k]
+        band_group = group[valid]
+
+        # Sort the values by period and by value, each period is then a contiguous run of sorted values.
+        values = values[np.lexsort((values, band_group))]
+        count[:, k] = np.bincount(band_group, minlength=len(period_start))
+        has_values = count[:, k] > 0
+        first = (np.cumsum(count[:, k]) - count[:, k])[has_values]
+        this_count = count[has_values, k]
+        minimum[has_values, k] = values[first]
+        maximum[has_values, k] = values[first + this_count - 1]
+        median[has_values, k] = (values[first + (this_count - 1) // 2] + values[first + this_count // 2]) / 2.0
+    return period_start, count, median, minimum, maximum
+
+
+def rollup_file_name(rollup_directory, power_file, level):
+    """The rollup file of a power file for a given level."""
+    tag = os.path.basename(power_file)
+    if tag.endswith('.txt'):
+        tag = tag[:-len('.txt')]
+    return os.path.join(rollup_directory, f'{tag}.{level}.{ROLLUP_EXTENSION}')
+
+
+def save_rollup(file_name, period_start, count, median, minimum, maximum, header):
+    """Save a power rollup in the binary rollup format, header is the band header line of the power file."""
+    with open(file_name, 'wb') as out_file:
+        np.savez(out_file, start=period_start, count=count, median=median, minimum=minimum, maximum=maximum,
+                 header=np.array(header))
+
+
+def load_rollup(file_name):
+    """Load a power rollup saved by save_rollup as a dictionary of arrays."""
+    with np.load(file_name) as rollup_file:
+        return {key: rollup_file[key] for key in rollup_file.files}
+
+
+def select_rollup_level(span, pixels, levels=tuple(ROLLUP_LEVELS)):
+    """The coarsest of the levels that still has at least one period per pixel over a time span (seconds), None if
+    even the finest level is too coarse and the full resolution power is needed."""
+    selected = None
+    for level in levels:
+        if ROLLUP_LEVELS[level] * pixels <= span:
+            if selected is None or ROLLUP_LEVELS[level] > ROLLUP_LEVELS[selected]:
+                selected = level
+    return selected
+
+
+DOWNSAMPLE_METHODS = ('none', 'minmax', 'lttb')
+
+
+def downsample_min_max(x, y, points):
+    """Indices (sorted) of the points kept by the min/max-per-pixel downsampling of the x-sorted series: the x range
+    is split into points / 2 equal buckets (pixel columns) and the minimum and maximum of each bucket are kept, along
+    with the first and last points, so that the outliers and the envelope of the series are preserved."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bucket_count = max(points // 2, 1)
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket = np.minimum(((x - x[0]) / span * bucket_count).astype(np.int64), bucket_count - 1)
+    else:
+        bucket = np.zeros(len(x), dtype=np.int64)
+
+    # Within each bucket, sorted by value, the first point is the minimum and the last the maximum.
+    order = np.lexsort((y, bucket))
+    bucket = bucket[order]
+    first = np.flatnonzero(np.diff(bucket, prepend=-1))
+    last = np.append(first[1:] - 1, len(order) - 1)
+    return np.unique(np.concatenate(([0, len(x) - 1], order[first], order[last])))
+
+
+def downsample_lttb(x, y, points):
+    """Indices (sorted) of the points kept by the Largest-Triangle-Three-Buckets downsampling of the x-sorted
+    series: the first and last points are kept and, for each of the points - 2 equal-count buckets in between, the
+    point that makes the largest triangle with the previously kept point and the average of the next bucket."""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count = len(x)
+    if points < 3 or count <= points:
+        return np.arange(count)
+    edges = np.linspace(1, count - 1, points - 1).astype(np.int64)
+    selected = np.zeros(points, dtype=np.int64)
+    selected[-1] = count - 1
+    previous = 0
+    for n in range(points - 2):
+        start, end = edges[n], edges[n + 1]
+        if n + 2 < len(edges):
+            next_x = x[edges[n + 1]:edges[n + 2]].mean()
+            next_y = y[edges[n + 1]:edges[n + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) -
+                      (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[n + 1] = previous
+    return selected
+
+
+def downsample(x, y, points, method='minmax'):
+    """Indices (sorted) of the points of the x-sorted series to plot with at most about points points. NaN values
+    are never kept (they are not plotted), series that are short enough are not downsampled."""
+    valid = np.flatnonzero(~np.isnan(np.asarray(y, dtype=float)))
+    if method == 'none' or len(valid) <= points:
+        return valid
+    x = np.asarray(x, dtype=float)[valid]
+    y = np.asarray(y, dtype=float)[valid]
+    if method == 'minmax':
+        return valid[downsample_min_max(x, y, points)]
+    elif method == 'lttb':
+        return valid[downsample_lttb(x, y, points)]
+    raise ValueError(f'unknown downsampling method {method}, must be one of {DOWNSAMPLE_METHODS}')
@@ -542,3 +542,71 @@ def smooth_period_angular(period, power, sampling_rate, octave_window_width, oct
     # sort on period and return
     per, this_power = (list(t) for t in zip(*sorted(zip(per, this_power))))
     return per, this_power
+
+
+def smoothing_centers(xtype, sampling_rate, octave_window_width, octave_window_shift, x_limit, x_start):
+    """Smoothing window centers in the xtype domain, sorted
+
+     the same centers that smooth_nyquist (x_start='Nyquist'), smooth_frequency and smooth_period
+     produce, x_limit is the minimum frequency or the maximum period
+
+     HISTORY:
+        2026-10-19 IRIS DMC Product Team: created to smooth the spectral covariance matrices
+
+    """
+    x = list()
+    shift = math.pow(2.0, octave_window_shift)
+
+    if str(x_start) == 'Nyquist':
+        # The first center x at the Nyquist
+        if xtype == "frequency":
+            xc = float(sampling_rate) / float(2.0)  # Nyquist frequency
+        else:
+            xc = float(2.0) / float(sampling_rate)  # Nyquist period
+
+        while not ((xtype == "frequency" and xc < x_limit) or (xtype == "period" and xc > x_limit)):
+            x.append(xc)
+            if xtype == "frequency":
+                xc /= shift
+            else:
+                xc *= shift
+        return np.array(sorted(x))
+
+    # Multiples of x_start, down to the lower limit and up to the upper limit.
+    if xtype == "frequency":
+        x_low, x_high = x_limit, float(sampling_rate) / 2.0
+    else:
+        x_low, x_high = 2.0 / float(sampling_rate), x_limit
+
+    xc = float(x_start)
+    while xc >= x_low:
+        x.append(xc)
+        xc /= shift
+
+    xc = float(x_start) * shift
+    while xc <= x_high:
+        x.append(xc)
+        xc *= shift
+    return np.array(sorted(x))
+
+
+def bin_mean(x, y, centers, octave_half_window):
+    """
+    Average of the y values (along the first axis) that fall within octaveHalfWindow on either side of each
+    center, the same bins as get_bin, NaN for empty bins
+
+     HISTORY:
+        2026-10-19 IRIS DMC Product Team: created to smooth the spectral covariance matrices
+
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    mean = np.full((len(centers),) + y.shape[1:], np.nan, dtype=y.dtype)
+    shift = math.pow(2.0, octave_half_window)
+    for index, xc in enumerate(centers):
+        x1 = xc / shift
+        x2 = xc * shift
+        in_bin = (x >= min(x1, x2)) & (x <= max(x1, x2))
+        if np.any(in_bin):
+            mean[index] = np.mean(y[in_bin], axis=0)
+    return mean
@@ -10,6 +10,8 @@ import math
 from obspy.core import UTCDateTime, read, Stream
 from obspy import read_inventory
 from obspy.io.stationxml.core import validate_stationxml as validate_StationXML
+from obspy.signal.invsim import cosine_sac_taper, invert_spectrum
+from obspy.signal.util import _npts2nfft
 from time import time
 
 import msgLib as msg_lib
@@ -590,4 +592,49 @@ def qc_3c_stream(stream, segment_length, window, sorted_channel_list, channel_gr
 
     if verbose:
         msg_lib.info(f'{sender}, passed records: {qc_record_list}')
-    return qc_record_list
\ No newline at end of file
+    return qc_record_list
+
+
+def get_inverse_response(response, delta, nfft, output, pre_filt=None, water_level=None):
+    """
+    get_inverse_response
+        the inverse instrument response spectrum of the nfft rfft frequencies, as applied by
+        ObsPy's Trace.remove_response: the response is inverted with the water level (dB) and multiplied by the
+        pre_filt cosine taper, if any. See remove_response.
+
+        2026-10-19 IRIS DMC Product Team: created
+    """
+    inverse_response, frequencies = response.get_evalresp_response(delta, nfft, output=output)
+    if water_level is None:
+        inverse_response[0] = 0.0
+        inverse_response[1:] = 1.0 / inverse_response[1:]
+    else:
+        invert_spectrum(inverse_response, water_level)
+    if pre_filt is not None:
+        inverse_response *= cosine_sac_taper(frequencies, flimit=pre_filt)
+    return inverse_response
+
+
+def response_nfft(npts):
+    """
+    response_nfft
+        the FFT length ObsPy's Trace.remove_response uses for a trace of npts samples
+
+        2026-10-19 IRIS DMC Product Team: created
+    """
+    return _npts2nfft(npts)
+
+
+def remove_response(data, inverse_response):
+    """
+    remove_response
+        remove the instrument response from the raw counts of a whole trace as ObsPy's Trace.remove_response
+        does (no taper, no demean), with the inverse response spectrum of get_inverse_response for the
+        response_nfft(len(data)) FFT length
+
+        2026-10-19 IRIS DMC Product Team: created
+    """
+    spectrum = np.fft.rfft(np.asarray(data, dtype=np.float64), n=2 * (len(inverse_response) - 1))
+    spectrum *= inverse_response
+    spectrum[-1] = abs(spectrum[-1]) + 0.0j
+    return np.fft.irfft(spectrum)[0:len(data)]
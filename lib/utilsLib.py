@@ -3,6 +3,7 @@ import os
 from time import time
 from urllib.request import urlopen
 
+import numpy as np
 from obspy.core import UTCDateTime
 import msgLib as msg_lib
 
@@ -75,6 +76,26 @@ def time_info(date_time, seconds=0):
     return datetime, year, month, day, doy
 
 
+def get_datetime64(date_list, time_list=None, unit='us'):
+    """Convert a column of ISO date-time labels (or of date and time labels) to numpy.datetime64 in one call.
+
+    The date and time are joined with a 'T', a 'T' may also be a blank, a trailing 'Z' is ignored and '_' time
+    separators (WINDOWS naming convention) are accepted. A single label gives a 0-d array."""
+    labels = np.asarray(date_list, dtype=str)
+    if time_list is not None:
+        labels = np.char.add(np.char.add(labels, 'T'), np.asarray(time_list, dtype=str))
+    if labels.size <= 0:
+        return np.empty(labels.shape, dtype=f'datetime64[{unit}]')
+    labels = np.char.replace(np.char.replace(np.char.strip(labels), ' ', 'T'), '_', ':')
+    labels = np.char.rstrip(labels, 'Z')
+    return labels.astype(f'datetime64[{unit}]')
+
+
+def get_epoch(date_list, time_list=None):
+    """Convert a column of ISO date-time labels (or of date and time labels) to epoch seconds in one call."""
+    return get_datetime64(date_list, time_list, unit='us').astype(np.int64) / 1000000.0
+
+
 def get_fedcatalog_url(request_net, request_sta, request_loc, request_chan, request_start, request_end):
     fedcatalog_ur = f'net={request_net}&sta={request_sta}&loc={request_loc}&' \
                     f'cha={request_chan}&targetservice=dataselect&level=channel&format=request&' \
@@ -14,6 +14,9 @@ polarDirectory = shared.polarDirectory
 polarDbDirectory = shared.polarDbDirectory
 pdfDirectory = 'PDF'
 
+# Polarization DB format, 'text' or 'binary' (see the polarDbFormat parameter of computePolarization).
+polarDbFormat = computePolarization.polarDbFormat
+
 # Channels directory label.
 chanDir = 'BHZ_BHE_BHN'
 
@@ -24,6 +27,15 @@ xType = shared.xType
 pdfHourlySave = 1
 pdfHourlyDirectory = 'HOUR'
 
+# Save the daily PDF count matrices and their monthly and yearly rollups (1/0)? The rollups allow PDFs over
+# long time ranges to be built from a handful of files (see ntk_rollupPdf.py).
+pdfStoreSave = 0
+
+# Daily output file format, 'text' (D???.bin) or 'sparse' (D???.npz, sparse binary PDF format that only keeps the bins
+# with hits). The daily file is written next to the PDF store (pdfStoreSave), whose daily count matrices are kept
+# per x-axis type under {xtype}/.
+pdfDailyFormat = 'text'
+
 # Delimiter character used in the output.
 separator = '\t'
 
@@ -21,3 +21,24 @@ intNan = -999999
 # delimiter character used in output.
 separator = '\t'
 
+
+# dB bin limits [range start, range end, width of each bin] of the PDF count matrices.
+bins = [-250, 50, 1]
+
+# Save the daily PDF count matrices and their monthly and yearly rollups (1/0)? The rollups allow PDFs over
+# long time ranges to be built from a handful of files (see ntk_rollupPdf.py).
+pdfStoreSave = 0
+
+# Daily output file format, 'text' (D???.bin) or 'sparse' (D???.npz, sparse binary PDF format that only keeps the bins
+# with hits). The daily file is written next to the PDF store (pdfStoreSave), whose daily count matrices are kept
+# per x-axis type under {xtype}/.
+pdfDailyFormat = 'text'
+
+# PDF groups binned in the same pass as the daily PDFs, any of 'utcHour', 'localHour', 'weekday' (local) and
+# 'month'. One PDF per group key (for example hour 13) covering all the binned days is written under
+# pdfGroupDirectory at the end of the run.
+pdfGroups = []
+pdfGroupDirectory = 'GROUP'
+
+# Offset of the local time from UTC in hours for the 'localHour' and 'weekday' groups (for example -6 for CST).
+localHourOffset = 0
@@ -1,5 +1,6 @@
 import os
 import shared
+import computePower
 
 # PSD database directory where individual PSD files are stored.
 psdDbDirectory = shared.psdDbDirectory
@@ -41,6 +42,15 @@ colorSmooth = 'tab:red'
 # Output the smoothed values.
 outputValues = 1
 
+# Output the band powers of each window in the ntk_computePower.py output format (1/0)? The band powers are
+# integrated directly from the response-corrected spectra (Parseval) over the computePower period bands below, so
+# band power time series can be produced without storing the smoothed PSDs (set outputValues to 0).
+outputPower = 0
+powerDirectory = shared.powerDirectory
+bins = computePower.bins
+binStart = computePower.binStart
+binEnd = computePower.binEnd
+
 # Smoothing window width in octave.
 # For test against PQLX use 1 octave width.
 
@@ -31,9 +31,37 @@ plotSmooth = 1
 # Plot Peterson's New LNM and HNM.
 plotNm = 1
 
+# Number of worker processes (workers argument), the independent windows are processed in parallel when
+# greater than 1. The output files are the same as with 1 worker. The worker processes are forked, so they share
+# the data of the request without copying it. Where fork is not available (Windows) and in plot mode the windows
+# are processed serially, with a warning.
+workers = 1
+
 # Output smoothed values?
 outputValues = 1
 
+# Polarization DB format of the output values:
+# 'text'   one text file per window, a row per x-value (frequency or period) and a column per variable
+# 'binary' one binary file (npz) per station-day with the shared x-axis, the window start times and a
+#          (windows x x-values x variables) float32 array of the values. Set the polarDbFormat parameter of
+#          ntk_extractPolarHour.py and ntk_binPolarDay.py to the same format to read it.
+polarDbFormat = 'text'
+
+# Combined mode (psd argument): also output the PSDs of the channels to the PSD DB under the psdDbDirectory (1/0)?
+# They are the diagonal (m11, m22, m33) of the spectral covariance matrices, scaled and smoothed like the
+# ntk_computePSD.py PSDs and written under the same path and name, so the data are requested, corrected and
+# transformed once for both products. The segments, taper and response removal are those of this file (see
+# responseDomain, waterLevel and deconFilter), so the PSDs are close to but not the same as those of
+# ntk_computePSD.py, that divides the spectra by the response without water level or filter.
+outputPsd = 0
+
+# Store the window-averaged spectral covariance matrices (m11...m33) of each window in the binary covariance
+# archive under the polarCovDirectory (1/0)? ntk_reprocessPolarization.py derives the polarization values from
+# the archive alone, to try different smoothing or xtype without requesting the data and removing the response again.
+# The matrices are stored compressed in single precision (about 280 kB for a 3600 s window of 40 sps data), the
+# reprocessed values may differ from those of this script in the last decimal.
+outputCovariance = 0
+
 # Trace scaling for display
 scaling = 1
 
@@ -63,12 +91,23 @@ octaveWindowWidth = float(1.0/4.0)
 # float(1.0/8.0) 1/8 octave shift, etc
 octaveWindowShift = float(1.0/8.0)
 
+# Smoothing of the spectral covariance matrices:
+# 0 = eigen-analysis at every FFT frequency, then smooth the polarization parameters
+# 1 = average the spectral covariance matrices over the same smoothing bins first and run the eigen-analysis
+#     only at the smoothing centers (about 100 times fewer eigen-analyses). Powers UD/EW/NS are the same,
+#     Lambda is the largest eigenvalue of the bin average (<= the bin average of the largest eigenvalues),
+#     Beta^2 is lower where polarization changes within the bin and the angles are those of the
+#     power-weighted primary eigenvector instead of the circular mean of the per-frequency angles.
+smoothMatrix = 0
+
 # Directory info from shared file
 ntkDirectory = shared.ntkDirectory
 workDir = shared.workDir
 dataDirectory = shared.dataDirectory
 respDirectory = shared.respDirectory
 polarDbDirectory = shared.polarDbDirectory
+polarCovDirectory = shared.polarCovDirectory
+psdDbDirectory = shared.psdDbDirectory
 
 # Possible x-axis types.
 xType = shared.xType
@@ -98,6 +137,13 @@ channelGroups = [["BHZ", "BHE", "BHN"], ["BHZ", "BH2", "BH1"], ["LHZ", "LHE", "L
 performInstrumentCorrection = True
 demean = True
 
+# How to remove the instrument response (performInstrumentCorrection):
+# 'time'      with ObsPy's Trace.remove_response, which evaluates the response of each trace
+# 'frequency' with the inverse response spectrum (same water level and deconFilter) evaluated once per channel
+#             response and FFT length and reused for all windows: each window is deconvolved as a whole before
+#             the segment FFTs, as 'time' does, so the results are the same as those of 'time'.
+responseDomain = 'time'
+
 # True will scale the waveform by the stage-zero gain,
 # not used if performInstrumentCorrection above is set to True
 applyScale = True
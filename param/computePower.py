@@ -43,3 +43,7 @@ binIndex = {'LM': 1, 'SM': 2, 'PM': 3, 'HUM': 4}
 binStart = {'LM': 1, 'SM': 5, 'PM': 11, 'HUM': 50}
 binEnd = {'LM': 5, 'SM': 10, 'PM': 30, 'HUM': 200}
 
+
+# Number of PSD windows read and processed at once, memory use is bounded by this batch size and not by the
+# PSD file size.
+windowBatch = 1000
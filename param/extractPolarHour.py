@@ -14,6 +14,9 @@ polarDirectory = shared.polarDirectory
 polarDbDirectory = shared.polarDbDirectory
 chanDir = 'BHZ_BHE_BHN'
 
+# Polarization DB format, 'text' or 'binary' (see the polarDbFormat parameter of computePolarization).
+polarDbFormat = computePolarization.polarDbFormat
+
 # Possible x-axis types.
 xType = computePolarization.xType
 
@@ -13,6 +13,10 @@ powerDirectory = shared.powerDirectory
 
 windowShiftSecond = 600.0
 
+# Statistics to compute in addition to the median (default of the stats argument), mean and/or percentiles as p
+# followed by the percent, for example ['p10', 'p90', 'mean'].
+statistics = []
+
 """
   periods in second for bins of Interest:
         local noise for stations near shore
@@ -0,0 +1,31 @@
+import binPsdDay
+import binPolarDay
+import shared
+
+# How file naming is done?
+namingConvention = shared.namingConvention
+
+# Turn the verbose mode on or off (1/0).
+verbose = 0
+
+# Directories.
+ntkDirectory = shared.ntkDirectory
+dataDirectory = shared.dataDirectory
+pdfDirectory = shared.pdfDirectory
+
+# X-axis types of the PDF store.
+xType = shared.xType
+
+# The bins, delimiters and group directory of ntk_binPsdDay.py and ntk_binPolarDay.py, to read their daily and
+# group PDF files.
+psdBins = binPsdDay.bins
+psdSeparator = binPsdDay.separator
+polarBins = binPolarDay.bins
+polarSeparator = binPolarDay.separator
+pdfGroupDirectory = binPsdDay.pdfGroupDirectory
+
+# Delimiter character used in output.
+separator = '\t'
+
+# Percentiles to compute along with the mode.
+percentiles = [10, 50, 90]
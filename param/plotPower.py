@@ -15,6 +15,9 @@ psdDirectory = shared.psdDirectory
 powerDirectory = shared.powerDirectory
 imageDirectory = shared.imageDirectory
 
+# The power rollups (ntk_rollupPower.py) are under this directory of the power directory.
+rollupDirectory = 'ROLLUP'
+
 #  The following bins will be used to group powers within a period band.
 bins = power.bins
 binStart = power.binStart
@@ -23,6 +26,19 @@ binIndex = power.binIndex
 
 # Plot parameters.
 plotSize = (10, 6)
+
+# Resolution (dots per inch) of the PNG plot, the plot width in pixels (plotSize[0] * plotDpi) sets the coarsest
+# power rollup level that can be used.
+plotDpi = 150
+
+# Downsampling of the median power series before plotting (default of the downsample argument), 'none', 'minmax'
+# (minimum and maximum of each pixel column) or 'lttb' (Largest-Triangle-Three-Buckets), and the number of points
+# to keep.
+plotDownsample = 'minmax'
+plotPoints = 3000
+
+# Number of processes of the batch mode (default of the workers argument).
+plotWorkers = 1
 columnTag = ['Period',  'Power']
 columnLabel = ['Period',  'dB']
 # dotColor = ['blue', 'green', 'red', 'cyan', 'magenta', 'yellow']
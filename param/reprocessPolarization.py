@@ -0,0 +1,34 @@
+import shared
+import computePolarization
+
+# Turn the verbose mode on or off (1/0).
+verbose = 0
+
+# Use 'WINDOWS' or 'PQLX' file naming convention?
+namingConvention = shared.namingConvention
+
+# Directories.
+ntkDirectory = shared.ntkDirectory
+dataDirectory = shared.dataDirectory
+polarDbDirectory = shared.polarDbDirectory
+polarCovDirectory = shared.polarCovDirectory
+chanDir = 'BHZ_BHE_BHN'
+
+# Polarization DB format of the output, by default the same as ntk_computePolarization.py.
+polarDbFormat = computePolarization.polarDbFormat
+
+# Possible x-axis types.
+xType = computePolarization.xType
+xlabel = computePolarization.xlabel
+header = computePolarization.header
+
+# Variables to derive.
+variables = computePolarization.variables
+
+# Smoothing, by default the same as ntk_computePolarization.py (see the computePolarization parameter file).
+doSmoothing = computePolarization.doSmoothing
+octaveWindowWidth = computePolarization.octaveWindowWidth
+octaveWindowShift = computePolarization.octaveWindowShift
+smoothMatrix = computePolarization.smoothMatrix
+xStart = computePolarization.xStart
+maxT = computePolarization.maxT
@@ -0,0 +1,18 @@
+import shared
+
+# How file naming is done?
+namingConvention = shared.namingConvention
+
+# Turn the verbose mode on or off (1/0).
+verbose = 0
+
+# Directories.
+ntkDirectory = shared.ntkDirectory
+dataDirectory = shared.dataDirectory
+powerDirectory = shared.powerDirectory
+
+# The rollups are saved under this directory of the power directory.
+rollupDirectory = 'ROLLUP'
+
+# Rollup levels to build (default of the levels argument), any of 'day', 'week' and 'month'.
+rollupLevels = ['day', 'week', 'month']
@@ -31,6 +31,8 @@ psdDirectory = 'PSD'
 
 # Polarization database directory where individual polarization files are stored
 polarDbDirectory = 'polarDb'
+# Spectral covariance archive directory (ntk_computePolarization.py outputCovariance)
+polarCovDirectory = 'polarCov'
 psdDbDirectory = 'psdDb'
 powerDirectory = 'POWER'
 polarDirectory = 'POLAR'
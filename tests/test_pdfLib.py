@@ -0,0 +1,81 @@
+import glob
+import os
+import sys
+
+import numpy as np
+
+# Import the Noise Toolkit libraries.
+library_path = os.path.join(os.path.dirname(__file__), '..', 'lib')
+sys.path.append(library_path)
+
+import pdfLib as pdf_lib
+
+EDGES = np.arange(-10.0, 11.0)
+
+
+def daily_pdf(seed):
+    """A daily PDF of two x-values with random values."""
+    rng = np.random.default_rng(seed)
+    pdf = pdf_lib.PdfAccumulator(EDGES)
+    pdf.add(['1.0'] * 50 + ['2.0'] * 50, rng.uniform(-10.0, 10.0, 100))
+    return pdf
+
+
+def assert_rollups_match_days(directory, year, month):
+    """The monthly and yearly rollups are the sums of the stored daily PDFs."""
+    total = pdf_lib.PdfAccumulator(EDGES)
+    for file_name in glob.glob(os.path.join(directory, 'D*.npz')):
+        total.merge(pdf_lib.load(file_name))
+    total.prune()
+    for rollup_file in (pdf_lib.month_file_name(directory, month), pdf_lib.year_file_name(directory, year)):
+        rollup = pdf_lib.load(rollup_file)
+        assert sorted(rollup.keys) == sorted(total.keys)
+        for key in total.keys:
+            assert np.array_equal(rollup.counts[rollup.index[key]], total.counts[total.index[key]])
+    assert not os.path.exists(os.path.join(directory, pdf_lib.STORE_UPDATE_MARKER))
+
+
+def test_save_day_replaces_a_day(tmp_path):
+    directory = str(tmp_path)
+    pdf_lib.save_day(directory, 2008, 8, 227, daily_pdf(1))
+    pdf_lib.save_day(directory, 2008, 8, 228, daily_pdf(2))
+    pdf_lib.save_day(directory, 2008, 8, 227, daily_pdf(3))
+    assert_rollups_match_days(directory, 2008, 8)
+
+
+def test_save_day_rebuilds_missing_rollups(tmp_path):
+    directory = str(tmp_path)
+    pdf_lib.save_day(directory, 2008, 8, 227, daily_pdf(1))
+    pdf_lib.save_day(directory, 2008, 8, 228, daily_pdf(2))
+
+    # Replacing a day without its monthly rollup must not leave negative counts.
+    os.remove(pdf_lib.month_file_name(directory, 8))
+    pdf_lib.save_day(directory, 2008, 8, 227, daily_pdf(3))
+    assert_rollups_match_days(directory, 2008, 8)
+
+    # A new day without the yearly rollup must not drop the other days of the year.
+    os.remove(pdf_lib.year_file_name(directory, 2008))
+    pdf_lib.save_day(directory, 2008, 8, 229, daily_pdf(4))
+    assert_rollups_match_days(directory, 2008, 8)
+
+
+def test_save_day_after_interrupted_update(tmp_path):
+    directory = str(tmp_path)
+    pdf_lib.save_day(directory, 2008, 8, 227, daily_pdf(1))
+
+    # An update interrupted after the monthly rollup was saved, the day file was never written.
+    open(os.path.join(directory, pdf_lib.STORE_UPDATE_MARKER), 'w').close()
+    pdf_lib.update_rollup(pdf_lib.month_file_name(directory, 8), daily_pdf(2))
+
+    pdf_lib.save_day(directory, 2008, 8, 228, daily_pdf(2))
+    assert_rollups_match_days(directory, 2008, 8)
+
+
+def test_load_text_matches_the_binned_pdf(tmp_path):
+    pdf = daily_pdf(1)
+    file_name = str(tmp_path / 'D227.bin')
+    pdf.write(file_name, '\t')
+    text_pdf = pdf_lib.load_text(file_name, EDGES, '\t')
+    assert sorted(text_pdf.keys) == sorted(pdf.keys)
+    for key in pdf.keys:
+        assert np.array_equal(text_pdf.counts[text_pdf.index[key]], pdf.counts[pdf.index[key]])
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+
+# Import the Noise Toolkit libraries.
+library_path = os.path.join(os.path.dirname(__file__), '..', 'lib')
+sys.path.append(library_path)
+
+import polarLib as polar_lib
+
+
+def primary_eigenvectors(count, seed=2026):
+    """Primary eigenvectors of random Hermitian 3 x 3 spectral matrices, as computed by polarization_variables."""
+    rng = np.random.default_rng(seed)
+    a = rng.standard_normal((count, 3, 3)) + 1j * rng.standard_normal((count, 3, 3))
+    spectra_matrix = np.einsum('fij,fkj->fik', a, a.conjugate())
+    eig_values, eig_vectors = np.linalg.eigh(spectra_matrix)
+    max_eig_value_index = np.argmax(eig_values, axis=1)
+    return eig_vectors[np.arange(count), :, max_eig_value_index]
+
+
+def test_complex_phase_array_matches_scalar():
+    values = np.array([1 + 1j, -1 + 0j, complex(-1, -0.0), -1j, 1e-7 + 1e-7j, 0j, 3 - 4j])
+    expected = [polar_lib.complex_phase(value) for value in values]
+    assert np.array_equal(polar_lib.complex_phase_array(values), expected)
+
+
+def test_polarization_angles_array_matches_scalar():
+    vectors = primary_eigenvectors(500)
+
+    # Real components (zero imaginary parts) take the sign conventions of the scalar version.
+    vectors = np.concatenate([vectors, vectors.real.astype(complex)])
+
+    thetah, phihh, thetav, phivh = polar_lib.polarization_angles_array(vectors[:, 0], vectors[:, 1], vectors[:, 2])
+    expected = np.array([polar_lib.polarization_angles(z1, z2, z3) for z1, z2, z3 in vectors])
+
+    # Exact values, not modulo the period: a wrapped angle (0 vs 360, -180 vs 180) falls in another PDF bin.
+    assert np.allclose(thetah, expected[:, 0], rtol=0.0, atol=1.0e-9)
+    assert np.allclose(phihh, expected[:, 1], rtol=0.0, atol=1.0e-9)
+    assert np.allclose(thetav, expected[:, 2], rtol=0.0, atol=1.0e-9)
+    assert np.allclose(phivh, expected[:, 3], rtol=0.0, atol=1.0e-9)
+
+
+def test_save_polar_day_merges_windows(tmp_path):
+    file_name = str(tmp_path / 'TA.O18A.--.BHZ_BHE_BHN.2008-08-14.3600.period.npz')
+    variables = ['powerUD', 'betaSquare']
+    x = np.array([0.1, 1.0, 10.0])
+    values = np.arange(6, dtype=float).reshape(3, 2)
+    windows = [('2008-08-14T13:00:00', x, values + 1.0), ('2008-08-14T12:00:00', x, values)]
+    assert polar_lib.save_polar_day(file_name, windows, variables, 'Period (s)', 'dB') == []
+
+    # A window already in the file is replaced, a window with another x-axis is skipped.
+    windows = [('2008-08-14T13:00:00', x, values + 2.0), ('2008-08-14T12:30:00', x[:2], values[:2])]
+    assert polar_lib.save_polar_day(file_name, windows, variables, 'Period (s)', 'dB') == ['2008-08-14T12:30:00']
+
+    polar_day = polar_lib.load_polar_day(file_name)
+    assert list(polar_day['times'].astype(str)) == ['2008-08-14T12:00:00', '2008-08-14T13:00:00']
+    assert np.array_equal(polar_day['values'], np.array([values, values + 2.0], dtype=np.float32))
+    assert np.array_equal(polar_day['x'], x)